@@ -0,0 +1,157 @@
+"""
+Ranks the moves of a position. analyze() returns the best K lines (multi-PV) with their scores and the depth reached
+within a time and/or node budget, built on search.Search: every depth, each root move is searched with alpha set to
+the score of the K-th best move found so far, so moves that can not enter the top K are cut off early while the top
+K get exact scores. Results are streamed after every completed depth, the search stops before the node budget is
+exceeded or as soon as the time is up, and it can be cancelled from another thread.
+
+Usage:
+    python analysis.py "FEN" --multipv 3 --time-ms 500    # print the top lines after every depth
+"""
+import argparse
+import sys
+import time
+from board import Board
+from snapshot import BoardSnapshot
+import packedmoves
+import search
+
+MULTIPV = 3  # default number of lines
+DEPTH = 3  # largest depth searched when no budget is given
+
+
+class Analysis:
+    """ Multi-PV iterative deepening analysis of one position """
+
+    def __init__(self, position, multipv=MULTIPV, time_ms=None, nodes=None, stop=None):
+        if multipv < 1:
+            raise ValueError('multipv must be at least 1')
+        deadline = time.perf_counter() + time_ms / 1000 if time_ms is not None else None
+        self.search = search.Search(position, stop, deadline, nodes)
+        self.multipv = multipv
+
+    def cancel(self):
+        """ Stop the analysis, safe to call from another thread """
+        self.search.stop.set()
+
+    def root_lines(self, depth, moves):
+        """
+        Search every root move to a depth, only the moves in the top K get exact scores
+        :param depth: int, depth in plies
+        :param moves: list of (int, BoardSnapshot), root moves in the order to search them
+        :return: list of (int, list), score and principal variation of each move, best first
+        """
+        results = []
+        for move, child in moves:
+            scores = sorted((score for score, _ in results), reverse=True)
+            alpha = scores[self.multipv - 1] if len(scores) >= self.multipv else -search.INFINITY
+            results += self.search.root_moves(depth, [(move, child)], alpha)
+        # sorting is stable, so a move that failed low to the K-th score stays behind the move holding it
+        return sorted(results, key=lambda result: -result[0])
+
+    def iterate(self, max_depth=search.MAX_DEPTH):
+        """
+        Deepen the analysis one ply at a time until the maximum depth, cancellation, the deadline or the node budget
+        :param max_depth: int, largest depth in plies
+        :return: iterator of dict, 'depth', 'lines' (list of dict holding the 'score' and 'pv' of each line, best
+        first), 'nodes' and 'seconds' after every depth
+        """
+        start = time.perf_counter()
+        moves = list(self.search.root.children())
+        if not moves:
+            return
+        for depth in range(1, max_depth + 1):
+            try:
+                results = self.root_lines(depth, moves)
+            except search.SearchStopped:
+                return
+            # search the best moves of this depth first at the next depth
+            rank = dict((line[0], index) for index, (_, line) in enumerate(results))
+            moves.sort(key=lambda item: rank[item[0]])
+            self.search.best = dict(enumerate(results[0][1]))
+            lines = [{'score': score, 'pv': line} for score, line in results[:self.multipv]]
+            yield {'depth': depth, 'lines': lines, 'nodes': self.search.nodes,
+                   'seconds': time.perf_counter() - start}
+            if all(search.is_mate_score(line['score']) for line in lines):
+                return
+
+
+def static_lines(position, multipv):
+    """
+    Rank moves by the material of the resulting positions, the result when the budget runs out before depth 1
+    :param position: BoardSnapshot
+    :param multipv: int, number of lines
+    :return: list of dict, 'score' and 'pv' of the best lines
+    """
+    results = sorted(((-search.evaluate(child), move) for move, child in position.children()),
+                     key=lambda result: -result[0])
+    return [{'score': score, 'pv': [move]} for score, move in results[:multipv]]
+
+
+def analyze(position, multipv=MULTIPV, time_ms=None, nodes=None, depth=None, stop=None, callback=None):
+    """
+    Find the best lines of a position within a budget
+    :param position: Board or BoardSnapshot, position to analyze
+    :param multipv: int, number of lines (K)
+    :param time_ms: float, time budget in milliseconds (no limit if None)
+    :param nodes: int, node budget (no limit if None)
+    :param depth: int, largest depth in plies (DEPTH if no budget is given, otherwise no limit if None)
+    :param stop: threading.Event, set from another thread to cancel the analysis
+    :param callback: function, called with the partial result after every completed depth
+    :return: dict, 'depth' reached (0 if no depth completed and the lines are ranked by material only), 'lines'
+    (list of dict holding the 'score' in centipawns for the player to move and the 'pv' in packed moves of each line,
+    best first, empty if there is no legal move), 'nodes' and 'seconds'
+    """
+    if depth is None:
+        depth = DEPTH if time_ms is None and nodes is None else search.MAX_DEPTH
+    start = time.perf_counter()
+    analysis = Analysis(position, multipv, time_ms, nodes, stop)
+    result = None
+    for result in analysis.iterate(depth):
+        if callback is not None:
+            callback(result)
+    if result is None:
+        result = {'depth': 0, 'lines': static_lines(analysis.search.root, multipv), 'nodes': analysis.search.nodes,
+                  'seconds': time.perf_counter() - start}
+    return result
+
+
+def format_line(line):
+    """
+    :param line: dict, line from analyze()
+    :return: string, score in pawns (or moves to mate) and the moves in coordinate notation
+    """
+    score = line['score']
+    if search.is_mate_score(score):
+        plies = search.MATE - abs(score)
+        text = 'mate {}'.format((plies + 1) // 2 if score > 0 else -((plies + 1) // 2))
+    else:
+        text = '{:+.2f}'.format(score / 100)
+    return '{:>9}  {}'.format(text, ' '.join(packedmoves.to_coordinate(move) for move in line['pv']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Print the best lines of a position')
+    parser.add_argument('fen', nargs='?', help='position in FEN (default: starting position)')
+    parser.add_argument('--multipv', type=int, default=MULTIPV, help='number of lines (default: %(default)s)')
+    parser.add_argument('--time-ms', type=float, help='time budget in milliseconds')
+    parser.add_argument('--nodes', type=int, help='node budget')
+    parser.add_argument('--depth', type=int, help='largest depth in plies')
+    args = parser.parse_args(argv)
+
+    board = Board.from_fen(args.fen) if args.fen else Board()
+
+    def show(result):
+        print('depth {} nodes {} time {:.0f} ms'.format(result['depth'], result['nodes'], result['seconds'] * 1000))
+        for line in result['lines']:
+            print(format_line(line))
+
+    result = analyze(BoardSnapshot.from_board(board), args.multipv, args.time_ms, args.nodes, args.depth,
+                     callback=show)
+    if result['depth'] == 0:
+        show(result)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
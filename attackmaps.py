@@ -0,0 +1,248 @@
+"""
+Computes attack maps, check flags and mobility counts for batches of positions with NumPy. Positions are encoded as
+boolean piece planes of shape (N, 12, 8, 8), planes 0-5 hold white pawns, knights, bishops, rooks, queens and kings
+and planes 6-11 the black pieces, rows and columns follow Board.board (row 0 is rank 8). Leaper attacks are shifted
+copies of the piece planes and sliding attacks are rays filled one step at a time through empty squares, so every
+operation works on the whole batch at once.
+
+The module imports without NumPy so the rest of the engine does not depend on it, encode() and analyze() raise
+ImportError when it is missing.
+
+Usage:
+    python attackmaps.py --games 20          # validate against Board on random games and time both
+"""
+import argparse
+import copy
+import random
+import sys
+import time
+from board import Board
+from piecelist import PIECE_TYPES
+import notation
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+PLAYERS = ['white', 'black']
+KNIGHT_STEPS = [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]
+KING_STEPS = [(-1, 0), (1, 0), (0, 1), (0, -1), (-1, 1), (-1, -1), (1, 1), (1, -1)]
+ORTHOGONAL = [(-1, 0), (1, 0), (0, 1), (0, -1)]
+DIAGONAL = [(-1, 1), (-1, -1), (1, 1), (1, -1)]
+FORWARD = {'white': -1, 'black': 1}  # row step of pawns
+PAWN_ROW = {'white': 6, 'black': 1}  # starting row of pawns
+
+
+def require_numpy():
+    if numpy is None:
+        raise ImportError('attackmaps requires NumPy, install it with "pip install numpy"')
+
+
+def plane(player, name):
+    """
+    :param player: string, 'white' or 'black'
+    :param name: string, piece type name (ex. 'knight')
+    :return: int, index of the piece plane
+    """
+    return PLAYERS.index(player) * 6 + PIECE_TYPES.index(name)
+
+
+def encode(boards):
+    """
+    Encode boards as piece planes
+    :param boards: list of Board
+    :return: numpy.ndarray of bool, shape (N, 12, 8, 8)
+    """
+    require_numpy()
+    planes = numpy.zeros((len(boards), 12, 8, 8), dtype=bool)
+    for index, board in enumerate(boards):
+        for row in range(8):
+            for col in range(8):
+                piece = board.board[row][col]
+                if piece != 0:
+                    planes[index, plane(piece.player, piece.name), row, col] = True
+    return planes
+
+
+def shift(squares, y, x):
+    """
+    Move every square of a batch of 8x8 maps by a step, squares moved off the board are dropped
+    :param squares: numpy.ndarray of bool, shape (..., 8, 8)
+    :param y: int, row step
+    :param x: int, column step
+    :return: numpy.ndarray of bool, shifted maps
+    """
+    shifted = numpy.zeros_like(squares)
+    shifted[..., max(y, 0):8 + min(y, 0), max(x, 0):8 + min(x, 0)] = \
+        squares[..., max(-y, 0):8 + min(-y, 0), max(-x, 0):8 + min(-x, 0)]
+    return shifted
+
+
+def ray(sliders, empty, y, x):
+    """
+    Fill the rays of sliding pieces in one direction, a ray stops at and includes the first occupied square
+    :param sliders: numpy.ndarray of bool, shape (N, 8, 8), squares of the sliding pieces
+    :param empty: numpy.ndarray of bool, shape (N, 8, 8), empty squares
+    :param y: int, row step of the direction
+    :param x: int, column step of the direction
+    :return: numpy.ndarray of bool, shape (N, 8, 8), squares reached by the rays
+    """
+    reached = shift(sliders, y, x)
+    front = reached
+    for _ in range(6):
+        front = shift(front & empty, y, x)
+        reached |= front
+    return reached
+
+
+def side_maps(planes, player, empty):
+    """
+    Yield the target maps of a player's pieces, every map lists each target of a piece once, and no two pieces of
+    the player reach the same square through the same map
+    :param planes: numpy.ndarray of bool, shape (N, 12, 8, 8)
+    :param player: string, 'white' or 'black'
+    :param empty: numpy.ndarray of bool, shape (N, 8, 8), empty squares
+    :return: iterator of numpy.ndarray of bool, shape (N, 8, 8)
+    """
+    for y, x in KNIGHT_STEPS:
+        yield shift(planes[:, plane(player, 'knight')], y, x)
+    for y, x in KING_STEPS:
+        yield shift(planes[:, plane(player, 'king')], y, x)
+    queens = planes[:, plane(player, 'queen')]
+    for y, x in ORTHOGONAL:
+        yield ray(planes[:, plane(player, 'rook')] | queens, empty, y, x)
+    for y, x in DIAGONAL:
+        yield ray(planes[:, plane(player, 'bishop')] | queens, empty, y, x)
+
+
+def pawn_attacks(planes, player):
+    """
+    :param planes: numpy.ndarray of bool, shape (N, 12, 8, 8)
+    :param player: string, 'white' or 'black'
+    :return: List of numpy.ndarray of bool, shape (N, 8, 8), squares attacked by pawns to each side
+    """
+    pawns = planes[:, plane(player, 'pawn')]
+    return [shift(pawns, FORWARD[player], x) for x in [-1, 1]]
+
+
+def analyze(planes):
+    """
+    Compute attack maps, check flags and mobility counts of a batch of positions. A square is attacked by a player
+    if one of the player's pieces could capture on it (squares of the player's own pieces are included). Mobility
+    counts the possible moves of every piece not accounting for check, like generate_possible_moves(), except that
+    en passant captures are not counted since the planes do not record the previous move.
+    :param planes: numpy.ndarray of bool, shape (N, 12, 8, 8), piece planes
+    :return: dict, 'attacks' bool (N, 2, 8, 8), 'check' bool (N, 2) and 'mobility' int (N, 2), index 0 is white
+    """
+    require_numpy()
+    planes = numpy.asarray(planes, dtype=bool)
+    occupied = [planes[:, 0:6].any(axis=1), planes[:, 6:12].any(axis=1)]
+    empty = ~(occupied[0] | occupied[1])
+    attacks = numpy.zeros((len(planes), 2, 8, 8), dtype=bool)
+    mobility = numpy.zeros((len(planes), 2), dtype=numpy.int64)
+    for side, player in enumerate(PLAYERS):
+        own, other = occupied[side], occupied[1 - side]
+        for targets in side_maps(planes, player, empty):
+            attacks[:, side] |= targets
+            mobility[:, side] += (targets & ~own).sum(axis=(1, 2))
+        for targets in pawn_attacks(planes, player):
+            attacks[:, side] |= targets
+            mobility[:, side] += (targets & other).sum(axis=(1, 2))
+
+        # pawn pushes, two steps from the starting row
+        pawns = planes[:, plane(player, 'pawn')]
+        single = shift(pawns, FORWARD[player], 0) & empty
+        start = numpy.zeros((8, 8), dtype=bool)
+        start[PAWN_ROW[player] + FORWARD[player]] = True
+        double = shift(single & start, FORWARD[player], 0) & empty
+        mobility[:, side] += single.sum(axis=(1, 2)) + double.sum(axis=(1, 2))
+
+    kings = numpy.stack([planes[:, plane('white', 'king')], planes[:, plane('black', 'king')]], axis=1)
+    check = (kings & attacks[:, ::-1]).any(axis=(2, 3))
+    return {'attacks': attacks, 'check': check, 'mobility': mobility}
+
+
+def reference(board):
+    """
+    Compute the results of analyze() for one Board with the board's own methods
+    :param board: Board
+    :return: dict, 'attacks' (2 sets of Tuple(row, col)), 'check' (2 booleans) and 'mobility' (2 ints)
+    """
+    attacks, check, mobility = [], [], []
+    for player in PLAYERS:
+        attacks.append(set((row, col) for row in range(8) for col in range(8)
+                           if board.is_square_attacked((row, col), player)))
+        king = board.kings[player]
+        check.append(bool(king.is_checked(king.position, board.board, board.active_pieces)))
+        count = 0
+        for piece in board.active_pieces[player]:
+            if piece.name == 'pawn':
+                moves, en_passant = piece.generate_possible_moves(board.board, piece.directions, turn=board.turn)
+                count += len(moves) - (en_passant is not None)
+            else:
+                count += len(piece.generate_possible_moves(board.board, piece.directions, turn=board.turn))
+        mobility.append(count)
+    return {'attacks': attacks, 'check': check, 'mobility': mobility}
+
+
+def validate(boards):
+    """
+    Compare analyze() with reference() on every board
+    :param boards: list of Board
+    :return: list of int, indices of boards whose results differ
+    """
+    results = analyze(encode(boards))
+    mismatches = []
+    for index, board in enumerate(boards):
+        expected = reference(board)
+        attacks = [set(zip(*numpy.nonzero(results['attacks'][index, side]))) for side in range(2)]
+        if attacks != expected['attacks'] or list(results['check'][index]) != expected['check'] or \
+                list(results['mobility'][index]) != expected['mobility']:
+            mismatches.append(index)
+    return mismatches
+
+
+def random_positions(games, seed=0, max_plies=120):
+    """
+    Sample positions from random games
+    :param games: int, number of random games
+    :param seed: int, random seed
+    :param max_plies: int, length limit of each game
+    :return: list of Board, the position after every ply of every game
+    """
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(games):
+        board = Board()
+        for _ in range(max_plies):
+            moves = board.generate_moves('white' if board.turn % 2 == 1 else 'black')
+            if not moves:
+                break
+            notation.play_move(board, rng.choice(moves))
+            boards.append(copy.deepcopy(board))
+    return boards
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Validate and time batched attack maps against Board')
+    parser.add_argument('--games', type=int, default=20, help='random games to sample positions from')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    boards = random_positions(args.games, args.seed)
+    planes = encode(boards)
+    start = time.perf_counter()
+    analyze(planes)
+    batched = time.perf_counter() - start
+    start = time.perf_counter()
+    for board in boards:
+        reference(board)
+    single = time.perf_counter() - start
+    mismatches = validate(boards)
+    print('{} positions: batched {:.1f} ms, one board at a time {:.1f} ms, {} mismatches'.format(
+        len(boards), batched * 1000, single * 1000, len(mismatches)))
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Benchmark suite that times the key code paths of the chess program. Results can be saved to a JSON baseline
+and later runs can be compared against it to flag performance regressions.
+
+Usage:
+    python benchmark.py                                   # run all benchmarks and print results
+    python benchmark.py --save baseline.json              # run and store results as a baseline
+    python benchmark.py --compare baseline.json           # run and flag regressions against a baseline
+    python benchmark.py --memory-budget game_peak=200000  # also fail when memory use exceeds a budget
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import platform
+import sys
+import time
+from board import Board
+from positioncache import PositionCache
+import mate
+import memprofile
+import render
+
+# bundled games in coordinate notation, each move is the start square followed by the end square
+GAMES = {
+    'scholars_mate': 'e2e4 e7e5 f1c4 b8c6 d1h5 g8f6 h5f7',
+    'random_80': 'f2f3 c7c6 g2g4 g8f6 a2a4 f6g4 f3g4 d8c7 d2d4 c7h2 h1h2 b7b6 c2c3 h8g8 h2h7 a7a5 g1f3 c6c5 '
+                 'c3c4 e7e6 d4c5 f8d6 c5b6 g7g6 h7h2 d6h2 e2e3 h2d6 d1d6 b8a6 d6h2 a6c5 h2g1 c5a6 c1d2 a6b8 '
+                 'd2a5 a8a6 g4g5 g8f8 f3d4 e8e7 d4e6 a6b6 e6f8 e7f8 a5b6 f8g8 g1g4 b8a6 g4d7 g8h8 e3e4 a6c5 '
+                 'd7c8 h8h7 c8c5 h7g8 c5b4 g8g7 b4a5 g7f8 a5d5 f7f6 d5d8 f8f7 d8b8 f6g5 b1a3 f7f6 b8f8 f6e5 '
+                 'f8b8 e5e4 b8g8 e4f3 g8g6 f3g4 b6f2 g4f3',
+}
+MIDGAME = ('random_80', 30)  # midgame position is the random game after 30 plies
+CHECKMATE = ('scholars_mate', 7)  # checkmate position is the end of scholar's mate
+DEFAULT_THRESHOLD = 0.10  # flag benchmarks that are more than 10% slower than the baseline
+
+
+def replay(moves, check=True):
+    """
+    Replays a game on a new board
+    :param moves: string or list of strings, moves in coordinate notation (ex. 'e2e4')
+    :param check: boolean, set to True to evaluate check/checkmate after every move like a match does
+    :return: Board, board state at the end of the game
+    """
+    if isinstance(moves, str):
+        moves = moves.split()
+    board = Board()
+    player, opponent = 'white', 'black'
+    with contextlib.redirect_stdout(io.StringIO()):
+        # silence messages printed by the board (en passant, promotion)
+        for move in moves:
+            board.select(move[:2])
+            if not board.execute_move(move[2:4]):
+                raise ValueError('illegal move {} in replayed game'.format(move))
+            if board.is_pawn_promotion():
+                board.promote_pawn('queen')
+            if check:
+                board.check(opponent)
+            player, opponent = opponent, player
+    return board
+
+
+def position(game):
+    """
+    Get board state of a bundled game after a number of plies
+    :param game: Tuple(string, int), name of bundled game and number of plies to play
+    :return: Board, board state
+    """
+    name, plies = game
+    return replay(GAMES[name].split()[:plies], check=False)
+
+
+def bench_board_init(number):
+    """ Time Board() construction """
+    start = time.perf_counter()
+    for _ in range(number):
+        Board()
+    return time.perf_counter() - start
+
+
+def bench_execute_move(number):
+    """ Time Board.execute_move() for the next move of the midgame position """
+    name, plies = MIDGAME
+    move = GAMES[name].split()[plies]
+    base = position(MIDGAME)
+    boards = [copy.deepcopy(base) for _ in range(number)]  # execute_move mutates the board, set up copies
+    for board in boards:
+        board.select(move[:2])
+    start = time.perf_counter()
+    for board in boards:
+        board.execute_move(move[2:4])
+    return time.perf_counter() - start
+
+
+def bench_check_midgame(number):
+    """ Time Board.check() in a midgame position """
+    board = position(MIDGAME)
+    start = time.perf_counter()
+    for _ in range(number):
+        board.check('white')
+    return time.perf_counter() - start
+
+
+def bench_check_checkmate(number):
+    """ Time Board.check() in a checkmate position """
+    board = position(CHECKMATE)
+    start = time.perf_counter()
+    for _ in range(number):
+        board.check('black')
+    return time.perf_counter() - start
+
+
+def bench_is_checked(number):
+    """ Time King.is_checked() in a midgame position """
+    board = position(MIDGAME)
+    king = board.kings['white']
+    start = time.perf_counter()
+    for _ in range(number):
+        king.is_checked(king.position, board.board, board.active_pieces)
+    return time.perf_counter() - start
+
+
+def bench_has_legal_move(number):
+    """ Time Board.has_legal_move() in a midgame position """
+    board = position(MIDGAME)
+    start = time.perf_counter()
+    for _ in range(number):
+        board.has_legal_move('white')
+    return time.perf_counter() - start
+
+
+def bench_generate_moves(number):
+    """ Time Board.generate_moves() of packed legal moves in a midgame position """
+    board = position(MIDGAME)
+    start = time.perf_counter()
+    for _ in range(number):
+        board.generate_moves('white')
+    return time.perf_counter() - start
+
+
+def bench_mate_puzzles(number):
+    """ Time solving the bundled mate puzzles with proof-number search """
+    start = time.perf_counter()
+    for _ in range(number):
+        mate.solve_puzzles()
+    return time.perf_counter() - start
+
+
+def piece_bench(name):
+    """
+    Create a benchmark that times generate_possible_moves() for one piece type in the midgame position
+    :param name: string, name of chess piece type (ex. 'knight')
+    :return: function, benchmark function
+    """
+    def bench(number):
+        board = position(MIDGAME)
+        pieces = list(board.active_pieces['white']) + list(board.active_pieces['black'])
+        piece = next(piece for piece in pieces if piece.name == name)
+        start = time.perf_counter()
+        for _ in range(number):
+            piece.generate_possible_moves(board.board, piece.directions, turn=board.turn)
+        return time.perf_counter() - start
+    bench.__doc__ = ' Time {}.generate_possible_moves() in a midgame position '.format(name.capitalize())
+    return bench
+
+
+def game_bench(name):
+    """
+    Create a benchmark that times replaying a whole bundled game, evaluating check after every move
+    :param name: string, name of bundled game
+    :return: function, benchmark function
+    """
+    def bench(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            replay(GAMES[name])
+        return time.perf_counter() - start
+    bench.__doc__ = ' Time replaying the {} game '.format(name)
+    return bench
+
+
+def bench_apply_moves(number):
+    """ Time validating and playing the random_80 game with Board.apply_moves() """
+    moves = GAMES['random_80'].split()
+    start = time.perf_counter()
+    for _ in range(number):
+        Board().apply_moves(moves)
+    return time.perf_counter() - start
+
+
+def bench_check_cached(number):
+    """ Time check verdicts of every position of the random_80 game looked up in a warm PositionCache """
+    boards = [position(('random_80', plies)) for plies in range(len(GAMES['random_80'].split()) + 1)]
+    cache = PositionCache()
+    for board in boards:
+        cache.verdict(board)
+    start = time.perf_counter()
+    for _ in range(number):
+        for board in boards:
+            cache.verdict(board)
+    return time.perf_counter() - start
+
+
+def bench_render_midgame(number):
+    """ Time drawing the midgame position as text like Board.print() """
+    board = position(MIDGAME)
+    renderer = render.Renderer(io.StringIO())
+    start = time.perf_counter()
+    for _ in range(number):
+        renderer.draw(board)
+    return time.perf_counter() - start
+
+
+# benchmark name -> (benchmark function, number of calls per repetition)
+BENCHMARKS = {
+    'board_init': (bench_board_init, 200),
+    'execute_move': (bench_execute_move, 50),
+    'check_midgame': (bench_check_midgame, 100),
+    'check_checkmate': (bench_check_checkmate, 20),
+    'is_checked': (bench_is_checked, 500),
+    'has_legal_move': (bench_has_legal_move, 200),
+    'generate_moves': (bench_generate_moves, 20),
+    'mate_puzzles': (bench_mate_puzzles, 1),
+}
+for _name in ['pawn', 'knight', 'bishop', 'rook', 'queen', 'king']:
+    BENCHMARKS['moves_' + _name] = (piece_bench(_name), 2000)
+BENCHMARKS['game_scholars_mate'] = (game_bench('scholars_mate'), 5)
+BENCHMARKS['game_random_80'] = (game_bench('random_80'), 1)
+BENCHMARKS['apply_moves'] = (bench_apply_moves, 1)
+BENCHMARKS['check_cached'] = (bench_check_cached, 1)
+BENCHMARKS['render_midgame'] = (bench_render_midgame, 200)
+
+
+def run(names=None, repeat=5, scale=1.0):
+    """
+    Run benchmarks
+    :param names: list of strings, names of benchmarks to run (all benchmarks if None)
+    :param repeat: int, number of repetitions, the fastest repetition is reported
+    :param scale: float, multiplier for the number of calls per repetition
+    :return: Dict[str:float], benchmark name -> seconds per call
+    """
+    results = {}
+    for name, (bench, number) in BENCHMARKS.items():
+        if names is not None and name not in names:
+            continue
+        number = max(1, int(number * scale))
+        results[name] = min(bench(number) for _ in range(repeat)) / number
+    return results
+
+
+def save(results, path):
+    """
+    Save benchmark results to a JSON baseline file
+    :param results: Dict[str:float], benchmark name -> seconds per call
+    :param path: string, path of baseline file
+    """
+    data = {'python': platform.python_version(), 'platform': platform.platform(), 'results': results}
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    """
+    Load benchmark results from a JSON baseline file
+    :param path: string, path of baseline file
+    :return: Dict[str:float], benchmark name -> seconds per call
+    """
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(baseline, results, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare benchmark results against a baseline
+    :param baseline: Dict[str:float], baseline benchmark name -> seconds per call
+    :param results: Dict[str:float], current benchmark name -> seconds per call
+    :param threshold: float, relative slowdown above which a benchmark is flagged (ex. 0.1 for 10%)
+    :return: List of Tuple(name, baseline, current, ratio), benchmarks that regressed past the threshold
+    """
+    regressions = []
+    for name, current in results.items():
+        if name not in baseline:
+            # benchmark is new, nothing to compare against
+            continue
+        ratio = current / baseline[name]
+        if ratio > 1 + threshold:
+            regressions.append((name, baseline[name], current, ratio))
+    return regressions
+
+
+def report(results, baseline=None):
+    """
+    Print a table of benchmark results
+    :param results: Dict[str:float], benchmark name -> seconds per call
+    :param baseline: Dict[str:float], baseline results to show alongside (optional)
+    """
+    for name, seconds in results.items():
+        line = '{:<22} {:>12.2f} us'.format(name, seconds * 1e6)
+        if baseline is not None and name in baseline:
+            line += '   baseline {:>12.2f} us   x{:.2f}'.format(baseline[name] * 1e6, seconds / baseline[name])
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the chess program')
+    parser.add_argument('--save', metavar='PATH', help='save results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare results against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown flagged as a regression (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=5, help='repetitions per benchmark (default: %(default)s)')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for calls per repetition')
+    parser.add_argument('--memory-budget', action='append', nargs='?', const='', metavar='NAME=BYTES',
+                        help='check memprofile budgets, optionally overriding one (repeatable)')
+    parser.add_argument('names', nargs='*', help='benchmarks to run (default: all)')
+    args = parser.parse_args(argv)
+
+    results = run(args.names or None, repeat=args.repeat, scale=args.scale)
+    baseline = load(args.compare) if args.compare else None
+    report(results, baseline)
+    if args.save:
+        save(results, args.save)
+    failed = False
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        for name, base, current, ratio in regressions:
+            print('REGRESSION: {} is {:.0%} slower than baseline'.format(name, ratio - 1))
+        failed = bool(regressions)
+    if args.memory_budget is not None:
+        budgets = memprofile.parse_budgets([item for item in args.memory_budget if item])
+        for name, value, budget in memprofile.check_budget(memprofile.profile(), budgets):
+            print('OVER BUDGET: {} uses {:,.0f} bytes, budget is {:,}'.format(name, value, budget))
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,22 +2,122 @@
 Defines class for chessboard
 """
 from pieces import *
+from movecache import MoveCache
+from piecelist import PieceList
+import packedmoves
 import copy
+import itertools
+import re
+import sys
+
+
+# square name -> Tuple(row, col) and row -> col -> square name, precomputed for every square
+SQUARES = dict(('abcdefgh'[col] + str(8 - row), (row, col)) for row in range(8) for col in range(8))
+SQUARE_NAMES = [['abcdefgh'[col] + str(8 - row) for col in range(8)] for row in range(8)]
+# piece letter, origin file, origin rank, capture, destination, promotion, check and annotation suffixes
+SAN_PATTERN = re.compile(r'^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQnbrq]))?[+#]?[!?]*$')
+FILES_LINE = '    a b c d e f g h '  # file labels above and below the printed board
+BORDER_LINE = '   ----------------- '
+# piece name -> value in centipawns used by static exchange evaluation, the king outweighs any exchange
+SEE_VALUES = {'pawn': 100, 'knight': 300, 'bishop': 300, 'rook': 500, 'queen': 900, 'king': 100000}
 
 
 class Board:
     # dicts that map algebraic notation to matrix indices (rank -> row, file -> column)
     alg_row_to_idx = {8: 0, 7: 1, 6: 2, 5: 3, 4: 4, 3: 5, 2: 6, 1: 7}
     alg_col_to_idx = {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4, 'f': 5, 'g': 6, 'h': 7}
+    san_piece_names = {'N': 'knight', 'B': 'bishop', 'R': 'rook', 'Q': 'queen', 'K': 'king'}  # SAN letter -> piece
+    coordinate_move = re.compile(r'^[a-h][1-8][a-h][1-8][nbrq]?$')  # move in coordinate notation (ex. 'e7e8q')
 
-    def __init__(self):
-        self.active_pieces = {'white': [], 'black': []}  # holds pieces in play for both players
+    def __init__(self, pieces=None):
+        # pieces is an iterable of chess pieces to place instead of the starting position, see from_pieces()
+        self.active_pieces = {'white': PieceList(), 'black': PieceList()}  # holds pieces in play for both players
         # self.board is a 2D matrix and holds current state of chessboard, empty spaces are zeros
         # white starts on bottom rows (row index 6 and 7) and black starts on top rows (row index 0 and 1)
-        self.board = self.initialize_board()
+        self.board = self.initialize_board() if pieces is None else self.place_pieces(pieces)
         self.selected = None  # points to the chess piece the player has selected to move
-        self.kings = {'white': self.board[7][4], 'black': self.board[0][4]}  # holds both king instances
+        # holds both king instances
+        self.kings = dict((player, next(self.active_pieces[player].of_type('king'), None))
+                          for player in ['white', 'black'])
         self.turn = 1  # specifies turn of match
+        self.version = 0  # incremented whenever the board state changes, used to expire cached results
+        self.destinations = set()  # legal destinations of the selected piece
+        self.destinations_key = None  # (piece, position, version, turn) the legal destinations were computed for
+        self.history = packedmoves.new_buffer()  # packed moves played on the board
+        self.move_buffer = packedmoves.new_buffer()  # move list reused by generate_moves()
+        self.move_cache = MoveCache(self)  # caches possible moves of pieces, invalidated square by square
+        self.legal_index = {}  # (piece type, destination) -> packed legal moves of the player to move
+        self.legal_index_key = None  # (version, turn) the legal move index was computed for
+
+    @classmethod
+    def from_pieces(cls, pieces, turn=1):
+        """
+        Create a board holding the given chess pieces instead of the starting position
+        :param pieces: iterable of chess pieces, each piece holds its own position (both kings are required)
+        :param turn: int, turn of match
+        :return: Board, board with the pieces placed
+        """
+        board = cls(pieces)
+        board.turn = turn
+        return board
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Create a board from Forsyth-Edwards Notation. Castling rights and the halfmove clock are ignored since
+        castling is not supported. Pawns off their starting rank are treated as moved.
+        :param fen: string, position in FEN (ex. 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b - e3 0 1')
+        :return: Board, board with the position
+        """
+        fields = fen.split()
+        placement, side = fields[0], fields[1] if len(fields) > 1 else 'w'
+        en_passant = fields[3] if len(fields) > 3 else '-'
+        fullmove = int(fields[5]) if len(fields) > 5 else 1
+        turn = 2 * (fullmove - 1) + (1 if side == 'w' else 2)
+        classes = {'P': Pawn, 'N': Knight, 'B': Bishop, 'R': Rook, 'Q': Queen, 'K': King}
+        pieces = []
+        for row, rank in enumerate(placement.split('/')):
+            col = 0
+            for symbol in rank:
+                if symbol.isdigit():
+                    col += int(symbol)
+                    continue
+                piece = classes[symbol.upper()]((row, col), 'white' if symbol.isupper() else 'black')
+                if piece.name == 'pawn' and row != (6 if piece.player == 'white' else 1):
+                    piece.moved = True
+                pieces.append(piece)
+                col += 1
+        board = cls.from_pieces(pieces, turn)
+        if en_passant != '-':
+            # the pawn that moved two steps on the previous turn stands one row past the target square
+            target = board.algebraic_to_index(en_passant)
+            pawn = board.board[target[0] + (-1 if side == 'b' else 1)][target[1]]
+            pawn.moved = pawn.two_step = True
+            pawn.first_move = turn - 1
+        return board
+
+    def fen(self):
+        """
+        Get the board state in Forsyth-Edwards Notation, castling rights are always '-' and the halfmove clock 0
+        :return: string, position in FEN
+        """
+        ranks = []
+        en_passant = '-'
+        for row in range(8):
+            rank, empty = '', 0
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece == 0:
+                    empty += 1
+                    continue
+                if piece.name == 'pawn' and piece.two_step and self.turn - piece.first_move == 1:
+                    # pawn moved two steps on the previous turn, the square it passed is the en passant target
+                    en_passant = self.index_to_algebraic((row + (1 if piece.player == 'white' else -1), col))
+                rank += (str(empty) if empty else '') + str(piece)
+                empty = 0
+            ranks.append(rank + (str(empty) if empty else ''))
+        side = 'w' if self.turn % 2 == 1 else 'b'
+        return '{} {} - {} 0 {}'.format('/'.join(ranks), side, en_passant, (self.turn + 1) // 2)
 
     def initialize_board(self):
         """ Initialize the chessboard """
@@ -40,19 +140,33 @@ class Board:
 
         return board
 
+    def place_pieces(self, pieces):
+        """
+        Place chess pieces on an empty chessboard
+        :param pieces: iterable of chess pieces, each piece holds its own position
+        :return: 2D List, chessboard with the pieces placed
+        """
+        board = [[0 for i in range(8)] for j in range(8)]
+        for piece in pieces:
+            board[piece.position[0]][piece.position[1]] = piece
+            self.active_pieces[piece.player].append(piece)
+        return board
+
     def print(self):
         """ Prints the current state of the chessboard, sides are annotated according to algebraic notation """
-        print('    a b c d e f g h ')
-        print('   ----------------- ')
-        for row in range(8, 0, -1):
-            print(row, end=' | ')
-            for col in range(8):
-                val = self.board[self.alg_row_to_idx[row]][col]
-                print(val, end=' ') if val != 0 else print('*', end=' ')
-            print('|', end=' ')
-            print(row)
-        print('   ----------------- ')
-        print('    a b c d e f g h ')
+        sys.stdout.write(self.render())
+
+    def render(self):
+        """
+        Draws the chessboard as text in a single buffer, empty squares are shown as '*'
+        :return: string, lines of the chessboard each ending with a newline
+        """
+        lines = [FILES_LINE, BORDER_LINE]
+        for index, rank in enumerate(self.board):
+            row = 8 - index
+            lines.append('{} | {} | {}'.format(row, ' '.join('*' if val == 0 else str(val) for val in rank), row))
+        lines += [BORDER_LINE, FILES_LINE]
+        return '\n'.join(lines) + '\n'
 
     def algebraic_to_index(self, alg_position):
         """
@@ -60,7 +174,15 @@ class Board:
         :param alg_position: string, algebraic notation of chessboard position (ex. 'a1')
         :return: Tuple(row, col), index position in 2D list
         """
-        return tuple([self.alg_row_to_idx[int(alg_position[1])], self.alg_col_to_idx[alg_position[0]]])
+        return SQUARES[alg_position]
+
+    def index_to_algebraic(self, position):
+        """
+        Converts board position from list indices to algebraic notation
+        :param position: Tuple(row, col), index position in 2D list
+        :return: string, algebraic notation of chessboard position (ex. 'a1')
+        """
+        return SQUARE_NAMES[position[0]][position[1]]
 
     def execute_move(self, final_alg_position):
         """
@@ -69,53 +191,52 @@ class Board:
         :return: boolean, True if move executed successfully, False otherwise
         """
         final_position = self.algebraic_to_index(final_alg_position)  # convert final position to matrix indices
-        king = self.kings[self.selected.player]  # get king
-        if self.selected.is_move_valid(final_position, self.board, turn=self.turn):
-            # move is valid not accounting for possible check
-            curr_position = self.selected.position
-
-            # simulate board state if move were made
-            board, active_pieces = self.simulate_move(self.selected, final_position)
-
-            # determine if move results in king being left in check using simulated board state
-            king_position = final_position if self.selected.name == 'king' else king.position
-            if king.is_checked(king_position, board, active_pieces):
-                # if move were made, the king would be in check, therefore the move is invalid
-                print('INVALID: You can not leave your own king in check.')
-                if self.selected.name == 'pawn':
-                    self.selected.enpassant = False
-                return False
-
-            # determine if an opponent's piece occupies final position
-            occupant = self.board[final_position[0]][final_position[1]]
-            if occupant != 0:
-                # square is not empty, therefore there is an opponent's piece in final position
-                occupant.eliminated()
-                self.active_pieces[occupant.player].remove(occupant)  # remove opponent piece from play
-            # update current board state
-            self.board[final_position[0]][final_position[1]] = self.selected  # point final position to piece
-            self.board[curr_position[0]][curr_position[1]] = 0  # set initial position to empty
-            self.selected.update_position(final_position)  # update board position of piece
-
-            # special pawn case
-            if self.selected.name == 'pawn':
-                if self.selected.enpassant:
-                    # pawn is making an en passant move
-                    pawn_elim = self.board[curr_position[0]][final_position[1]]  # pawn to be eliminated
-                    pawn_elim.eliminated()
-                    self.board[curr_position[0]][final_position[1]] = 0
-                    self.active_pieces[pawn_elim.player].remove(pawn_elim)  # remove opponent pawn from play
-                    self.selected.enpassant = False  # turn enpassant off
-                    print('{} pawn captures {} pawn en passant!'.format(self.selected.player, pawn_elim.player))
-                # update pawn's attributes
-                self.selected.move(curr_position, final_position, self.turn)
-
-            self.turn += 1  # move executed successfully, next turn
+        if final_position in self.legal_destinations():
+            # move is valid and does not leave the king in check
+            captured = self.move_piece(self.selected, final_position)
+            if captured is not None and captured.position != final_position:
+                print('{} pawn captures {} pawn en passant!'.format(self.selected.player, captured.player))
             return True
+        elif final_position in self.possible_moves(self.selected):
+            # if move were made, the king would be in check, therefore the move is invalid
+            print('INVALID: You can not leave your own king in check.')
+            return False
         else:
             print('INVALID. That move is invalid. Please try again.')
             return False
 
+    def move_piece(self, piece, final_position):
+        """
+        Moves a chess piece without checking the move or printing, used by execute_move() once the move is validated
+        :param piece: chess piece to move
+        :param final_position: Tuple(row, col), legal destination of the piece
+        :return: chess piece or NoneType, captured piece (the pawn beside the moving pawn for en passant moves)
+        """
+        curr_position = piece.position
+        move = self.encode_move(curr_position, final_position)  # packed move for the move history
+        captured_position = self.captured_position(piece, final_position)
+        captured = None
+        if captured_position is not None:
+            # eliminate opponent piece on the final position, or beside the pawn for an en passant move
+            captured = self.board[captured_position[0]][captured_position[1]]
+            captured.eliminated()
+            self.board[captured_position[0]][captured_position[1]] = 0
+            self.active_pieces[captured.player].remove(captured)  # remove opponent piece from play
+            self.move_cache.invalidate([captured_position])
+        # update current board state
+        self.board[final_position[0]][final_position[1]] = piece  # point final position to piece
+        self.board[curr_position[0]][curr_position[1]] = 0  # set initial position to empty
+        piece.update_position(final_position)  # update board position of piece
+        self.move_cache.invalidate([curr_position, final_position])  # drop moves that depend on the squares
+        if piece.name == 'pawn':
+            # update pawn's attributes
+            piece.move(curr_position, final_position, self.turn)
+
+        self.turn += 1  # move executed successfully, next turn
+        self.version += 1
+        self.history.append(move)
+        return captured
+
     def select(self, alg_position):
         """
         Select chess piece to move
@@ -123,6 +244,24 @@ class Board:
         """
         position = self.algebraic_to_index(alg_position)
         self.selected = self.board[position[0]][position[1]]
+        if self.selected != 0:
+            self.legal_destinations()  # compute legal destinations once, moves are then validated by lookup
+
+    def legal_destinations(self):
+        """
+        Get legal destinations of the selected chess piece, including en passant moves. Destinations are computed
+        once per board state and reused until the board changes.
+        :return: set of Tuple(row, col), board positions the selected piece can move to without leaving its king in
+        check, empty if no piece is selected
+        """
+        piece = self.selected
+        if piece is None or piece == 0:
+            return set()
+        key = (piece, piece.position, self.version, self.turn)
+        if key != self.destinations_key:
+            self.destinations = {end for _, end in self.iter_legal_moves(piece.player, piece)}
+            self.destinations_key = key
+        return self.destinations
 
     def get_piece(self, alg_position):
         """
@@ -144,60 +283,304 @@ class Board:
         threat = king.is_checked(king.position, self.board, self.active_pieces, bool_only=False)
         if threat:
             # if king is in check, see if there is checkmate
-            if self.checkmate(king, threat, self.active_pieces[player]):
+            if self.checkmate(player):
                 # checkmate, match is over
                 return 'checkmate'
             # board state is check, but not checkmate
             return 'check'
         return False
 
-    def checkmate(self, king, threat, pieces):
+    def checkmate(self, player):
         """
-        Determines if current board state is checkmate
-        :param king: King, look at if this king is in checkmate
-        :param threat: chess piece that has placed king in check
-        :param pieces: list, friendly pieces in play
+        Determines if current board state is checkmate, the player's king must be in check
+        :param player: string, player whose king is in check
         :return: boolean, True if king is in checkmate, False otherwise
         """
-        moves = king.generate_possible_moves(self.board, king.directions, turn=self.turn)  # get king's possible moves
+        # the staged generator tries king evasions, captures of the checker and interpositions, stopping at the first
+        # legal move
+        return not self.has_legal_move(player)
 
-        # first see if king can move into a safe square
-        for move in moves:
-            board, active_pieces = self.simulate_move(king, move)  # simulate board state as if move were made
-            if not king.is_checked(move, board, active_pieces):
-                # a king move exists that would not result in check, not checkmate
-                return False
+    def attackers_of(self, position, player):
+        """
+        Iterate over a player's pieces that attack a square, found by scanning outward from the square
+        :param position: Tuple(row, col), board position
+        :param player: string, attacking player
+        :return: iterator of chess pieces
+        """
+        return King.threats(position, self.board, self.active_pieces[player])
 
-        # next see if friendly piece can block or eliminate threat
-        attack_path = threat.get_path(king.position)[:-1]  # get attack path to king of threatening opponent piece
-        for piece in pieces:
-            # iterate over all player's pieces except king
-            if piece.name == 'king':
+    def is_square_attacked(self, position, player):
+        """
+        Determines if a square is attacked, stops at the first attacker found
+        :param position: Tuple(row, col), board position
+        :param player: string, attacking player
+        :return: boolean, True if a piece of the player attacks the square, False otherwise
+        """
+        return next(self.attackers_of(position, player), None) is not None
+
+    def has_legal_move(self, player):
+        """
+        Determines if a player has any legal move, stops at the first legal move found
+        :param player: string, 'white' or 'black'
+        :return: boolean, True if the player has a legal move, False otherwise
+        """
+        return next(self.iter_legal_moves(player), None) is not None
+
+    def iter_legal_moves(self, player, piece=None):
+        """
+        Lazily generates the legal moves of a player in stages. When the king is in check the stages are king
+        evasions, captures of the checking piece and interpositions (only king moves in double check). Otherwise
+        captures come before quiet moves. Every other legal move generator of the board is built on this one. The
+        board must not change while the generator is in use.
+        :param player: string, 'white' or 'black'
+        :param piece: chess piece of the player, only its moves are generated (moves of every piece if None)
+        :return: iterator of Tuple(Tuple(row, col), Tuple(row, col)), start and end position of each legal move
+        """
+        king = self.kings[player]
+        opponent = 'black' if player == 'white' else 'white'
+        checkers = list(itertools.islice(self.attackers_of(king.position, opponent), 2))
+        if not checkers:
+            pieces = self.active_pieces[player] if piece is None else [piece]
+            for capture in [True, False]:
+                for other in pieces:
+                    for end in self.possible_moves(other):
+                        if self.is_capture(other, end) == capture and not self.leaves_king_in_check(other, end):
+                            yield other.position, end
+            return
+
+        # king evasions
+        if piece is None or piece is king:
+            for end in self.possible_moves(king):
+                if not self.leaves_king_in_check(king, end):
+                    yield king.position, end
+        if len(checkers) > 1 or piece is king:
+            # double check, only the king can move (or only the king's moves were asked for)
+            return
+
+        # captures of the checking piece, then interpositions on the squares between a slider and the king
+        checker = checkers[0]
+        blocks = []
+        if checker.name in ['bishop', 'rook', 'queen']:
+            blocks = checker.get_path(king.position)[1:-1]
+        if piece is None:
+            pieces = list(self.active_pieces[player].of_type('pawn', 'knight', 'bishop', 'rook', 'queen'))
+        else:
+            pieces = [piece]
+        for other in pieces:
+            for end in self.possible_moves(other):
+                if self.captured_position(other, end) == checker.position and \
+                        not self.leaves_king_in_check(other, end):
+                    yield other.position, end
+        for other in pieces:
+            for end in self.possible_moves(other):
+                if end in blocks and not self.leaves_king_in_check(other, end):
+                    yield other.position, end
+
+    def captured_position(self, piece, end_position):
+        """
+        Get the position of the piece a move would capture
+        :param piece: chess piece to move
+        :param end_position: Tuple(row, col), board position to move piece to
+        :return: Tuple(row, col) or NoneType, position of the captured piece, None if the move captures nothing
+        """
+        if self.board[end_position[0]][end_position[1]] != 0:
+            return end_position
+        if piece.name == 'pawn' and piece.position[1] != end_position[1]:
+            # en passant move captures the opponent pawn beside the moving pawn
+            return piece.position[0], end_position[1]
+        return None
+
+    def is_capture(self, piece, end_position):
+        """
+        :param piece: chess piece to move
+        :param end_position: Tuple(row, col), board position to move piece to
+        :return: boolean, True if the move captures an opponent piece
+        """
+        return self.captured_position(piece, end_position) is not None
+
+    def see(self, move):
+        """
+        Static exchange evaluation of a move: captures on the destination square alternate between the players, each
+        using its least valuable attacker, and either player may stop capturing when continuing would lose material.
+        Sliders behind pieces that have joined the exchange (X-rays) are found by treating the squares those pieces
+        left as empty, the board is neither changed nor copied. Pins and checks are not considered.
+        :param move: int, packed move
+        :return: int, material won by the player making the move in centipawns (negative if material is lost, 0 for
+        a quiet move to a safe square)
+        """
+        start, end = packedmoves.start(move), packedmoves.end(move)
+        piece = self.board[start[0]][start[1]]
+        if piece == 0:
+            raise ValueError('no piece at {}'.format(self.index_to_algebraic(start)))
+        captured = self.captured_position(piece, end)
+        removed = {start}  # squares of pieces that have moved to the destination
+        gain = [0]
+        if captured is not None:
+            removed.add(captured)
+            gain[0] = SEE_VALUES[self.board[captured[0]][captured[1]].name]
+        occupant = SEE_VALUES[piece.name]  # value of the piece standing on the destination
+        if piece.name == 'pawn' and end[0] in (0, 7):
+            promotion = packedmoves.promotion(move) or 'queen'
+            gain[0] += SEE_VALUES[promotion] - SEE_VALUES['pawn']
+            occupant = SEE_VALUES[promotion]
+        player = 'black' if piece.player == 'white' else 'white'
+        while True:
+            attacker = min(self.exchange_attackers(end, player, removed), key=lambda other: SEE_VALUES[other.name],
+                           default=None)
+            if attacker is None:
+                break
+            gain.append(occupant - gain[-1])
+            occupant = SEE_VALUES[attacker.name]
+            if attacker.name == 'pawn' and end[0] in (0, 7):
+                gain[-1] += SEE_VALUES['queen'] - SEE_VALUES['pawn']
+                occupant = SEE_VALUES['queen']
+            removed.add(attacker.position)
+            player = 'black' if player == 'white' else 'white'
+        # a player only recaptures if it does not lose material by doing so
+        while len(gain) > 1:
+            last = gain.pop()
+            gain[-1] = -max(-gain[-1], last)
+        return gain[0]
+
+    def exchange_attackers(self, position, player, removed):
+        """
+        Iterate over a player's pieces that attack a square while the pieces on some squares are taken off the board
+        :param position: Tuple(row, col), attacked board position
+        :param player: string, attacking player
+        :param removed: set of Tuple(row, col), squares treated as empty
+        :return: iterator of chess pieces
+        """
+        row, col = position
+        for piece in King.attackers(position, self.active_pieces[player]):
+            y, x = piece.position
+            if (y, x) == position or (y, x) in removed:
                 continue
-            # get possible moves of friendly piece
-            elif piece.name == 'pawn':
-                # special pawn case
-                possible_moves, _ = piece.generate_possible_moves(self.board, piece.directions, turn=self.turn)
+            if piece.name == 'pawn':
+                if y - row == (1 if piece.player == 'white' else -1) and abs(x - col) == 1:
+                    yield piece
+            elif piece.name in ['knight', 'king']:
+                yield piece
+            else:
+                ystep = (row > y) - (row < y)
+                xstep = (col > x) - (col < x)
+                y, x = y + ystep, x + xstep
+                while (y, x) != position and (self.board[y][x] == 0 or (y, x) in removed):
+                    y, x = y + ystep, x + xstep
+                if (y, x) == position:
+                    yield piece
+
+    def possible_moves(self, piece):
+        """
+        Get possible moves of a chess piece, not accounting for possible check
+        :param piece: chess piece in play
+        :return: Tuple of Tuple(row, col), space of possible board positions the piece can take
+        """
+        return self.move_cache.moves(piece)
+
+    def leaves_king_in_check(self, piece, end_position):
+        """
+        Determines if moving a chess piece would leave its own king in check. The move is made on the board in place
+        and taken back afterwards, which avoids copying the board like simulate_move().
+        :param piece: chess piece to move
+        :param end_position: Tuple(row, col), board position to move piece to
+        :return: boolean, True if the king would be in check after the move, False otherwise
+        """
+        king = self.kings[piece.player]
+        start = piece.position
+        captured_position = end_position
+        if piece.name == 'pawn' and start[1] != end_position[1] and self.board[end_position[0]][end_position[1]] == 0:
+            # en passant move eliminates the opponent pawn beside the moving pawn
+            captured_position = (start[0], end_position[1])
+        captured = self.board[captured_position[0]][captured_position[1]]
+
+        # make move
+        self.board[captured_position[0]][captured_position[1]] = 0
+        self.board[start[0]][start[1]] = 0
+        self.board[end_position[0]][end_position[1]] = piece
+        slots = None
+        try:
+            if captured != 0:
+                # captured piece can not attack the king
+                slots = self.active_pieces[captured.player].remove(captured)
+            king_position = end_position if piece.name == 'king' else king.position
+            return bool(king.is_checked(king_position, self.board, self.active_pieces))
+        finally:
+            # take move back, even if the check raised, so the live board is never left changed
+            if slots is not None:
+                self.active_pieces[captured.player].reinsert(captured, slots)
+            self.board[end_position[0]][end_position[1]] = 0
+            self.board[captured_position[0]][captured_position[1]] = captured
+            self.board[start[0]][start[1]] = piece
+
+    def legal_moves(self, player):
+        """
+        Generates every legal move for a player
+        :param player: string, 'white' or 'black'
+        :return: List of Tuple(Tuple(row, col), Tuple(row, col)), start and end position of each legal move
+        """
+        return list(self.iter_legal_moves(player))
+
+    def encode_move(self, start, end, promotion=None):
+        """
+        Packs a move of the chess piece at a start position, flags are taken from the current board state
+        :param start: Tuple(row, col), start position of the chess piece
+        :param end: Tuple(row, col), end position of the chess piece
+        :param promotion: string, name of promotion piece for pawn promotions (ex. 'queen')
+        :return: int, packed move
+        """
+        piece = self.board[start[0]][start[1]]
+        flags = packedmoves.QUIET
+        if self.board[end[0]][end[1]] != 0:
+            flags = packedmoves.CAPTURE
+        elif piece.name == 'pawn' and start[1] != end[1]:
+            flags = packedmoves.EN_PASSANT
+        elif piece.name == 'pawn' and abs(end[0] - start[0]) == 2:
+            flags = packedmoves.DOUBLE_PUSH
+        if promotion is not None:
+            flags = flags & packedmoves.CAPTURE | packedmoves.promotion_flags(promotion)
+        return packedmoves.encode(start, end, flags)
+
+    def parse_move(self, text):
+        """
+        Packs a move given in coordinate notation
+        :param text: string, start square, end square and optional promotion letter (ex. 'e2e4' or 'e7e8q')
+        :return: int, packed move
+        """
+        promotion = packedmoves.PROMOTION_LETTERS[text[4]] if len(text) > 4 else None
+        return self.encode_move(self.algebraic_to_index(text[:2]), self.algebraic_to_index(text[2:4]), promotion)
+
+    def generate_moves(self, player, buffer=None):
+        """
+        Generates every legal move for a player as packed moves, pawn promotions are listed once per piece type
+        :param player: string, 'white' or 'black'
+        :param buffer: array('H'), move list to fill, the board's reusable buffer is used if None
+        :return: array('H'), packed legal moves (the buffer is overwritten by the next call, copy it to keep it)
+        """
+        if buffer is None:
+            buffer = self.move_buffer
+        del buffer[:]
+        for start, end in self.iter_legal_moves(player):
+            if end[0] in [0, 7] and self.board[start[0]][start[1]].name == 'pawn':
+                for promotion in packedmoves.PROMOTION_PIECES:
+                    buffer.append(self.encode_move(start, end, promotion))
             else:
-                possible_moves = piece.generate_possible_moves(self.board, piece.directions, turn=self.turn)
-            # look for overlap of friendly piece's possible moves and positions in attack path
-            for opp_move in attack_path:
-                next_piece = False
-                for move in possible_moves:
-                    if opp_move == move:
-                        # friendly piece can block or eliminate threatening opponent piece
-                        # simulate board state as if move were made
-                        board, active_pieces = self.simulate_move(piece, move)
-                        if king.is_checked(king.position, board, active_pieces):
-                            # moving this piece will still result in king in check
-                            next_piece = True  # go to next chess piece
-                            break
-                        # moving this piece will result in king not in check, no checkmate
-                        return False
-                if next_piece:
-                    break
-
-        # there is no move the player can make that will not result in an unchecked king, therefore it is checkmate
+                buffer.append(self.encode_move(start, end))
+        return buffer
+
+    def play(self, move):
+        """
+        Plays a packed move, pawns reaching the last rank are promoted to the flagged piece (queen if none)
+        :param move: int, packed move
+        :return: boolean, True if move executed successfully, False otherwise
+        """
+        start = packedmoves.start(move)
+        if self.board[start[0]][start[1]] == 0:
+            return False
+        self.select(self.index_to_algebraic(start))
+        if not self.execute_move(self.index_to_algebraic(packedmoves.end(move))):
+            return False
+        if self.is_pawn_promotion():
+            self.promote_pawn(packedmoves.promotion(move) or 'queen')
         return True
 
     def simulate_move(self, piece, end_position):
@@ -234,8 +617,16 @@ class Board:
 
     def promote_pawn(self, promotion):
         """ Promote pawn """
-        player = self.selected.player
-        pawn = self.selected
+        self.replace_pawn(self.selected, promotion)
+        print('{} has promoted a pawn to {}'.format(self.selected.player, promotion))  # inform player of promotion
+
+    def replace_pawn(self, pawn, promotion):
+        """
+        Replaces a pawn on the last rank with a promotion piece without printing
+        :param pawn: Pawn, pawn to promote
+        :param promotion: string, name of promotion piece (ex. 'queen')
+        """
+        player = pawn.player
         promotions = [Queen, Rook, Bishop, Knight]
         for piece in promotions:
             if promotion == piece.name:
@@ -244,21 +635,112 @@ class Board:
         self.active_pieces[player].append(new_piece)  # new piece is in play
         self.active_pieces[player].remove(pawn)  # pawn is out of play
         self.board[pawn.position[0]][pawn.position[1]] = new_piece  # update board with new piece
-        print('{} has promoted a pawn to {}'.format(player, promotion))  # inform player of promotion
+        self.move_cache.invalidate([pawn.position])
+        self.version += 1
+        if self.history and packedmoves.end(self.history[-1]) == pawn.position:
+            # record promotion piece in the packed move that brought the pawn to the last rank
+            self.history[-1] |= packedmoves.promotion_flags(promotion) << 12
+
+    def resolve_move(self, move):
+        """
+        Packs a move of the player to move given in any supported form
+        :param move: int, packed move, or string, move in coordinate notation (ex. 'e2e4') or SAN (ex. 'Nf3')
+        :return: int or NoneType, packed move, None if the move can not be read or no piece of the player to move
+        stands on its start square
+        """
+        if isinstance(move, str):
+            if self.coordinate_move.match(move):
+                start = self.algebraic_to_index(move[:2])
+                if self.board[start[0]][start[1]] == 0:
+                    return None
+                return self.parse_move(move)
+            try:
+                return self.parse_san(move)
+            except ValueError:
+                return None
+        return move
+
+    def move_index(self):
+        """
+        Get the legal moves of the player to move keyed by piece type and destination, computed once per board state
+        and reused until the board changes
+        :return: Dict[Tuple(str, Tuple(row, col)):list of int], (piece type, destination) -> packed legal moves
+        """
+        key = (self.version, self.turn)
+        if key != self.legal_index_key:
+            index = {}
+            for move in self.generate_moves('white' if self.turn % 2 == 1 else 'black', packedmoves.new_buffer()):
+                start = packedmoves.start(move)
+                index.setdefault((self.board[start[0]][start[1]].name, packedmoves.end(move)), []).append(move)
+            self.legal_index = index
+            self.legal_index_key = key
+        return self.legal_index
+
+    def parse_san(self, san):
+        """
+        Converts a move in SAN to a packed legal move of the player to move, the move is looked up in the legal move
+        index by piece type and destination
+        :param san: string, move in SAN, check suffixes and annotations are ignored (ex. 'Nbd7', 'exd5', 'e8=Q+')
+        :return: int, packed move
+        """
+        match = SAN_PATTERN.match(san)
+        if match is None:
+            raise ValueError('unreadable move {}'.format(san))
+        letter, file, rank, destination, promotion = match.groups()
+        if promotion is not None:
+            promotion = packedmoves.PROMOTION_LETTERS[promotion.lower()]
+        name = self.san_piece_names[letter] if letter else 'pawn'
+        matches = [move for move in self.move_index().get((name, SQUARES[destination]), ())
+                   if packedmoves.promotion(move) == promotion and
+                   (file is None or packedmoves.start(move)[1] == self.alg_col_to_idx[file]) and
+                   (rank is None or packedmoves.start(move)[0] == self.alg_row_to_idx[int(rank)])]
+        if len(matches) != 1:
+            raise ValueError('{} move {}: {}'.format('illegal' if not matches else 'ambiguous', san, self.fen()))
+        return matches[0]
+
+    def apply_move(self, move):
+        """
+        Validates and plays a packed move of the player to move without printing, pawns reaching the last rank are
+        promoted to the flagged piece (queen if none)
+        :param move: int, packed move
+        :return: boolean, True if the move was legal and played, False otherwise (the board is unchanged)
+        """
+        start = packedmoves.start(move)
+        end = packedmoves.end(move)
+        piece = self.board[start[0]][start[1]]
+        if piece == 0 or piece.player != ('white' if self.turn % 2 == 1 else 'black') or \
+                end not in self.possible_moves(piece) or self.leaves_king_in_check(piece, end):
+            return False
+        promotion = packedmoves.promotion(move)
+        last_rank = piece.name == 'pawn' and end[0] in [0, 7]
+        if promotion is not None and not last_rank:
+            return False
+        self.move_piece(piece, end)
+        if last_rank:
+            self.replace_pawn(piece, promotion or 'queen')
+        return True
+
+    def apply_moves(self, moves):
+        """
+        Validates and plays a sequence of moves without printing, stops at the first illegal move
+        :param moves: iterable of packed moves or strings in coordinate notation or SAN (forms can be mixed)
+        :return: int or NoneType, index of the first illegal move (moves before it are played), None if every move
+        was played
+        """
+        for index, move in enumerate(moves):
+            move = self.resolve_move(move)
+            if move is None or not self.apply_move(move):
+                return index
+        return None
 
     def active_pieces_copy(self, exclude):
         """
         Return active pieces that excludes a piece. Used to exclude an opponent in simulate_move().
         :param exclude: chess piece to exclude
-        :return: Dict[str:list], active pieces
+        :return: Dict[str:PieceList], active pieces
         """
-        active_pieces = {'white': [], 'black': []}
-        for piece in self.active_pieces['white']:
-            if piece.position == exclude.position:
-                continue
-            active_pieces['white'].append(piece)
-        for piece in self.active_pieces['black']:
-            if piece.position == exclude.position:
-                continue
-            active_pieces['black'].append(piece)
+        active_pieces = {}
+        for player in ['white', 'black']:
+            active_pieces[player] = PieceList(piece for piece in self.active_pieces[player]
+                                              if piece.position != exclude.position)
         return active_pieces
@@ -0,0 +1,357 @@
+"""
+Distributes perft runs and position analysis over worker processes connected by TCP. The coordinator splits a perft
+at the root moves of a position (or a list of positions into chunks) and hands one task at a time to every connected
+worker. Workers can run on other hosts or on localhost. A task whose worker disconnects or does not answer within the
+task timeout goes back to the queue for another worker, up to MAX_ATTEMPTS times, so the merged results are complete
+as long as one worker survives. A task that raises on a worker is reported as failed rather than retried.
+
+Messages are single lines of JSON. A worker sends {"worker": name} once it connects, then receives tasks
+({"id", "kind", ...}) and answers each with {"id", "value", "nodes"}, or {"id", "error"} if the task raised.
+{"kind": "stop"} ends the worker.
+
+Usage:
+    python distributed.py perft --depth 5 --port 5555 --local-workers 4
+    python distributed.py analyze positions.txt --evaluator mobility --port 5555
+    python distributed.py worker coordinator-host:5555
+"""
+import argparse
+import collections
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+from board import Board
+from snapshot import BoardSnapshot, perft
+import packedmoves
+import sharedboard
+
+EVALUATORS = {'material': sharedboard.material, 'mobility': sharedboard.mobility}
+CHUNK_SIZE = 64  # positions per analysis task
+MAX_ATTEMPTS = 3  # times a task is handed out before the loss of its workers fails it
+
+
+def perft_tasks(board, depth):
+    """
+    Split a perft run at the root moves
+    :param board: Board, root position
+    :param depth: int, depth of the tree in plies (at least 1)
+    :return: list of dict, one task per legal root move
+    """
+    root = BoardSnapshot.from_board(board)
+    return [{'id': index, 'kind': 'perft', 'move': packedmoves.to_coordinate(move),
+             'fen': child.to_board().fen(), 'depth': depth - 1}
+            for index, (move, child) in enumerate(root.children())]
+
+
+def analysis_tasks(fens, evaluator, chunk_size=CHUNK_SIZE):
+    """
+    Split a list of positions into chunks
+    :param fens: list of strings, positions in FEN
+    :param evaluator: string, name of a built-in evaluator or 'module:function' of any evaluator(board) -> value
+    :param chunk_size: int, positions per task
+    :return: list of dict, one task per chunk
+    """
+    return [{'id': index, 'kind': 'analyze', 'fens': fens[start:start + chunk_size], 'evaluator': evaluator}
+            for index, start in enumerate(range(0, len(fens), chunk_size))]
+
+
+def resolve_evaluator(name):
+    """
+    Get an evaluator function by name
+    :param name: string, name of a built-in evaluator or 'module:function'
+    :return: function, evaluator(board) -> value
+    """
+    if name in EVALUATORS:
+        return EVALUATORS[name]
+    if ':' not in name:
+        raise ValueError('unknown evaluator {}'.format(name))
+    module, function = name.split(':', 1)
+    return getattr(importlib.import_module(module), function)
+
+
+def execute(task):
+    """
+    Run a task, called by workers
+    :param task: dict, task from perft_tasks() or analysis_tasks()
+    :return: (value, int), result of the task and number of nodes (leaf positions or evaluated positions)
+    """
+    if task['kind'] == 'perft':
+        nodes = perft(BoardSnapshot.from_board(Board.from_fen(task['fen'])), task['depth'])
+        return nodes, nodes
+    evaluator = resolve_evaluator(task['evaluator'])
+    return [evaluator(Board.from_fen(fen)) for fen in task['fens']], len(task['fens'])
+
+
+def send(stream, message):
+    stream.write(json.dumps(message) + '\n')
+    stream.flush()
+
+
+class Coordinator:
+    """ Hands out tasks to workers over TCP, reassigns the tasks of lost workers and merges the results """
+
+    def __init__(self, tasks, host='127.0.0.1', port=0, task_timeout=None, max_attempts=MAX_ATTEMPTS):
+        self.tasks = dict((task['id'], task) for task in tasks)  # task id -> task
+        self.pending = collections.deque(self.tasks)  # ids of tasks waiting for a worker
+        self.results = {}  # task id -> value
+        self.failures = {}  # task id -> error of tasks that failed on a worker or lost too many workers
+        self.attempts = collections.Counter()  # task id -> number of times the task was handed out
+        self.max_attempts = max_attempts  # times a task is handed out before the loss of its workers fails it
+        self.nodes = 0  # nodes of finished tasks
+        self.reassigned = 0  # number of tasks given back to the queue by lost workers
+        self.workers = {}  # worker name -> dict of statistics
+        self.task_timeout = task_timeout  # seconds a worker may take for a task before it is considered lost
+        self.condition = threading.Condition()  # guards the queue and results, notified when either changes
+        self.server = socket.create_server((host, port))
+        self.address = self.server.getsockname()[:2]  # (host, port) workers connect to
+        self.start = None
+
+    def next_task(self):
+        """
+        Wait for a pending task
+        :return: dict or NoneType, task to run, None once every task is finished
+        """
+        with self.condition:
+            while not self.pending and not self.finished():
+                # tasks of running workers may still come back to the queue
+                self.condition.wait()
+            if not self.pending:
+                return None
+            task_id = self.pending.popleft()
+            self.attempts[task_id] += 1
+            return self.tasks[task_id]
+
+    def finished(self):
+        """ :return: boolean, True once every task has a result or has failed """
+        return len(self.results) + len(self.failures) == len(self.tasks)
+
+    def requeue(self, task):
+        """ Give the task of a lost worker to another worker, unless it was already handed out max_attempts times """
+        with self.condition:
+            if self.attempts[task['id']] >= self.max_attempts:
+                self.failures[task['id']] = 'lost {} workers'.format(self.attempts[task['id']])
+            else:
+                self.pending.appendleft(task['id'])
+                self.reassigned += 1
+            self.condition.notify_all()
+
+    def fail(self, task, error):
+        """ Record a task that raised an error on a worker, it is not retried since it would fail again """
+        with self.condition:
+            if task['id'] not in self.results:
+                self.failures[task['id']] = error
+            self.condition.notify_all()
+
+    def complete(self, task, value, nodes):
+        with self.condition:
+            if task['id'] not in self.results:
+                self.results[task['id']] = value
+                self.nodes += nodes
+            self.condition.notify_all()
+
+    def serve(self, connection):
+        """
+        Run tasks on one connected worker until every task is finished or the worker is lost
+        :param connection: socket.socket, connection to the worker
+        """
+        stream = connection.makefile('rw')
+        task = None
+        try:
+            connection.settimeout(self.task_timeout)
+            name = json.loads(stream.readline())['worker']
+            with self.condition:
+                if name in self.workers:
+                    name = '{} ({})'.format(name, len(self.workers))
+                stats = self.workers[name] = {'tasks': 0, 'nodes': 0, 'busy': 0.0}
+            while True:
+                task = self.next_task()
+                if task is None:
+                    send(stream, {'kind': 'stop'})
+                    return
+                start = time.perf_counter()
+                send(stream, task)
+                reply = json.loads(stream.readline())
+                if not isinstance(reply, dict) or reply.get('id') != task['id']:
+                    raise ValueError('invalid answer to task {}'.format(task['id']))
+                if 'error' in reply:
+                    self.fail(task, str(reply['error']))
+                    task = None
+                    stats['busy'] += time.perf_counter() - start
+                    continue
+                self.complete(task, reply['value'], int(reply['nodes']))
+                task = None
+                stats['tasks'] += 1
+                stats['nodes'] += reply['nodes']
+                stats['busy'] += time.perf_counter() - start
+        except Exception:
+            # worker died, timed out or sent garbage (an empty line from a closed connection is invalid JSON)
+            pass
+        finally:
+            if task is not None:
+                self.requeue(task)
+            stream.close()
+            connection.close()
+
+    def accept(self):
+        """ Accept workers until the server socket is closed """
+        while True:
+            try:
+                connection, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.serve, args=(connection,), daemon=True).start()
+
+    def run(self, timeout=None):
+        """
+        Hand out every task and wait for the results
+        :param timeout: float, seconds to wait for the results (no limit if None)
+        :return: dict, 'results' (task id -> value), 'failures' (task id -> error of tasks that raised or lost
+        max_attempts workers), 'nodes', 'seconds', 'nodes_per_second', 'reassigned' and
+        'workers' (worker name -> 'tasks', 'nodes', 'busy' seconds and 'utilization', the busy share of the run)
+        """
+        self.start = time.perf_counter()
+        threading.Thread(target=self.accept, daemon=True).start()
+        try:
+            with self.condition:
+                if not self.condition.wait_for(self.finished, timeout):
+                    raise TimeoutError('{} of {} tasks finished'.format(len(self.results), len(self.tasks)))
+        finally:
+            self.server.close()
+        seconds = time.perf_counter() - self.start
+        workers = dict((name, dict(stats, utilization=stats['busy'] / seconds if seconds else 0.0))
+                       for name, stats in self.workers.items())
+        return {'results': dict(self.results), 'failures': dict(self.failures), 'nodes': self.nodes,
+                'seconds': seconds, 'nodes_per_second': self.nodes / seconds if seconds else 0.0,
+                'reassigned': self.reassigned, 'workers': workers}
+
+
+def run_worker(host, port, name=None, fail_after=None):
+    """
+    Connect to a coordinator and run tasks until it sends stop or closes the connection
+    :param host: string, coordinator host
+    :param port: int, coordinator port
+    :param name: string, worker name in the coordinator's report (host name and process id if None)
+    :param fail_after: int, drop the connection without answering the task after this many tasks (for testing)
+    :return: int, number of tasks run
+    """
+    if name is None:
+        name = '{}-{}'.format(socket.gethostname(), os.getpid())
+    count = 0
+    with socket.create_connection((host, port)) as connection, connection.makefile('rw') as stream:
+        send(stream, {'worker': name})
+        for line in stream:
+            task = json.loads(line)
+            if task['kind'] == 'stop' or count == fail_after:
+                break
+            try:
+                value, nodes = execute(task)
+            except Exception as error:
+                # report the failure instead of dying, the coordinator does not hand the task out again
+                send(stream, {'id': task['id'], 'error': '{}: {}'.format(type(error).__name__, error)})
+            else:
+                send(stream, {'id': task['id'], 'value': value, 'nodes': nodes})
+            count += 1
+    return count
+
+
+def start_local_workers(count, address):
+    """
+    Start worker processes on this host
+    :param count: int, number of workers
+    :param address: Tuple(host, port), coordinator address
+    :return: list of multiprocessing.Process
+    """
+    processes = [multiprocessing.Process(target=run_worker, args=address, daemon=True) for _ in range(count)]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def distributed_perft(board, depth, local_workers=0, host='127.0.0.1', port=0, task_timeout=None, timeout=None):
+    """
+    Run a perft split at the root moves over workers
+    :param board: Board, root position
+    :param depth: int, depth of the tree in plies (at least 1)
+    :param local_workers: int, number of worker processes started on this host, others connect to the port
+    :param host: string, interface the coordinator listens on
+    :param port: int, port the coordinator listens on (any free port if 0)
+    :param task_timeout: float, seconds a worker may take for a task before it is considered lost
+    :param timeout: float, seconds to wait for the results (no limit if None)
+    :return: dict, result of Coordinator.run() with 'total' leaf positions and 'moves' (root move -> leaves), raises
+    RuntimeError if a task failed
+    """
+    tasks = perft_tasks(board, depth)
+    coordinator = Coordinator(tasks, host, port, task_timeout)
+    processes = start_local_workers(local_workers, coordinator.address)
+    report = coordinator.run(timeout)
+    for process in processes:
+        process.join()
+    if report['failures']:
+        raise RuntimeError('perft tasks failed: {}'.format(report['failures']))
+    report['moves'] = dict((task['move'], report['results'][task['id']]) for task in tasks)
+    report['total'] = sum(report['moves'].values())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Distribute perft runs and position analysis over TCP workers')
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command in ['perft', 'analyze']:
+        job = commands.add_parser(command, help='run a coordinator for a {} job'.format(command))
+        job.add_argument('--host', default='127.0.0.1', help='interface to listen on (default: %(default)s)')
+        job.add_argument('--port', type=int, default=0, help='port to listen on (default: any free port)')
+        job.add_argument('--local-workers', type=int, default=0, help='worker processes to start locally')
+        job.add_argument('--task-timeout', type=float, help='seconds before a task is reassigned')
+        if command == 'perft':
+            job.add_argument('--fen', help='root position (default: starting position)')
+            job.add_argument('--depth', type=int, default=4, help='perft depth (default: %(default)s)')
+        else:
+            job.add_argument('positions', help='file with one FEN per line')
+            job.add_argument('--evaluator', default='material',
+                             help='built-in evaluator ({}) or module:function'.format(', '.join(EVALUATORS)))
+            job.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='positions per task')
+    worker = commands.add_parser('worker', help='run a worker')
+    worker.add_argument('address', help='coordinator address as host:port')
+    args = parser.parse_args(argv)
+
+    if args.command == 'worker':
+        host, port = args.address.rsplit(':', 1)
+        print('{} tasks run'.format(run_worker(host, int(port))))
+        return 0
+    if args.command == 'perft':
+        tasks = perft_tasks(Board.from_fen(args.fen) if args.fen else Board(), args.depth)
+    else:
+        with open(args.positions) as f:
+            fens = [line.strip() for line in f if line.strip()]
+        tasks = analysis_tasks(fens, args.evaluator, args.chunk_size)
+    coordinator = Coordinator(tasks, args.host, args.port, args.task_timeout)
+    print('listening on {}:{}'.format(*coordinator.address), flush=True)
+    processes = start_local_workers(args.local_workers, coordinator.address)
+    report = coordinator.run()
+    for process in processes:
+        process.join()
+    finished = [task for task in tasks if task['id'] in report['results']]
+    if args.command == 'perft':
+        for task in finished:
+            print('{}: {}'.format(task['move'], report['results'][task['id']]))
+        print('total: {}'.format(report['nodes']))
+    else:
+        for task in finished:
+            for fen, value in zip(task['fens'], report['results'][task['id']]):
+                print('{}\t{}'.format(fen, value))
+    for task_id, error in sorted(report['failures'].items()):
+        print('FAILED task {}: {}'.format(task_id, error))
+    print('{} nodes in {:.2f} s ({:.0f} nodes/sec), {} tasks reassigned'.format(
+        report['nodes'], report['seconds'], report['nodes_per_second'], report['reassigned']))
+    for name, stats in sorted(report['workers'].items()):
+        print('{:<24} {:>5} tasks {:>12} nodes {:>6.1%} busy'.format(name, stats['tasks'], stats['nodes'],
+                                                                     stats['utilization']))
+    return 1 if report['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Exports training data from played games. Games are replayed through Board and every position before a move is
+written to fixed-size shards of .npy files opened as memory maps, so memory use stays bounded by one shard no matter
+how many games are exported. Each shard holds four arrays of the same length:
+    planes   bool (n, 12, 8, 8), piece planes in the layout of attackmaps.py
+    side     int8 (n,), player to move, 0 for white and 1 for black
+    move     uint16 (n,), packed move played in the position
+    result   int8 (n,), game result, 1 if white won, -1 if black won and 0 for a draw
+
+A manifest.json next to the shards lists every shard with its number of positions. Exporting needs NumPy for the
+memory-mapped arrays, reading games and replaying them does not.
+
+Usage:
+    python exporter.py games.pgn --out data/ --shard-size 65536
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from board import Board
+import attackmaps
+import notation
+try:
+    import numpy
+    from numpy.lib.format import open_memmap
+except ImportError:
+    numpy = None
+
+SHARD_SIZE = 65536  # positions per shard
+RESULTS = {'1-0': 1, '0-1': -1, '1/2-1/2': 0}
+FIELDS = [('planes', 'bool', (12, 8, 8)), ('side', 'int8', ()), ('move', 'uint16', ()), ('result', 'int8', ())]
+
+
+class ShardWriter:
+    """ Writes positions to a sequence of memory-mapped shards, one shard is open at a time """
+
+    def __init__(self, directory, shard_size=SHARD_SIZE):
+        attackmaps.require_numpy()
+        self.directory = directory  # output directory
+        self.shard_size = shard_size  # positions per shard
+        self.shards = []  # List of Dict, name and number of positions of each finished shard
+        self.arrays = None  # Dict[str:numpy.memmap], arrays of the open shard
+        self.count = 0  # positions written to the open shard
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, index, field):
+        return os.path.join(self.directory, 'shard-{:05d}-{}.npy'.format(index, field))
+
+    def open(self):
+        """ Create the memory-mapped arrays of the next shard """
+        index = len(self.shards)
+        self.arrays = dict((field, open_memmap(self.path(index, field), mode='w+', dtype=dtype,
+                                               shape=(self.shard_size,) + shape))
+                           for field, dtype, shape in FIELDS)
+        self.count = 0
+
+    def write(self, squares, side, move, result):
+        """
+        Add a position
+        :param squares: list of Tuple(int, int, int), plane, row and column of every piece, from features()
+        :param side: int, player to move, 0 for white and 1 for black
+        :param move: int, packed move played in the position
+        :param result: int, game result (1, 0 or -1)
+        """
+        if self.arrays is None:
+            self.open()
+        row = self.count
+        planes = self.arrays['planes'][row]
+        for square in squares:
+            planes[square] = True
+        self.arrays['side'][row] = side
+        self.arrays['move'][row] = move
+        self.arrays['result'][row] = result
+        self.count += 1
+        if self.count == self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """ Write the open shard to disk and release its memory, a partly filled shard is trimmed to its length """
+        if self.arrays is None:
+            return
+        index = len(self.shards)
+        for field, _, _ in FIELDS:
+            array = self.arrays.pop(field)
+            array.flush()
+            if self.count < self.shard_size:
+                # copy the filled rows to a shard of the right length
+                trimmed = numpy.array(array[:self.count])
+                del array  # unmap the file before it is replaced
+                numpy.save(self.path(index, field), trimmed)
+        self.arrays = None
+        self.shards.append({'name': 'shard-{:05d}'.format(index), 'positions': self.count})
+
+    def close(self):
+        """ Flush the open shard and write the manifest """
+        self.flush()
+        with open(os.path.join(self.directory, 'manifest.json'), 'w') as f:
+            json.dump({'shards': self.shards, 'positions': sum(shard['positions'] for shard in self.shards),
+                       'fields': [field for field, _, _ in FIELDS]}, f, indent=2)
+
+
+def features(board):
+    """
+    :param board: Board, position to export
+    :return: (list of Tuple(int, int, int), int), plane, row and column of every piece and the player to move (0 for
+    white and 1 for black)
+    """
+    squares = [(attackmaps.plane(player, piece.name), piece.position[0], piece.position[1])
+               for player in attackmaps.PLAYERS for piece in board.active_pieces[player]]
+    return squares, 0 if board.turn % 2 == 1 else 1
+
+
+def export(games, directory, shard_size=SHARD_SIZE):
+    """
+    Replay games and export every position before a move
+    :param games: iterable of (moves, result), moves are packed moves or moves in SAN and result is a PGN result
+    string ('1-0', '0-1', '1/2-1/2' or '*', games without a result are skipped)
+    :param directory: string, output directory
+    :param shard_size: int, positions per shard
+    :return: dict, number of 'games', 'positions' and 'shards' exported, 'seconds' and 'positions_per_second'
+    :raises ValueError: if a game has an illegal move, the games before it are exported
+    """
+    writer = ShardWriter(directory, shard_size)
+    start = time.perf_counter()
+    games_exported = positions = 0
+    try:
+        for moves, result in games:
+            if result not in RESULTS:
+                continue
+            # collect the rows of the whole game while validating it, so an illegal move does not leave a partial
+            # game in the shards
+            board = Board()
+            rows = []
+            for ply, move in enumerate(moves):
+                move = board.resolve_move(move)
+                squares, side = features(board)
+                if move is None or not board.apply_move(move):
+                    raise ValueError('illegal move {} in game {}'.format(ply + 1, games_exported))
+                rows.append((squares, side, move))
+            for squares, side, move in rows:
+                writer.write(squares, side, move, RESULTS[result])
+            positions += len(rows)
+            games_exported += 1
+    finally:
+        # the games written so far are kept, even if a game or the game source raised
+        writer.close()
+    seconds = time.perf_counter() - start
+    return {'games': games_exported, 'positions': positions, 'shards': len(writer.shards), 'seconds': seconds,
+            'positions_per_second': positions / seconds if seconds else 0.0}
+
+
+def load(directory, index):
+    """
+    Open the arrays of a shard as read-only memory maps
+    :param directory: string, export directory
+    :param index: int, index of shard
+    :return: Dict[str:numpy.ndarray], field name -> array
+    """
+    attackmaps.require_numpy()
+    return dict((field, numpy.load(os.path.join(directory, 'shard-{:05d}-{}.npy'.format(index, field)),
+                                   mmap_mode='r'))
+                for field, _, _ in FIELDS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export positions of PGN games to memory-mapped .npy shards')
+    parser.add_argument('pgn', nargs='+', help='PGN files')
+    parser.add_argument('--out', required=True, help='output directory')
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help='positions per shard (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    def games():
+        for path in args.pgn:
+            with open(path) as f:
+                for _, moves, result in notation.read_pgn(f):
+                    yield moves, result
+
+    stats = export(games(), args.out, args.shard_size)
+    print('{} games, {} positions in {} shards, {:.1f} s ({:.0f} positions/sec)'.format(
+        stats['games'], stats['positions'], stats['shards'], stats['seconds'], stats['positions_per_second']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Generates random legal games at high volume and fuzzes the optimized code paths against their reference versions.
+Games are played through Board without printing and written either as PGN or in a compact binary form: a 4 byte
+magic header, then for every game one result byte, the number of plies as an unsigned 16-bit integer and the packed
+moves as little-endian unsigned 16-bit integers.
+
+In fuzz mode every position of every game is cross-checked:
+    make_unmake   leaves_king_in_check() (in place) against simulate_move() (board copy)
+    move_cache    cached possible moves against freshly generated ones
+    hash          incremental zobrist.move_hash() against hashing the child position from scratch
+    snapshot      Board.generate_moves() against BoardSnapshot.legal_moves()
+    staged        Board.iter_legal_moves() and has_legal_move() against filtering possible moves
+A mismatch is shrunk by removing pieces for as long as the check still fails, and reported with the minimal FEN.
+
+Usage:
+    python fuzz.py generate --games 100000 --out games.bin      # or --pgn games.pgn
+    python fuzz.py fuzz --games 200 --seed 1
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+import traceback
+from board import Board
+from snapshot import BoardSnapshot
+import notation
+import packedmoves
+import zobrist
+
+MAGIC = b'CHG1'
+GAME_HEADER = struct.Struct('<BH')  # result code, number of plies
+RESULT_CODES = {'*': 0, '1-0': 1, '0-1': 2, '1/2-1/2': 3}
+RESULTS = dict((code, result) for result, code in RESULT_CODES.items())
+MAX_PLIES = 300  # games longer than this are stopped without a result
+MAX_FAILURES = 10  # fuzzing stops after this many mismatches
+
+
+def play_random_game(rng, max_plies=MAX_PLIES, visit=None):
+    """
+    Play a random legal game without printing, pawns reaching the last rank are promoted to a random piece
+    :param rng: random.Random, random number generator
+    :param max_plies: int, length limit, longer games end without a result
+    :param visit: function, called with the board before every move (ex. to fuzz every position)
+    :return: (array('H'), string), packed moves and PGN result
+    """
+    board = Board()
+    moves = packedmoves.new_buffer()
+    while len(moves) < max_plies:
+        if visit is not None:
+            visit(board)
+        player = 'white' if board.turn % 2 == 1 else 'black'
+        legal = board.generate_moves(player)
+        if not legal:
+            king = board.kings[player]
+            if king.is_checked(king.position, board.board, board.active_pieces):
+                return moves, '0-1' if player == 'white' else '1-0'
+            return moves, '1/2-1/2'
+        if len(board.active_pieces['white']) == 1 and len(board.active_pieces['black']) == 1:
+            # only kings are left
+            return moves, '1/2-1/2'
+        move = legal[rng.randrange(len(legal))]
+        start = packedmoves.start(move)
+        piece = board.board[start[0]][start[1]]
+        board.move_piece(piece, packedmoves.end(move))  # move is legal, skip validation
+        if packedmoves.promotion(move) is not None:
+            board.replace_pawn(piece, packedmoves.promotion(move))
+        moves.append(board.history[-1])
+    return moves, '*'
+
+
+def write_binary(games, f):
+    """
+    Write games in the binary form
+    :param games: iterable of (array('H'), string), packed moves and result of each game
+    :param f: binary file object
+    :return: int, number of games written
+    """
+    f.write(MAGIC)
+    count = 0
+    for moves, result in games:
+        if sys.byteorder == 'big':
+            moves = packedmoves.new_buffer() + moves
+            moves.byteswap()
+        f.write(GAME_HEADER.pack(RESULT_CODES[result], len(moves)))
+        f.write(moves.tobytes())
+        count += 1
+    return count
+
+
+def read_binary(f):
+    """
+    Read games written by write_binary()
+    :param f: binary file object
+    :return: iterator of (array('H'), string), packed moves and result of each game
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError('not a binary game file')
+    while True:
+        header = f.read(GAME_HEADER.size)
+        if not header:
+            return
+        code, plies = GAME_HEADER.unpack(header)
+        moves = packedmoves.new_buffer()
+        moves.frombytes(f.read(plies * 2))
+        if sys.byteorder == 'big':
+            moves.byteswap()
+        yield moves, RESULTS[code]
+
+
+def player_to_move(board):
+    return 'white' if board.turn % 2 == 1 else 'black'
+
+
+def check_make_unmake(board):
+    """
+    Compare leaves_king_in_check() with simulate_move(), en passant moves are skipped since simulate_move() does not
+    remove the captured pawn
+    """
+    mismatches = []
+    for piece in list(board.active_pieces[player_to_move(board)]):
+        king = board.kings[piece.player]
+        for end in board.possible_moves(piece):
+            if piece.name == 'pawn' and piece.position[1] != end[1] and board.board[end[0]][end[1]] == 0:
+                continue
+            rows, active_pieces = board.simulate_move(piece, end)
+            expected = bool(king.is_checked(end if piece.name == 'king' else king.position, rows, active_pieces))
+            if board.leaves_king_in_check(piece, end) != expected:
+                mismatches.append('{}{}: leaves_king_in_check() is {}'.format(
+                    board.index_to_algebraic(piece.position), board.index_to_algebraic(end), not expected))
+    return mismatches
+
+
+def check_move_cache(board):
+    """ Compare cached possible moves with freshly generated ones """
+    mismatches = []
+    for player in ['white', 'black']:
+        for piece in board.active_pieces[player]:
+            fresh = piece.generate_possible_moves(board.board, piece.directions, turn=board.turn)
+            if piece.name == 'pawn':
+                fresh = fresh[0]
+            if sorted(board.possible_moves(piece)) != sorted(fresh):
+                mismatches.append('{} at {}: cached moves differ'.format(
+                    piece.name, board.index_to_algebraic(piece.position)))
+    return mismatches
+
+
+def check_hash(board):
+    """ Compare incremental hashes of every legal move with hashes of the child positions """
+    mismatches = []
+    key = zobrist.board_hash(board)
+    snapshot = BoardSnapshot.from_board(board)
+    for move, child in snapshot.children():
+        if zobrist.move_hash(key, board.board, board.turn, move) != zobrist.position_hash(child.rows, child.turn):
+            mismatches.append('{}: incremental hash differs'.format(packedmoves.to_coordinate(move)))
+    return mismatches
+
+
+def check_snapshot(board):
+    """ Compare Board.generate_moves() with BoardSnapshot.legal_moves() """
+    moves = sorted(board.generate_moves(player_to_move(board)))
+    expected = sorted(BoardSnapshot.from_board(board).legal_moves())
+    if moves != expected:
+        return ['generate_moves() differs from BoardSnapshot.legal_moves(): {}'.format(
+            ' '.join(packedmoves.to_coordinate(move) for move in sorted(set(moves) ^ set(expected))))]
+    return []
+
+
+def check_staged(board):
+    """
+    Compare the staged legal move generator, which every Board move generator is built on, and has_legal_move() with
+    every possible move that does not leave the king in check
+    """
+    player = player_to_move(board)
+    moves = sorted((piece.position, end) for piece in board.active_pieces[player]
+                   for end in board.possible_moves(piece) if not board.leaves_king_in_check(piece, end))
+    mismatches = []
+    if moves != sorted(board.iter_legal_moves(player)):
+        mismatches.append('iter_legal_moves() differs from the possible moves that do not leave the king in check')
+    if board.has_legal_move(player) != bool(moves):
+        mismatches.append('has_legal_move() is {}'.format(not moves))
+    return mismatches
+
+
+CHECKS = {'make_unmake': check_make_unmake, 'move_cache': check_move_cache, 'hash': check_hash,
+          'snapshot': check_snapshot, 'staged': check_staged}
+
+
+def is_valid(board):
+    """ Determine if a position can be reached, the player who just moved must not be in check """
+    opponent = 'black' if board.turn % 2 == 1 else 'white'
+    king = board.kings[opponent]
+    return not king.is_checked(king.position, board.board, board.active_pieces)
+
+
+def run_check(check, board):
+    """
+    Run a check, an exception counts as a mismatch so one crashing position does not end the whole run
+    :param check: function, check(board) -> list of mismatches
+    :param board: Board, position to check
+    :return: list of strings, mismatches, or the exception and the line that raised it if the check raised
+    """
+    try:
+        return check(board)
+    except Exception as error:
+        frame = traceback.extract_tb(error.__traceback__)[-1]
+        return ['raised {}: {}'.format(type(error).__name__, error),
+                'at {}:{} in {}()'.format(os.path.basename(frame.filename), frame.lineno, frame.name)]
+
+
+def shrink(fen, check):
+    """
+    Remove pieces from a failing position for as long as the check keeps failing (or raising)
+    :param fen: string, position in FEN that fails the check
+    :param check: function, check(board) -> list of mismatches
+    :return: string, FEN of the minimal failing position found
+    """
+    board = Board.from_fen(fen)
+    removed = True
+    while removed:
+        removed = False
+        pieces = [piece for row in board.board for piece in row if piece != 0]
+        for piece in pieces:
+            if piece.name == 'king':
+                continue
+            candidate = Board.from_fen(board.fen())
+            kept = [other for row in candidate.board for other in row
+                    if other != 0 and other.position != piece.position]
+            candidate = Board.from_pieces(kept, candidate.turn)
+            if is_valid(candidate) and run_check(check, candidate):
+                board = candidate
+                removed = True
+                break
+    return board.fen()
+
+
+def fuzz(games, seed=0, checks=None, max_plies=MAX_PLIES, max_failures=MAX_FAILURES):
+    """
+    Play random games and cross-check every position
+    :param games: int, number of games
+    :param seed: int, random seed
+    :param checks: list of strings, names of checks to run (all of CHECKS if None)
+    :param max_plies: int, length limit of each game
+    :param max_failures: int, stop after this many mismatches
+    :return: dict, number of 'games' and 'positions' checked, 'seconds' and 'failures' (list of dict holding the
+    'check', 'fen', shrunk 'minimal' FEN and mismatch 'details', a check that raises fails with the exception)
+    """
+    checks = dict((name, CHECKS[name]) for name in (checks or CHECKS))
+    rng = random.Random(seed)
+    failures = []
+    counts = {'games': 0, 'positions': 0}
+
+    def visit(board):
+        counts['positions'] += 1
+        for name, check in checks.items():
+            details = run_check(check, board)
+            if details and len(failures) < max_failures:
+                fen = board.fen()
+                failures.append({'check': name, 'fen': fen, 'minimal': shrink(fen, check), 'details': details})
+
+    start = time.perf_counter()
+    for _ in range(games):
+        play_random_game(rng, max_plies, visit)
+        counts['games'] += 1
+        if len(failures) >= max_failures:
+            break
+    return dict(counts, seconds=time.perf_counter() - start, failures=failures)
+
+
+def generate(games, seed=0, max_plies=MAX_PLIES):
+    """
+    :param games: int, number of games
+    :param seed: int, random seed
+    :param max_plies: int, length limit of each game
+    :return: iterator of (array('H'), string), packed moves and result of each game
+    """
+    rng = random.Random(seed)
+    for _ in range(games):
+        yield play_random_game(rng, max_plies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate random legal games and fuzz move generation')
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command in ['generate', 'fuzz']:
+        job = commands.add_parser(command, help='{} random games'.format(command))
+        job.add_argument('--games', type=int, default=100, help='number of games (default: %(default)s)')
+        job.add_argument('--seed', type=int, default=0, help='random seed (default: %(default)s)')
+        job.add_argument('--max-plies', type=int, default=MAX_PLIES, help='length limit of each game')
+        if command == 'generate':
+            output = job.add_mutually_exclusive_group(required=True)
+            output.add_argument('--out', help='binary output file')
+            output.add_argument('--pgn', help='PGN output file')
+        else:
+            job.add_argument('--check', action='append', choices=sorted(CHECKS), help='check to run (default: all)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'fuzz':
+        report = fuzz(args.games, args.seed, args.check, args.max_plies)
+        print('{} games, {} positions checked in {:.1f} s, {} mismatches'.format(
+            report['games'], report['positions'], report['seconds'], len(report['failures'])))
+        for failure in report['failures']:
+            print('{}: {}\n    minimal position: {}\n    {}'.format(
+                failure['check'], failure['fen'], failure['minimal'], '\n    '.join(failure['details'])))
+        return 1 if report['failures'] else 0
+
+    start = time.perf_counter()
+    plies = []
+
+    def games():
+        for moves, result in generate(args.games, args.seed, args.max_plies):
+            plies.append(len(moves))
+            yield moves, result
+
+    if args.out:
+        with open(args.out, 'wb') as f:
+            write_binary(games(), f)
+    else:
+        with open(args.pgn, 'w') as f:
+            for index, (moves, result) in enumerate(games()):
+                headers = {'Event': 'Random games', 'Round': str(index + 1), 'White': 'random', 'Black': 'random'}
+                f.write(notation.game_to_pgn(moves, headers, result))
+                f.write('\n')
+    seconds = time.perf_counter() - start
+    print('{} games, {} plies in {:.1f} s ({:.0f} games/sec, {:.0f} plies/sec)'.format(
+        len(plies), sum(plies), seconds, len(plies) / seconds, sum(plies) / seconds))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,19 @@
 Runs chess match through command line
 """
 from match import Match
+from ponder import Ponderer
+
+
+def select_or_play(match, text):
+    """
+    Select a piece or play a move in SAN, depending on the player's input
+    :param match: Match, match in progress
+    :param text: string, square of a piece to select (ex. 'e2') or move in SAN (ex. 'e4')
+    :return: string or NoneType, 'selected' or 'played', None if the input was invalid
+    """
+    if match.is_san(text):
+        return 'played' if match.play_san(text) else None
+    return 'selected' if match.select_piece(text) else None
 
 
 def main():
@@ -10,16 +23,31 @@ def main():
     print('Welcome to Chess!')
     print('This Chess program supports en passant moves and pawn promotion, but does NOT support castling')
     print()
-    match.white = input('Enter the name of player 1 (controls white): ')
-    match.black = input('Enter the name of player 2 (controls black): ')
+    computer = input('Enter the color the computer plays (white or black), or press enter for two players: ')
+    ponderer = Ponderer() if computer in ['white', 'black'] else None
+    match.white = 'Computer' if computer == 'white' else input('Enter the name of player 1 (controls white): ')
+    match.black = 'Computer' if computer == 'black' else input('Enter the name of player 2 (controls black): ')
     print('White goes first.')
     while not match.checkmate:
+        if match.turn == computer:
+            # computer's turn, answered at once if the human's move was pondered
+            move = ponderer.reply(match.chessboard)
+            if move is None:
+                print('Computer has no legal move. The game is a draw.')
+                break
+            match.play(move)
+            match.check()
+            match.switch_turns()
+            continue
         print('-' * 30)
         print()
         print("{}'s turn ({}-{})".format(match.white, match.turn, match.notation[match.turn])) \
             if match.turn == 'white' \
             else print("{}'s turn ({}-{})".format(match.black, match.turn, match.notation[match.turn]))
         match.chessboard.print()
+        if ponderer is not None:
+            # search the human's likely replies while the prompt is open
+            ponderer.start(match.chessboard)
         move = 'back'
         while move == 'back':
             # loop for when player wants to select different piece
@@ -27,16 +55,25 @@ def main():
                 # player's king is in check
                 print('{}\'s king is in check'.format(match.white if match.turn == 'white' else match.black))
                 match.incheck = False
-            position = input('Select a piece to move using algebraic notation (ex. \'a1\'): ')
-            while not match.select_piece(position):
-                # loop to ensure player inputs valid board position in algebraic notation
-                position = input('Select a piece to move using algebraic notation (ex. \'a1\'): ')
+            position = input('Select a piece to move using algebraic notation (ex. \'a1\') '
+                             'or enter a move in SAN (ex. \'Nf3\'): ')
+            if ponderer is not None:
+                ponderer.stop()
+            action = select_or_play(match, position)
+            while action is None:
+                # loop to ensure player inputs a valid board position or a legal move in SAN
+                position = input('Select a piece to move using algebraic notation (ex. \'a1\') '
+                                 'or enter a move in SAN (ex. \'Nf3\'): ')
+                action = select_or_play(match, position)
+            if action == 'played':
+                # move in SAN was played, promotions are given in the move (ex. 'e8=Q')
+                break
             move = input('Enter a move in algebraic notation (ex. \'a1\') or enter "back" to pick a different piece: ')
             while move != 'back' and not match.move(move):
                 # loop to ensure player is making a valid move
                 move = input('Enter a move in algebraic notation (ex. \'a1\') '
                              'or enter "back" to pick a different piece: ')
-        if match.is_pawn_promotion():
+        if action == 'selected' and match.is_pawn_promotion():
             # player is eligible to promote a pawn
             print("{} is eligible to promote a pawn to one of {}.".format(match.turn, promotions))
             promotion = input('Enter desired promotion from list above: ')
@@ -45,6 +82,8 @@ def main():
             match.promote_pawn(promotion)
         match.check()  # determine check or checkmate exists
         match.switch_turns()  # switch turns
+    if ponderer is not None:
+        print(ponderer.report())
 
 
 if __name__ == '__main__':
@@ -1,13 +1,14 @@
 """
 Defines class for Chess match
 """
-from board import Board
+from board import Board, SQUARES, SAN_PATTERN
+import packedmoves
 
 
 class Match:
     notation = {'white': 'uppercase', 'black': 'lowercase'}  # piece representation in command line
 
-    def __init__(self):
+    def __init__(self, cache=None):
         self.turn = 'white'  # white player moves first
         self.not_turn = 'black'
         self.chessboard = Board()
@@ -15,6 +16,8 @@ class Match:
         self.black = None  # black player's name
         self.checkmate = False
         self.incheck = False
+        self.cache = cache  # PositionCache for check verdicts, can be shared by many matches (no caching if None)
+        self.spectators = None  # spectate.Broadcaster the moves are published to (not published if None)
 
     def select_piece(self, position):
         """
@@ -22,14 +25,8 @@ class Match:
         :param position: string, position of Chess square requested by player in algebraic notation
         :return: boolean, True if selection occurred successfully, False otherwise
         """
-        files = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']  # chessboard columns
-        ranks = ['1', '2', '3', '4', '5', '6', '7', '8']  # chessboard rows
-
         # ensure position is on the chessboard
-        if len(position) != 2:
-            print('Incorrect notation. Please try again.')
-            return False
-        elif position[0] not in files or position[1] not in ranks:
+        if position not in SQUARES:
             print('Incorrect notation. Please try again.')
             return False
 
@@ -64,13 +61,101 @@ class Match:
         else:
             return False
 
+    def is_san(self, text):
+        """
+        Determine if player input is a move in SAN rather than the square of a piece to select. A square holding a
+        piece of the player to move is a selection, any other input in the form of SAN is a move (ex. 'e4' at the
+        start of the game).
+        :param text: string, player input
+        :return: boolean, True if the input should be played as a move in SAN
+        """
+        if SAN_PATTERN.match(text) is None:
+            return False
+        piece = self.chessboard.get_piece(text) if text in SQUARES else 0
+        return piece == 0 or piece.player != self.turn
+
+    def play_san(self, san):
+        """
+        Attempt to execute a move in Standard Algebraic Notation requested by the player
+        :param san: string, move in SAN (ex. 'Nf3', 'exd5', 'e8=Q', 'Rad1', 'Qh5+')
+        :return: boolean, True if move executed successfully, False otherwise
+        """
+        try:
+            move = self.chessboard.parse_san(san)
+        except ValueError as error:
+            if str(error).startswith('ambiguous'):
+                print('INVALID. {} could be played by more than one piece, add its file or rank.'.format(san))
+            else:
+                print('INVALID. {} is not a legal move. Please try again.'.format(san))
+            return False
+        self.chessboard.play(move)
+        print('You successfully played {}.'.format(san))
+        return True
+
+    def play(self, move):
+        """
+        Execute a packed move chosen by the computer, pawns reaching the last rank are promoted to the flagged piece
+        :param move: int, packed move
+        :return: boolean, True if move executed successfully, False otherwise
+        """
+        if self.chessboard.play(move):
+            print('{} moved {}.'.format(self.white if self.turn == 'white' else self.black,
+                                        packedmoves.to_coordinate(move)))
+            return True
+        return False
+
+    def apply_batch(self, moves):
+        """
+        Validate and play a sequence of moves without printing, stops at the first illegal move. Turn, check and
+        checkmate are updated once for the resulting position.
+        :param moves: iterable of packed moves or strings in coordinate notation or SAN (ex. ['e2e4', 'e5', 'Nf3'])
+        :return: int or NoneType, index of the first illegal move (moves before it are played), None if every move
+        was played
+        """
+        index = self.chessboard.apply_moves(moves)
+        self.turn, self.not_turn = ('white', 'black') if self.chessboard.turn % 2 == 1 else ('black', 'white')
+        check = self.verdict(self.turn)
+        self.incheck = check == 'check'
+        self.checkmate = check == 'checkmate'
+        self.publish()
+        return index
+
+    @classmethod
+    def apply_batches(cls, matches, batches):
+        """
+        Play move batches of many games, a match is created for every game id that is not in matches yet
+        :param matches: Dict, game id -> Match, matches in progress (updated in place)
+        :param batches: iterable of (game id, moves), moves as accepted by apply_batch(), a game id can repeat
+        :return: Dict, game id -> index of the first illegal move of the game's last batch, None if it was played
+        """
+        results = {}
+        for game, moves in batches:
+            match = matches.get(game)
+            if match is None:
+                match = matches[game] = cls()
+            results[game] = match.apply_batch(moves)
+        return results
+
+    def highlights(self):
+        """
+        Get the squares the selected Chess piece can legally move to, computed when the piece was selected
+        :return: list of strings, board positions in algebraic notation
+        """
+        return sorted(self.chessboard.index_to_algebraic(position) for position in self.chessboard.legal_destinations())
+
     def switch_turns(self):
-        """ Switch player turn """
+        """ Switch player turn, the move just completed (including its promotion) is published to spectators """
         self.turn, self.not_turn = self.not_turn, self.turn
+        self.publish()
+
+    def publish(self):
+        """ Publish the moves played since the last call to the match's spectators """
+        if self.spectators is not None:
+            self.spectators.publish(self.chessboard)
 
     def check(self):
         """ Determine if board state is checkmate or king is in check. Informs players of check or checkmate. """
-        check = self.chessboard.check(self.not_turn)
+        check = self.verdict(self.not_turn)
         if check == 'check':
             self.incheck = True
             print('{} has checked {}'.format(self.turn, self.not_turn))
@@ -78,6 +163,18 @@ class Match:
             print("Checkmate! {} wins the game!".format(self.black if self.turn == 'black' else self.white))
             self.checkmate = True
 
+    def verdict(self, player):
+        """
+        Determine if a player is in check or checkmate, the verdict is looked up in the position cache if the match
+        has one and the player is to move
+        :param player: string, 'white' or 'black'
+        :return: string or boolean, 'check' or 'checkmate', False otherwise (stalemate is not reported)
+        """
+        if self.cache is not None and player == ('white' if self.chessboard.turn % 2 == 1 else 'black'):
+            verdict = self.cache.verdict(self.chessboard)
+            return verdict if verdict in ['check', 'checkmate'] else False
+        return self.chessboard.check(player)
+
     def is_pawn_promotion(self):
         return self.chessboard.is_pawn_promotion()
 
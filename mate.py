@@ -0,0 +1,249 @@
+"""
+Proof-number search for forced mates. The attacker is the player to move at the root, a position is proven if the
+attacker can force checkmate within the move limit and disproven if the defender can avoid it. Positions are
+BoardSnapshots so the search never changes a Board, and positions reached by different move orders share one node
+through a transposition table keyed by Zobrist hash and remaining depth.
+
+Usage:
+    python mate.py "FEN" --moves 3               # search for a mate in up to 3 moves
+    python mate.py --puzzles                     # solve the bundled mate puzzles and print solve times
+"""
+import argparse
+import sys
+import time
+from board import Board
+from snapshot import BoardSnapshot
+import notation
+import zobrist
+
+INFINITY = 10 ** 9
+MAX_NODES = 200000  # default node budget
+
+# bundled mate puzzles: name -> (FEN, number of moves to mate)
+PUZZLES = {
+    'back_rank': ('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1', 1),
+    'scholars_mate': ('r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w - - 4 4', 1),
+    'smothered': ('6rk/6pp/8/6N1/8/8/8/6K1 w - - 0 1', 1),
+    'queen_and_king': ('7k/8/5K2/8/8/8/8/1Q6 w - - 0 1', 2),
+    'rook_roller': ('6k1/8/8/8/8/8/R7/1R4K1 w - - 0 1', 2),
+    'arabian': ('7k/7p/5N2/8/8/8/8/R5K1 w - - 0 1', 2),
+    'king_and_rook': ('4k3/8/8/4K3/8/8/8/R7 w - - 0 1', 3),
+    'rook_ladder': ('6k1/8/8/6K1/8/8/8/R7 w - - 0 1', 3),
+}
+
+
+class Node:
+    """ Position in the proof tree """
+    __slots__ = ['snapshot', 'depth', 'attacker', 'proof', 'disproof', 'children', 'distance']
+
+    def __init__(self, snapshot, depth, attacker):
+        self.snapshot = snapshot  # BoardSnapshot of the position
+        self.depth = depth  # plies left to deliver mate
+        self.attacker = attacker  # True if the attacker is to move (OR node), False for the defender (AND node)
+        self.proof = 1  # proof number, least number of leaves to expand to prove the mate
+        self.disproof = 1  # disproof number, least number of leaves to expand to disprove the mate
+        self.children = None  # List of (packed move, Node) once expanded
+        self.distance = None  # plies to mate once proven
+
+    def update(self):
+        """ Recompute proof and disproof numbers from the children """
+        if self.attacker:
+            # attacker needs one proven move, the defender must refute every move
+            self.proof = min(child.proof for _, child in self.children)
+            self.disproof = min(INFINITY, sum(child.disproof for _, child in self.children))
+        else:
+            self.proof = min(INFINITY, sum(child.proof for _, child in self.children))
+            self.disproof = min(child.disproof for _, child in self.children)
+
+
+class MateSearch:
+    """ Proof-number search for a forced mate from one root position """
+
+    def __init__(self, snapshot, moves, max_nodes=MAX_NODES, deadline=None):
+        self.max_nodes = max_nodes  # number of nodes the search may expand
+        self.deadline = deadline  # time.perf_counter() value after which the search gives up
+        self.table = {}  # (Zobrist hash, plies left) -> Node, transposition table
+        self.nodes = 0  # number of expanded nodes
+        self.root = self.node(snapshot, 2 * moves - 1, True)
+
+    def node(self, snapshot, depth, attacker):
+        """
+        Get the node of a position from the transposition table, creating it if it is new
+        :param snapshot: BoardSnapshot, position
+        :param depth: int, plies left to deliver mate
+        :param attacker: boolean, True if the attacker is to move
+        :return: Node
+        """
+        key = (zobrist.position_hash(snapshot.rows, snapshot.turn), depth)
+        node = self.table.get(key)
+        if node is None:
+            node = self.table[key] = Node(snapshot, depth, attacker)
+        return node
+
+    def expand(self, node):
+        """
+        Generate the children of a leaf, or mark the leaf as proven or disproven if the game ends there
+        :param node: Node, unexpanded node
+        """
+        self.nodes += 1
+        snapshot = node.snapshot
+        if node.attacker and node.depth == 1:
+            # last attacker move, only checks can mate
+            defender = snapshot.opponent
+            children = [(move, child) for move, child in snapshot.children() if child.is_checked(defender)]
+        elif node.depth == 0:
+            # no plies left, the defender is either checkmated or escaped
+            children = []
+        else:
+            children = list(snapshot.children())
+        if not children:
+            mated = not node.attacker and snapshot.is_checkmate()
+            node.proof, node.disproof = (0, INFINITY) if mated else (INFINITY, 0)
+            node.distance = 0 if mated else None
+            node.children = []
+            return
+        node.children = [(move, self.node(child, node.depth - 1, not node.attacker)) for move, child in children]
+        node.update()
+
+    def select(self):
+        """
+        Descend from the root to the most proving leaf
+        :return: list of Node, path from the root to the leaf
+        """
+        path = [self.root]
+        node = self.root
+        while node.children:
+            node.update()  # children shared through the transposition table may have changed
+            if node.attacker:
+                node = min(node.children, key=lambda item: item[1].proof)[1]
+            else:
+                node = min(node.children, key=lambda item: item[1].disproof)[1]
+            path.append(node)
+        return path
+
+    def run(self):
+        """
+        Search until the root is proven or disproven or the budget is used up
+        :return: boolean or NoneType, True if mate is forced, False if it is not, None if the budget ran out
+        """
+        while self.root.proof != 0 and self.root.disproof != 0:
+            if self.nodes >= self.max_nodes or (self.deadline is not None and time.perf_counter() > self.deadline):
+                return None
+            path = self.select()
+            self.expand(path[-1])
+            for node in reversed(path[:-1]):
+                node.update()
+        return self.root.proof == 0
+
+    def distance(self, node):
+        """
+        Number of plies to mate from a proven node, the attacker mates as fast as possible and the defender delays
+        :param node: Node, proven node
+        :return: int, plies to mate
+        """
+        if node.distance is None:
+            distances = [self.distance(child) for _, child in node.children if child.proof == 0]
+            node.distance = 1 + (min(distances) if node.attacker else max(distances))
+        return node.distance
+
+    def line(self):
+        """
+        :return: list of int, packed moves of the mating line from the root of a proven search
+        """
+        moves = []
+        node = self.root
+        while node.children:
+            choose = min if node.attacker else max
+            move, node = choose(((move, child) for move, child in node.children if child.proof == 0),
+                                key=lambda item: self.distance(item[1]))
+            moves.append(move)
+        return moves
+
+
+def solve(position, moves, max_nodes=MAX_NODES, seconds=None):
+    """
+    Search for a forced mate in up to a number of moves, shorter mates are tried first
+    :param position: Board, BoardSnapshot or FEN string, the player to move is the attacker
+    :param moves: int, largest number of attacker moves to mate in
+    :param max_nodes: int, node budget of the whole search
+    :param seconds: float, time budget of the whole search (no limit if None)
+    :return: dict, 'result' ('mate', 'no mate' or 'unknown'), 'mate_in' (attacker moves), 'line' (packed moves
+    of the mating line), 'nodes' (expanded nodes) and 'seconds'
+    """
+    if isinstance(position, str):
+        position = Board.from_fen(position)
+    if isinstance(position, Board):
+        position = BoardSnapshot.from_board(position)
+    start = time.perf_counter()
+    deadline = start + seconds if seconds is not None else None
+    nodes = 0
+    result = {'result': 'no mate', 'mate_in': None, 'line': []}
+    for depth in range(1, moves + 1):
+        search = MateSearch(position, depth, max_nodes - nodes, deadline)
+        proven = search.run()
+        nodes += search.nodes
+        if proven:
+            line = search.line()
+            result = {'result': 'mate', 'mate_in': (len(line) + 1) // 2, 'line': line}
+            break
+        if proven is None:
+            result['result'] = 'unknown'
+            break
+    result['nodes'] = nodes
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def line_to_san(position, line):
+    """
+    :param position: Board, BoardSnapshot or FEN string, root position of the line
+    :param line: list of int, packed moves
+    :return: list of strings, moves in SAN
+    """
+    if isinstance(position, BoardSnapshot):
+        position = position.to_board()
+    board = Board.from_fen(position) if isinstance(position, str) else Board.from_fen(position.fen())
+    sans = []
+    for move in line:
+        opponent = 'black' if board.turn % 2 == 1 else 'white'
+        san = notation.move_to_san(board, move)
+        notation.play_move(board, move)
+        sans.append(san + notation.check_suffix(board, opponent))
+    return sans
+
+
+def solve_puzzles(max_nodes=MAX_NODES):
+    """
+    Solve the bundled mate puzzles
+    :param max_nodes: int, node budget per puzzle
+    :return: Dict[str:dict], puzzle name -> result of solve()
+    """
+    return dict((name, solve(fen, moves, max_nodes)) for name, (fen, moves) in PUZZLES.items())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Search for forced mates with proof-number search')
+    parser.add_argument('fen', nargs='?', help='position in FEN, the player to move is the attacker')
+    parser.add_argument('--moves', type=int, default=3, help='largest number of moves to mate in (default: 3)')
+    parser.add_argument('--nodes', type=int, default=MAX_NODES, help='node budget (default: %(default)s)')
+    parser.add_argument('--seconds', type=float, help='time budget')
+    parser.add_argument('--puzzles', action='store_true', help='solve the bundled mate puzzles')
+    args = parser.parse_args(argv)
+
+    if args.puzzles:
+        for name, result in solve_puzzles(args.nodes).items():
+            print('{:<16} {:<8} mate in {}  {:>7} nodes {:>9.1f} ms  {}'.format(
+                name, result['result'], result['mate_in'], result['nodes'], result['seconds'] * 1000,
+                ' '.join(line_to_san(PUZZLES[name][0], result['line']))))
+        return 0
+    if args.fen is None:
+        parser.error('a FEN or --puzzles is required')
+    result = solve(args.fen, args.moves, args.nodes, args.seconds)
+    print('{} ({} nodes, {:.1f} ms)'.format(result['result'], result['nodes'], result['seconds'] * 1000))
+    if result['line']:
+        print('mate in {}: {}'.format(result['mate_in'], ' '.join(line_to_san(args.fen, result['line']))))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
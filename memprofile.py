@@ -0,0 +1,177 @@
+"""
+Measures the memory footprint of game state. Sizes are found two ways: deep_size() walks an object graph and adds
+up sys.getsizeof() of every object reached once (classes, functions and modules are not counted, they are shared by
+every game), and tracemalloc measures the bytes actually allocated while an object is built or a game is played.
+
+The report covers a Board, a Match, one simulated position (a simulate_move() copy and a BoardSnapshot child, whose
+unchanged rows and pieces are shared with its parent), the move history of a game and the peak memory of replaying
+a full game. check_budget() compares a report against byte budgets, benchmark.py --memory-budget runs it.
+
+Usage:
+    python memprofile.py                                     # print the report
+    python memprofile.py --budget board=40000 --budget game_peak=500000
+"""
+import argparse
+import random
+import sys
+import tracemalloc
+import types
+from board import Board
+from match import Match
+from snapshot import BoardSnapshot
+import fuzz
+
+# report item -> budget in bytes, items over budget fail check_budget()
+BUDGETS = {
+    'board': 32000,
+    'match': 4000,
+    'simulated_position': 40000,
+    'snapshot_child': 4000,
+    'history_per_ply': 4,
+    'game_peak': 256000,
+}
+SKIPPED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_size(obj, seen=None):
+    """
+    Add up the sizes of an object and every object it references, each object is counted once
+    :param obj: object to measure
+    :param seen: set of int, ids of objects already counted (ex. objects shared with a parent), updated in place
+    :return: int, size in bytes
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        if hasattr(obj, '__dict__'):
+            stack.append(obj.__dict__)
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(obj, name):
+                    stack.append(getattr(obj, name))
+    return size
+
+
+def allocated(build):
+    """
+    Measure the memory allocated by a function with tracemalloc
+    :param build: function, called without arguments, its result is kept alive until it is measured
+    :return: (int, int), bytes still allocated after the call and peak bytes during the call
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = build()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+        return current - before, peak - before
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def replay(moves):
+    """
+    Replay a game evaluating check after every move like a match does
+    :param moves: list of int, packed moves
+    :return: Board, board state at the end of the game
+    """
+    board = Board()
+    for move in moves:
+        board.apply_move(move)
+        board.check('white' if board.turn % 2 == 1 else 'black')
+    return board
+
+
+def profile(seed=0, plies=120):
+    """
+    Measure the footprint of game state
+    :param seed: int, seed of the random game used for the simulated position, history and peak measurements
+    :param plies: int, length limit of the random game
+    :return: Dict[str:int], report item -> bytes
+    """
+    moves, _ = fuzz.play_random_game(random.Random(seed), plies)
+    midgame = Board()
+    midgame.apply_moves(moves[:len(moves) // 2])
+    piece = next(piece for piece in midgame.active_pieces['white'] if midgame.possible_moves(piece))
+    end = midgame.possible_moves(piece)[0]
+    parent = BoardSnapshot.from_board(midgame)
+    child = next(child for _, child in parent.children())
+    shared = set()
+    deep_size(parent, shared)
+    finished = replay(moves)
+    return {
+        'board': deep_size(Board()),
+        'match': deep_size(Match()),
+        'piece': deep_size(piece),
+        'simulated_position': deep_size(midgame.simulate_move(piece, end)),
+        'snapshot': deep_size(parent),
+        'snapshot_child': deep_size(child, shared),
+        'history': sys.getsizeof(finished.history),
+        'history_per_ply': (sys.getsizeof(finished.history) - sys.getsizeof(Board().history)) / len(moves),
+        'board_allocated': allocated(Board)[0],
+        'game_peak': allocated(lambda: replay(moves))[1],
+    }
+
+
+def check_budget(report, budgets=None):
+    """
+    Compare a report against byte budgets
+    :param report: Dict[str:int], report from profile()
+    :param budgets: Dict[str:int], report item -> budget in bytes (BUDGETS if None)
+    :return: List of Tuple(name, bytes, budget), items over budget
+    """
+    budgets = BUDGETS if budgets is None else budgets
+    return [(name, report[name], budget) for name, budget in budgets.items()
+            if name in report and report[name] > budget]
+
+
+def parse_budgets(items):
+    """
+    :param items: list of strings, budgets as 'name=bytes'
+    :return: Dict[str:int], BUDGETS updated with the given budgets
+    """
+    budgets = dict(BUDGETS)
+    for item in items or []:
+        name, value = item.split('=')
+        budgets[name] = int(value)
+    return budgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report the memory footprint of game state')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random game (default: %(default)s)')
+    parser.add_argument('--plies', type=int, default=120, help='length limit of the random game')
+    parser.add_argument('--budget', action='append', metavar='NAME=BYTES', help='override a budget')
+    args = parser.parse_args(argv)
+
+    report = profile(args.seed, args.plies)
+    budgets = parse_budgets(args.budget)
+    for name, value in report.items():
+        line = '{:<20} {:>12,.0f} bytes'.format(name, value)
+        if name in budgets:
+            line += '   budget {:>12,} bytes'.format(budgets[name])
+        print(line)
+    over = check_budget(report, budgets)
+    for name, value, budget in over:
+        print('OVER BUDGET: {} uses {:,.0f} bytes, budget is {:,}'.format(name, value, budget))
+    return 1 if over else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Defines class for caching the possible moves of chess pieces on a board
+"""
+
+
+class MoveCache:
+    """
+    Stores the possible moves (not accounting for check) of each chess piece on a board. Every entry records the
+    squares its moves depend on: the squares along a slider's rays up to and including the first blocker, the
+    target squares of knights and kings, and the squares in front of and beside pawns. When squares change, only
+    entries that depend on them are dropped.
+
+    The cache is kept up to date by Board methods. Code that edits Board.board directly must call clear().
+    """
+
+    def __init__(self, board, debug=False):
+        self.board = board  # Board instance whose pieces are cached
+        self.debug = debug  # set to True to check every cache hit against freshly generated moves
+        self.entries = {}  # chess piece -> (Tuple of moves, Tuple of dependency squares, turn or None)
+        self.watchers = {}  # Tuple(row, col) -> set of chess pieces whose moves depend on the square
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def moves(self, piece):
+        """
+        Get possible moves of a chess piece, from the cache if the entry is still valid
+        :param piece: chess piece in play on the cached board
+        :return: Tuple of Tuple(row, col), space of possible board positions the piece can take
+        """
+        entry = self.entries.get(piece)
+        if entry is not None and (entry[2] is None or entry[2] == self.board.turn):
+            self.hits += 1
+            if self.debug:
+                self.verify(piece, entry[0])
+            return entry[0]
+        if entry is not None:
+            # en passant availability of the pawn depends on the turn
+            self.discard(piece)
+        self.misses += 1
+        moves = self.generate(piece)
+        dependencies, turn_sensitive = self.dependencies(piece)
+        self.entries[piece] = (moves, dependencies, self.board.turn if turn_sensitive else None)
+        for square in dependencies:
+            self.watchers.setdefault(square, set()).add(piece)
+        return moves
+
+    def generate(self, piece):
+        """
+        Generate possible moves of a chess piece on the cached board
+        :param piece: chess piece in play on the cached board
+        :return: Tuple of Tuple(row, col), space of possible board positions the piece can take
+        """
+        board = self.board
+        if piece.name == 'pawn':
+            # special pawn case
+            possible_moves, _ = piece.generate_possible_moves(board.board, piece.directions, turn=board.turn)
+            return tuple(possible_moves)
+        return tuple(piece.generate_possible_moves(board.board, piece.directions, turn=board.turn))
+
+    def dependencies(self, piece):
+        """
+        Get the squares a chess piece's possible moves depend on
+        :param piece: chess piece in play on the cached board
+        :return: (Tuple of Tuple(row, col), boolean), dependency squares and True if moves depend on the turn
+        """
+        board = self.board.board
+        row, col = piece.position
+        squares = [piece.position]
+        turn_sensitive = False
+        if piece.name == 'pawn':
+            step = -1 if piece.player == 'white' else 1
+            offsets = [(step, 0), (2 * step, 0), (step, 1), (step, -1), (0, 1), (0, -1)]
+            for y, x in offsets:
+                if 0 <= row + y <= 7 and 0 <= col + x <= 7:
+                    squares.append((row + y, col + x))
+            for x in [1, -1]:
+                # an adjacent opponent pawn may allow en passant depending on the turn
+                if 0 <= col + x <= 7:
+                    adjacent = board[row][col + x]
+                    if adjacent != 0 and adjacent.name == 'pawn' and adjacent.player != piece.player:
+                        turn_sensitive = True
+        elif piece.name == 'knight':
+            for y, x in piece.knight_steps:
+                if 0 <= row + y <= 7 and 0 <= col + x <= 7:
+                    squares.append((row + y, col + x))
+        else:
+            # walk each ray up to and including the first occupied square
+            for direction in piece.directions:
+                y, x = piece.cardinal[direction]
+                square = (row + y, col + x)
+                count = 1
+                while 0 <= square[0] <= 7 and 0 <= square[1] <= 7 and count <= piece.max_moves:
+                    squares.append(square)
+                    if board[square[0]][square[1]] != 0:
+                        break
+                    square = (square[0] + y, square[1] + x)
+                    count += 1
+        return tuple(squares), turn_sensitive
+
+    def verify(self, piece, moves):
+        """
+        Debug check of cached moves against freshly generated moves
+        :param piece: chess piece in play on the cached board
+        :param moves: Tuple of Tuple(row, col), cached moves of the piece
+        """
+        fresh = self.generate(piece)
+        if sorted(fresh) != sorted(moves):
+            raise RuntimeError('stale move cache for {} {} at {}: cached {}, generated {}'.format(
+                piece.player, piece.name, piece.position, sorted(moves), sorted(fresh)))
+
+    def discard(self, piece):
+        """
+        Drop the cache entry of a chess piece
+        :param piece: chess piece
+        """
+        entry = self.entries.pop(piece, None)
+        if entry is not None:
+            self.invalidations += 1
+            for square in entry[1]:
+                self.watchers[square].discard(piece)
+
+    def invalidate(self, squares):
+        """
+        Drop cache entries of chess pieces whose moves depend on changed squares
+        :param squares: iterable of Tuple(row, col), squares whose occupant changed
+        """
+        for square in squares:
+            for piece in list(self.watchers.get(square, ())):
+                self.discard(piece)
+
+    def clear(self):
+        """ Drop all cache entries """
+        self.entries = {}
+        self.watchers = {}
@@ -0,0 +1,172 @@
+"""
+Converts packed moves to Standard Algebraic Notation (SAN) and games to Portable Game Notation (PGN)
+"""
+import contextlib
+import io
+import re
+from board import Board
+import packedmoves
+
+PIECE_LETTERS = {'pawn': '', 'knight': 'N', 'bishop': 'B', 'rook': 'R', 'queen': 'Q', 'king': 'K'}
+PGN_RESULTS = ['1-0', '0-1', '1/2-1/2', '*']
+PGN_COMMENT = re.compile(r'\{[^}]*\}')
+# comments, variations (one level of nesting), glyphs, results, move numbers and moves
+PGN_TOKEN = re.compile(r'\{[^}]*\}|\((?:[^()]|\([^()]*\))*\)|\$\d+|1-0|0-1|1/2-1/2|\*|\d+\.+|[^\s{}()]+')
+
+
+def play_move(board, move):
+    """
+    Plays a packed move on the board without printing
+    :param board: Board, board to play the move on
+    :param move: int, packed move
+    :return: boolean, True if move executed successfully, False otherwise
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        # silence messages printed by the board
+        return board.play(move)
+
+
+def move_to_san(board, move):
+    """
+    Converts a legal packed move to SAN without check suffix, the move must not be played yet
+    :param board: Board, board state before the move
+    :param move: int, packed move
+    :return: string, move in SAN (ex. 'Nf3')
+    """
+    start = packedmoves.start(move)
+    end = packedmoves.end(move)
+    piece = board.board[start[0]][start[1]]
+    capture = packedmoves.is_capture(move)
+    destination = packedmoves.square_name(end)
+    if piece.name == 'pawn':
+        san = (packedmoves.FILES[start[1]] + 'x' if capture else '') + destination
+        promotion = packedmoves.promotion(move)
+        if promotion is not None:
+            san += '=' + PIECE_LETTERS[promotion]
+        return san
+
+    # disambiguate from other pieces of the same type that can move to the same square
+    rivals = [packedmoves.start(other) for other in board.generate_moves(piece.player, packedmoves.new_buffer())
+              if packedmoves.end(other) == end and packedmoves.start(other) != start]
+    rivals = [other for other in rivals if board.board[other[0]][other[1]].name == piece.name]
+    disambiguation = ''
+    if rivals:
+        origin = packedmoves.square_name(start)
+        if all(other[1] != start[1] for other in rivals):
+            disambiguation = origin[0]
+        elif all(other[0] != start[0] for other in rivals):
+            disambiguation = origin[1]
+        else:
+            disambiguation = origin
+    return PIECE_LETTERS[piece.name] + disambiguation + ('x' if capture else '') + destination
+
+
+def check_suffix(board, player):
+    """
+    Get SAN check suffix for a player after a move was played
+    :param board: Board, board state after the move
+    :param player: string, player that may be in check
+    :return: string, '#' for checkmate, '+' for check, '' otherwise
+    """
+    king = board.kings[player]
+    if not king.is_checked(king.position, board.board, board.active_pieces):
+        return ''
+    return '+' if board.has_legal_move(player) else '#'
+
+
+def game_to_san(moves):
+    """
+    Converts a game to SAN by replaying it from the starting position
+    :param moves: iterable of int, packed moves
+    :return: list of strings, moves in SAN
+    """
+    board = Board()
+    player, opponent = 'white', 'black'
+    sans = []
+    for move in moves:
+        san = move_to_san(board, move)
+        if not play_move(board, move):
+            raise ValueError('illegal move {}'.format(packedmoves.to_coordinate(move)))
+        sans.append(san + check_suffix(board, opponent))
+        player, opponent = opponent, player
+    return sans
+
+
+def game_to_pgn(moves, headers, result='*'):
+    """
+    Converts a game to PGN
+    :param moves: iterable of int, packed moves
+    :param headers: Dict[str:str], PGN tag pairs (ex. {'White': 'random'})
+    :param result: string, game result ('1-0', '0-1', '1/2-1/2' or '*')
+    :return: string, game in PGN
+    """
+    tags = dict(headers)
+    tags['Result'] = result
+    lines = ['[{} "{}"]'.format(tag, value) for tag, value in tags.items()]
+    lines.append('')
+
+    # wrap move text at 80 characters
+    tokens = []
+    for i, san in enumerate(game_to_san(moves)):
+        if i % 2 == 0:
+            tokens.append('{}.'.format(i // 2 + 1))
+        tokens.append(san)
+    tokens.append(result)
+    line = ''
+    for token in tokens:
+        if line and len(line) + len(token) + 1 > 80:
+            lines.append(line)
+            line = token
+        else:
+            line = line + ' ' + token if line else token
+    lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def san_to_move(board, san):
+    """
+    Converts a move in SAN to a packed legal move of the player to move
+    :param board: Board, board state before the move
+    :param san: string, move in SAN, check suffixes and annotations are ignored (ex. 'Nbd7', 'exd5', 'e8=Q+')
+    :return: int, packed move
+    """
+    return board.parse_san(san)
+
+
+def read_pgn(lines):
+    """
+    Reads games from PGN, comments, variations and numeric annotation glyphs are skipped
+    :param lines: iterable of strings, lines of PGN text (ex. an open file)
+    :return: iterator of (Dict[str:str], list of strings, string), tag pairs, moves in SAN and result of each game
+    """
+    headers, tokens, text = {}, [], ''
+    for line in lines:
+        line = line.strip()
+        if line.startswith('[') and not text:
+            if tokens:
+                # tag pair after move text starts a new game without a result token
+                yield headers, tokens, '*'
+                headers, tokens = {}, []
+            tag, value = line[1:-1].split(' ', 1)
+            headers[tag] = value.strip('"')
+            continue
+        if line.startswith('%'):
+            continue
+        semicolon, brace = line.find(';'), line.find('{')
+        if semicolon >= 0 and (brace < 0 or brace > semicolon) and '{' not in PGN_COMMENT.sub('', text):
+            # rest of line comment, unless the semicolon is inside a brace comment
+            line = line[:semicolon]
+        text += ' ' + line
+        uncommented = PGN_COMMENT.sub('', text)
+        if '{' in uncommented or uncommented.count('(') != uncommented.count(')'):
+            # comment or variation continues on the next line
+            continue
+        for token in PGN_TOKEN.findall(text):
+            if token in PGN_RESULTS:
+                yield headers, tokens, token
+                headers, tokens = {}, []
+            elif not token.startswith(('{', '(', '$')) and not token[0].isdigit():
+                tokens.append(token)
+        text = ''
+    if tokens or headers:
+        yield headers, tokens, headers.get('Result', '*')
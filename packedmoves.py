@@ -0,0 +1,108 @@
+"""
+Defines the compact 16-bit move encoding. A packed move holds the start square in bits 0-5, the end square in bits
+6-11 and flags in bits 12-15. Squares are numbered row * 8 + col, so a8 is 0 and h1 is 63.
+Move lists are stored in array('H') buffers.
+"""
+from array import array
+
+# flags, the capture bit and the promotion bit can be combined, promotions store the piece in the two low bits
+QUIET = 0
+DOUBLE_PUSH = 1
+CAPTURE = 4
+EN_PASSANT = 5
+PROMOTION = 8
+PROMOTION_PIECES = ['knight', 'bishop', 'rook', 'queen']  # order of promotion pieces in the two low flag bits
+PROMOTION_LETTERS = {'n': 'knight', 'b': 'bishop', 'r': 'rook', 'q': 'queen'}
+FILES = 'abcdefgh'
+
+
+def encode(start, end, flags=QUIET):
+    """
+    Packs a move into 16 bits
+    :param start: Tuple(row, col), start position of the chess piece
+    :param end: Tuple(row, col), end position of the chess piece
+    :param flags: int, move flags
+    :return: int, packed move
+    """
+    return start[0] << 3 | start[1] | (end[0] << 3 | end[1]) << 6 | flags << 12
+
+
+def promotion_flags(name):
+    """
+    Get flags of a promotion
+    :param name: string, name of promotion piece (ex. 'queen')
+    :return: int, promotion flags without the capture bit
+    """
+    return PROMOTION | PROMOTION_PIECES.index(name)
+
+
+def start(move):
+    """
+    :param move: int, packed move
+    :return: Tuple(row, col), start position of the chess piece
+    """
+    return (move >> 3) & 7, move & 7
+
+
+def end(move):
+    """
+    :param move: int, packed move
+    :return: Tuple(row, col), end position of the chess piece
+    """
+    return (move >> 9) & 7, (move >> 6) & 7
+
+
+def flags(move):
+    """
+    :param move: int, packed move
+    :return: int, move flags
+    """
+    return move >> 12
+
+
+def is_capture(move):
+    """ Determine if a packed move captures a piece (including en passant) """
+    return bool(move >> 12 & CAPTURE)
+
+
+def is_en_passant(move):
+    """ Determine if a packed move is an en passant capture """
+    return move >> 12 == EN_PASSANT
+
+
+def promotion(move):
+    """
+    :param move: int, packed move
+    :return: string or NoneType, name of promotion piece, None if the move is not a promotion
+    """
+    if move >> 12 & PROMOTION:
+        return PROMOTION_PIECES[move >> 12 & 3]
+    return None
+
+
+def square_name(position):
+    """
+    :param position: Tuple(row, col), board position
+    :return: string, board position in algebraic notation (ex. 'e4')
+    """
+    return FILES[position[1]] + str(8 - position[0])
+
+
+def to_coordinate(move):
+    """
+    Converts a packed move to coordinate notation
+    :param move: int, packed move
+    :return: string, start square, end square and promotion letter (ex. 'e2e4' or 'e7e8q')
+    """
+    text = square_name(start(move)) + square_name(end(move))
+    name = promotion(move)
+    if name is not None:
+        text += 'n' if name == 'knight' else name[0]
+    return text
+
+
+def new_buffer():
+    """
+    :return: array('H'), empty move list
+    """
+    return array('H')
@@ -0,0 +1,140 @@
+"""
+Defines class for holding a player's chess pieces in play
+"""
+
+PIECE_TYPES = ['pawn', 'knight', 'bishop', 'rook', 'queen', 'king']
+SLIDERS = ['bishop', 'rook', 'queen']
+
+
+class PieceList:
+    """
+    Holds a player's chess pieces in play. Each piece has a slot index in the list of all pieces and in the list of
+    its piece type, so adding and removing a piece takes constant time (removal moves the last piece into the freed
+    slot, so the order of pieces is not preserved). Supports iteration, len() and membership tests like a list.
+    """
+
+    def __init__(self, pieces=()):
+        self.pieces = []  # all pieces in play
+        self.slots = {}  # chess piece -> slot index in self.pieces
+        self.types = dict((name, []) for name in PIECE_TYPES)  # piece type -> pieces of that type in play
+        self.type_slots = {}  # chess piece -> slot index in its type list
+        for piece in pieces:
+            self.append(piece)
+
+    def append(self, piece):
+        """
+        Add a chess piece to play
+        :param piece: chess piece
+        """
+        self.slots[piece] = len(self.pieces)
+        self.pieces.append(piece)
+        same_type = self.types[piece.name]
+        self.type_slots[piece] = len(same_type)
+        same_type.append(piece)
+
+    def remove(self, piece):
+        """
+        Remove a chess piece from play
+        :param piece: chess piece in play
+        :return: Tuple(int, int), slot indices the piece had, reinsert() puts it back into them
+        """
+        if piece not in self.slots:
+            raise ValueError('{} {} is not in play'.format(piece.player, piece.name))
+        return self.delete(self.pieces, self.slots, piece), self.delete(self.types[piece.name], self.type_slots, piece)
+
+    def reinsert(self, piece, slots):
+        """
+        Undo the last remove(), the piece and the piece that took its slots get their slots back so the order of
+        pieces is unchanged
+        :param piece: chess piece removed by remove()
+        :param slots: Tuple(int, int), slot indices returned by remove()
+        """
+        self.undelete(self.pieces, self.slots, piece, slots[0])
+        self.undelete(self.types[piece.name], self.type_slots, piece, slots[1])
+
+    @staticmethod
+    def delete(pieces, slots, piece):
+        """
+        Delete a chess piece from a list by moving the last piece into its slot
+        :param pieces: list, chess pieces
+        :param slots: dict, chess piece -> slot index in pieces
+        :param piece: chess piece to delete
+        :return: int, slot index the piece had
+        """
+        slot = slots.pop(piece)
+        last = pieces.pop()
+        if last is not piece:
+            pieces[slot] = last
+            slots[last] = slot
+        return slot
+
+    @staticmethod
+    def undelete(pieces, slots, piece, slot):
+        """
+        Put a deleted chess piece back into its slot, the piece moved into the slot goes back to the end
+        :param pieces: list, chess pieces
+        :param slots: dict, chess piece -> slot index in pieces
+        :param piece: chess piece to put back
+        :param slot: int, slot index returned by delete()
+        """
+        if slot < len(pieces):
+            moved = pieces[slot]
+            slots[moved] = len(pieces)
+            pieces.append(moved)
+            pieces[slot] = piece
+        else:
+            pieces.append(piece)
+        slots[piece] = slot
+
+    def of_type(self, *names):
+        """
+        Iterate over pieces of some piece types
+        :param names: strings, piece type names (ex. 'knight', 'queen')
+        :return: iterator of chess pieces
+        """
+        for name in names:
+            yield from self.types[name]
+
+    def sliders(self):
+        """
+        Iterate over bishops, rooks and queens
+        :return: iterator of chess pieces
+        """
+        return self.of_type(*SLIDERS)
+
+    def without(self, piece):
+        """
+        Copy the piece list without one chess piece
+        :param piece: chess piece to leave out
+        :return: PieceList, copy without the piece
+        """
+        return PieceList(other for other in self.pieces if other is not piece)
+
+    def snapshot(self):
+        """
+        Take a snapshot of the pieces in play
+        :return: Tuple of chess pieces
+        """
+        return tuple(self.pieces)
+
+    def restore(self, snapshot):
+        """
+        Restore pieces in play from a snapshot
+        :param snapshot: Tuple of chess pieces, returned by snapshot()
+        """
+        self.__init__(snapshot)
+
+    def __iter__(self):
+        return iter(self.pieces)
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def __contains__(self, piece):
+        return piece in self.slots
+
+    def __getitem__(self, index):
+        return self.pieces[index]
+
+    def __repr__(self):
+        return 'PieceList({})'.format(', '.join(str(piece) for piece in self.pieces))
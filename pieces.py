@@ -296,21 +296,82 @@ class King(ChessPiece):
         Determine if King is in check given current or simulated board state
         :param king_position: Tuple(row, col), board position of King
         :param board: 2D List, holds current/simulated positions on all game pieces
-        :param active_pieces: Dict of str:list, holds chess pieces in play for each player in current/simulation state
+        :param active_pieces: Dict of str:PieceList, holds chess pieces in play for each player in current/simulation
+        state
         :param bool_only: boolean, set to False to return opponent piece that has placed King in check
         :return: boolean, True if king is in check or chess piece that places king in check, False otherwise
         """
         opponent = 'white' if self.player == 'black' else 'black'
-        for piece in active_pieces[opponent]:
-            # iterate through all opponent's active pieces
-            if piece.is_move_valid(king_position, board):
-                # opponent's piece can move to kings position, indicating check
-                if bool_only:
-                    return True
-                else:
-                    # return piece that places king in check
-                    return piece
-        return False
+        # stop at the first opponent piece that attacks the king
+        threat = next(self.threats(king_position, board, active_pieces[opponent]), None)
+        if threat is None:
+            return False
+        return True if bool_only else threat
+
+    @staticmethod
+    def threats(position, board, pieces):
+        """
+        Iterate over the pieces that attack a square. Candidates come from the geometric filter of attackers() and
+        are confirmed by looking at the squares between them and the target, so no moves are generated and the
+        search stops as soon as the consumer has what it needs.
+        :param position: Tuple(row, col), attacked board position
+        :param board: 2D List, holds current/simulated positions on all game pieces
+        :param pieces: PieceList, attacking player's chess pieces in play
+        :return: iterator of chess pieces
+        """
+        row, col = position
+        for piece in King.attackers(position, pieces):
+            y, x = piece.position
+            occupant = board[y][x]
+            if (y, x) == position:
+                # a piece does not attack its own square
+                continue
+            if occupant == 0 or occupant.player != piece.player or occupant.name != piece.name:
+                # piece list does not match the board (ex. a piece captured in a simulated board state)
+                continue
+            if piece.name == 'pawn':
+                # pawns attack one square diagonally forward
+                if y - row == (1 if piece.player == 'white' else -1) and abs(x - col) == 1:
+                    yield piece
+            elif piece.name in ['knight', 'king']:
+                yield piece
+            else:
+                # sliders attack if every square between them and the target is empty
+                ystep = (row > y) - (row < y)
+                xstep = (col > x) - (col < x)
+                y, x = y + ystep, x + xstep
+                while (y, x) != position and board[y][x] == 0:
+                    y, x = y + ystep, x + xstep
+                if (y, x) == position:
+                    yield piece
+
+    @staticmethod
+    def attackers(king_position, pieces):
+        """
+        Iterate over the pieces whose type and placement allow them to reach the King's position. Pieces of each type
+        are looked up in the piece list, so pieces that can not reach the King are skipped without generating moves.
+        :param king_position: Tuple(row, col), board position of King
+        :param pieces: PieceList, opponent's chess pieces in play
+        :return: iterator of chess pieces
+        """
+        row, col = king_position
+        for piece in pieces.of_type('knight'):
+            if {abs(piece.position[0] - row), abs(piece.position[1] - col)} == {1, 2}:
+                yield piece
+        for piece in pieces.of_type('rook', 'queen'):
+            if piece.position[0] == row or piece.position[1] == col:
+                yield piece
+        for piece in pieces.of_type('bishop', 'queen'):
+            if abs(piece.position[0] - row) == abs(piece.position[1] - col):
+                yield piece
+        for piece in pieces.of_type('pawn'):
+            # pawns reach one or two rows ahead
+            ahead = piece.position[0] - row if piece.player == 'white' else row - piece.position[0]
+            if 1 <= ahead <= 2 and abs(piece.position[1] - col) <= 1:
+                yield piece
+        for piece in pieces.of_type('king'):
+            if abs(piece.position[0] - row) <= 1 and abs(piece.position[1] - col) <= 1:
+                yield piece
 
     def __str__(self):
         # white pieces are uppercase, black pieces are lowercase
@@ -0,0 +1,93 @@
+"""
+Pondering for the computer opponent. While the human thinks about a move, a background thread searches the position
+after each of the human's legal replies, the predicted reply first, and keeps the computer's answer to every reply it
+finished. The thread is stopped as soon as the human starts typing, and if the human then plays a reply that was
+already searched the computer answers without searching again.
+"""
+import threading
+import time
+from snapshot import BoardSnapshot
+import packedmoves
+import search
+
+DEPTH = 3  # search depth of the computer's moves
+
+
+class Ponderer:
+    """ Computer opponent that searches the human's replies in a background thread while the human thinks """
+
+    def __init__(self, depth=DEPTH):
+        self.depth = depth  # search depth in plies
+        self.answers = {}  # human reply in coordinate notation -> (search result, seconds the search took)
+        self.predicted = None  # packed move the computer expects the human to play
+        self.thread = None  # background pondering thread
+        self.stop_event = threading.Event()  # set to stop pondering
+        self.stats = {'hits': 0, 'misses': 0, 'saved': 0.0, 'pondered': 0}
+
+    def start(self, board):
+        """
+        Start pondering the position the human has to move in
+        :param board: Board, current position, it is copied so the board can change while pondering
+        """
+        self.stop()
+        self.answers = {}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.ponder, args=(BoardSnapshot.from_board(board), self.stop_event),
+                                       daemon=True)
+        self.thread.start()
+
+    def ponder(self, position, stop_event):
+        """
+        Search the position after every reply until stopped, runs in the pondering thread
+        :param position: BoardSnapshot, position the human has to move in
+        :param stop_event: threading.Event, set by stop()
+        """
+        replies = sorted(position.children(), key=lambda item: item[0] != self.predicted)
+        for move, child in replies:
+            start = time.perf_counter()
+            result = None
+            for result in search.Search(child, stop_event).iterate(self.depth):
+                pass
+            if stop_event.is_set():
+                # partial searches are dropped, a stopped iteration may not have seen every move
+                return
+            self.answers[packedmoves.to_coordinate(move)] = (result, time.perf_counter() - start)
+            self.stats['pondered'] += 1
+
+    def stop(self):
+        """ Stop pondering and wait for the thread to finish """
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def reply(self, board):
+        """
+        Choose the computer's move after the human's move, the pondered answer is used if there is one
+        :param board: Board, current position with the computer to move, board.history holds the human's move
+        :return: int or NoneType, packed move, None if the computer has no legal move
+        """
+        self.stop()
+        answer = self.answers.get(packedmoves.to_coordinate(board.history[-1])) if board.history else None
+        if answer is not None:
+            result, seconds = answer
+            self.stats['hits'] += 1
+            self.stats['saved'] += seconds
+        else:
+            result = search.best_move(board, self.depth)
+            if board.history:
+                self.stats['misses'] += 1
+        self.answers = {}
+        if result is None:
+            return None
+        self.predicted = result['pv'][1] if len(result['pv']) > 1 else None
+        return result['pv'][0]
+
+    def report(self):
+        """
+        :return: string, ponder hit rate and time saved
+        """
+        guesses = self.stats['hits'] + self.stats['misses']
+        return 'Ponder hits: {}/{} ({:.0f}%), {:.1f} s saved, {} replies pondered'.format(
+            self.stats['hits'], guesses, 100 * self.stats['hits'] / guesses if guesses else 0, self.stats['saved'],
+            self.stats['pondered'])
@@ -0,0 +1,115 @@
+"""
+Defines a bounded least recently used (LRU) cache of position results. Each entry is keyed by the Zobrist hash of a
+position (recomputed from the board, so boards changed directly are hashed correctly) and holds the verdict for the
+player to move ('check', 'checkmate', 'stalemate' or None) together with the player's legal moves. Positions repeat
+heavily when the same openings are replayed or analyzed, so one cache can be shared by every Match in a process.
+The cache is thread-safe, a lock guards the entries and statistics while positions are evaluated outside of it.
+"""
+from collections import OrderedDict
+import threading
+import zobrist
+
+CAPACITY = 4096  # default number of positions kept
+
+
+class PositionCache:
+    """ LRU cache of check verdicts and legal move sets keyed by position hash """
+
+    def __init__(self, capacity=CAPACITY):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.capacity = capacity  # largest number of positions kept
+        self.entries = OrderedDict()  # position hash -> (verdict, frozenset of packed moves), least recent first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()  # guards the entries and statistics
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def lookup(self, board):
+        """
+        Get the results of the board's position, computing and storing them if the position is not cached
+        :param board: Board, position with the player to move given by board.turn
+        :return: (string or NoneType, frozenset of int), verdict for the player to move and packed legal moves
+        """
+        key = zobrist.board_hash(board)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry
+            self.misses += 1
+        # evaluate without holding the lock, two threads missing the same position store the same result
+        entry = evaluate(board)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def verdict(self, board):
+        """
+        :param board: Board
+        :return: string or NoneType, 'check', 'checkmate' or 'stalemate' for the player to move, None otherwise
+        """
+        return self.lookup(board)[0]
+
+    def legal_moves(self, board):
+        """
+        :param board: Board
+        :return: frozenset of int, packed legal moves of the player to move
+        """
+        return self.lookup(board)[1]
+
+    def clear(self):
+        """ Drop every entry and reset the statistics """
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        :return: dict, 'size', 'capacity', 'hits', 'misses', 'evictions' and 'hit_rate'
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {'size': len(self.entries), 'capacity': self.capacity, 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+def evaluate(board):
+    """
+    Compute the verdict and legal moves of the player to move
+    :param board: Board
+    :return: (string or NoneType, frozenset of int), verdict and packed legal moves
+    """
+    player = 'white' if board.turn % 2 == 1 else 'black'
+    king = board.kings[player]
+    checked = bool(king.is_checked(king.position, board.board, board.active_pieces))
+    moves = frozenset(board.generate_moves(player))
+    if moves:
+        return ('check' if checked else None), moves
+    return ('checkmate' if checked else 'stalemate'), moves
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cache(capacity=CAPACITY):
+    """
+    Get the cache shared by the whole process, it is created with the given capacity on the first call
+    :param capacity: int, number of positions kept
+    :return: PositionCache
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PositionCache(capacity)
+        return _shared
@@ -0,0 +1,265 @@
+"""
+Defines an on-disk index of the positions reached in a collection of games. Each game is replayed once and every
+position it reaches is stored as a (Zobrist hash, game id, ply) record. Records are kept in files sorted by hash and
+read through mmap, so a lookup is a binary search that touches a few pages instead of loading the index into memory.
+
+Games added after the index was built are written to additional sorted run files that are searched alongside the
+main file, compact() merges the runs into the main file.
+
+Usage:
+    python positionindex.py add games.idx games.pgn       # index the games of a PGN file (appends to the index)
+    python positionindex.py query games.idx "FEN"         # list games that reached a position
+    python positionindex.py compact games.idx             # merge appended runs into the main file
+"""
+import argparse
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from board import Board
+import notation
+import packedmoves
+import zobrist
+
+RECORD = struct.Struct('<QII')  # position hash, game id, ply
+RUN_SIZE = 1000000  # records sorted in memory before they are written as a run
+MAX_RUNS = 16  # runs are merged into the main file when there are more
+
+
+class SortedRecords:
+    """ Read-only view of a file of records sorted by position hash """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.count = size // RECORD.size
+
+    def lower_bound(self, key):
+        """
+        Binary search for the first record with a position hash not less than a key
+        :param key: int, position hash
+        :return: int, index of the record
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if struct.unpack_from('<Q', self.map, middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find(self, key):
+        """
+        :param key: int, position hash
+        :return: iterator of Tuple(int, int), (game id, ply) of the records with the hash
+        """
+        for index in range(self.lower_bound(key), self.count):
+            record = RECORD.unpack_from(self.map, index * RECORD.size)
+            if record[0] != key:
+                break
+            yield record[1:]
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield RECORD.unpack_from(self.map, index * RECORD.size)
+
+    def close(self):
+        if self.count:
+            self.map.close()
+        self.file.close()
+
+
+def position_hashes(moves):
+    """
+    Replay a game from the starting position and hash every position it reaches
+    :param moves: iterable of int (packed moves) or strings (moves in SAN)
+    :return: iterator of int, hash of the position after each ply, starting with the starting position (ply 0)
+    """
+    board = Board()
+    yield zobrist.board_hash(board)
+    for move in moves:
+        if isinstance(move, str):
+            move = notation.san_to_move(board, move)
+        if not notation.play_move(board, move):
+            raise ValueError('illegal move {}'.format(packedmoves.to_coordinate(move)))
+        yield zobrist.board_hash(board)
+
+
+def position_key(position):
+    """
+    :param position: Board, FEN string or int (position hash)
+    :return: int, position hash
+    """
+    if isinstance(position, int):
+        return position
+    if isinstance(position, str):
+        position = Board.from_fen(position)
+    return zobrist.board_hash(position)
+
+
+class PositionIndex:
+    """
+    Index of positions reached in a collection of games, stored in a main file and appended run files next to it
+    (path, path.1, path.2, ...) with metadata in path.json
+    """
+
+    def __init__(self, path, run_size=RUN_SIZE, max_runs=MAX_RUNS):
+        self.path = path  # path of the main file
+        self.run_size = run_size  # records sorted in memory before they are written as a run
+        self.max_runs = max_runs  # runs are merged into the main file when there are more
+        self.meta = {'games': 0, 'runs': []}  # number of indexed games and names of run files
+        if os.path.exists(path + '.json'):
+            with open(path + '.json') as f:
+                self.meta = json.load(f)
+        if not os.path.exists(path):
+            open(path, 'wb').close()
+        self.files = []  # SortedRecords of the main file and every run
+        self.open()
+
+    def open(self):
+        """ Map the main file and run files """
+        directory = os.path.dirname(self.path)
+        self.files = [SortedRecords(self.path)]
+        self.files.extend(SortedRecords(os.path.join(directory, run)) for run in self.meta['runs'])
+
+    def close(self):
+        """ Unmap the main file and run files """
+        for records in self.files:
+            records.close()
+        self.files = []
+
+    def save_meta(self):
+        with open(self.path + '.json', 'w') as f:
+            json.dump(self.meta, f)
+
+    @property
+    def games(self):
+        """ Number of indexed games, game ids are 0 to games - 1 in the order games were added """
+        return self.meta['games']
+
+    def __len__(self):
+        """ Number of indexed positions """
+        return sum(records.count for records in self.files)
+
+    def add_games(self, games):
+        """
+        Replay games and append their positions to the index
+        :param games: iterable of games, each game is an iterable of packed moves or moves in SAN
+        :return: range, ids of the added games
+        """
+        first = self.meta['games']
+        records = []
+        for game_id, moves in enumerate(games, first):
+            hashes = list(position_hashes(moves))  # replay the whole game first so an illegal move adds nothing
+            records.extend((key, game_id, ply) for ply, key in enumerate(hashes))
+            if len(records) >= self.run_size:
+                self.meta['games'] = game_id + 1
+                self.write_run(records)
+                records = []
+        if records:
+            self.meta['games'] = game_id + 1
+            self.write_run(records)
+        if len(self.meta['runs']) > self.max_runs:
+            self.compact()
+        return range(first, self.meta['games'])
+
+    def add_pgn(self, lines):
+        """
+        Index the games of a PGN file
+        :param lines: iterable of strings, lines of PGN text (ex. an open file)
+        :return: range, ids of the added games
+        """
+        return self.add_games(moves for _, moves, _ in notation.read_pgn(lines))
+
+    def write_run(self, records):
+        """
+        Sort records and write them as a new run file
+        :param records: list of Tuple(int, int, int), (position hash, game id, ply) records
+        """
+        records.sort()
+        name = '{}.{}'.format(os.path.basename(self.path), len(self.meta['runs']) + 1)
+        with open(os.path.join(os.path.dirname(self.path), name), 'wb') as f:
+            for start in range(0, len(records), 65536):
+                f.write(b''.join(RECORD.pack(*record) for record in records[start:start + 65536]))
+        self.meta['runs'].append(name)
+        self.save_meta()
+        self.files.append(SortedRecords(os.path.join(os.path.dirname(self.path), name)))
+
+    def compact(self):
+        """ Merge the run files into the main file """
+        if not self.meta['runs']:
+            return
+        temporary = self.path + '.tmp'
+        with open(temporary, 'wb') as f:
+            batch = []
+            for record in heapq.merge(*self.files):
+                batch.append(RECORD.pack(*record))
+                if len(batch) == 65536:
+                    f.write(b''.join(batch))
+                    batch = []
+            f.write(b''.join(batch))
+        self.close()
+        os.replace(temporary, self.path)
+        for run in self.meta['runs']:
+            os.remove(os.path.join(os.path.dirname(self.path), run))
+        self.meta['runs'] = []
+        self.save_meta()
+        self.open()
+
+    def lookup(self, position):
+        """
+        Find every occurrence of a position
+        :param position: Board, FEN string or int (position hash)
+        :return: list of Tuple(int, int), sorted (game id, ply) of each time a game reached the position
+        """
+        key = position_key(position)
+        return sorted(occurrence for records in self.files for occurrence in records.find(key))
+
+    def games_with(self, position):
+        """
+        :param position: Board, FEN string or int (position hash)
+        :return: list of int, sorted ids of games that reached the position
+        """
+        return sorted(set(game_id for game_id, _ in self.lookup(position)))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Index the positions reached in a collection of games')
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help='index the games of PGN files')
+    add.add_argument('index', help='path of index file')
+    add.add_argument('pgn', nargs='+', help='PGN files')
+    query = commands.add_parser('query', help='list games that reached a position')
+    query.add_argument('index', help='path of index file')
+    query.add_argument('fen', help='position in FEN')
+    compact = commands.add_parser('compact', help='merge appended runs into the main file')
+    compact.add_argument('index', help='path of index file')
+    args = parser.parse_args(argv)
+
+    with PositionIndex(args.index) as index:
+        if args.command == 'add':
+            for path in args.pgn:
+                with open(path) as f:
+                    added = index.add_pgn(f)
+                print('{}: indexed games {} to {}'.format(path, added.start, added.stop - 1))
+        elif args.command == 'query':
+            for game_id, ply in index.lookup(args.fen):
+                print('game {} ply {}'.format(game_id, ply))
+        else:
+            index.compact()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Renders boards to a terminal. Every frame is built in a single buffer and written with one write() call. In ANSI
+mode only the squares (and titles) that changed since the previous frame are repainted, using cursor movement escape
+codes, which keeps the output small over slow connections. Several boards are tiled side by side, columns boards per
+row, to watch many matches at once.
+
+Usage:
+    python render.py --boards 8 --frames 300              # measure frames/sec and bytes per frame of both modes
+    python render.py --boards 8 --frames 300 --show       # watch random games in the terminal
+"""
+import argparse
+import io
+import random
+import sys
+import time
+from board import Board
+import fuzz
+
+COLUMNS = 4  # boards per row of the tiled view
+TILE_WIDTH = 23  # characters in the widest line of a board
+GAP = '   '  # space between tiled boards
+BOARD_LINES = 12
+FIRST_SQUARE = (2, 4)  # line and column of square a8 within a board
+CLEAR = '\x1b[H\x1b[2J'  # move the cursor home and clear the screen
+
+
+def symbols(board):
+    """
+    :param board: Board
+    :return: string, 64 characters, the piece on every square from a8 to h1 ('*' for empty squares)
+    """
+    return ''.join('*' if piece == 0 else str(piece) for rank in board.board for piece in rank)
+
+
+def move_to(line, column):
+    """
+    :param line: int, line from the top of the screen, starting at 0
+    :param column: int, column from the left of the screen, starting at 0
+    :return: string, ANSI escape code moving the cursor
+    """
+    return '\x1b[{};{}H'.format(line + 1, column + 1)
+
+
+class Renderer:
+    """ Draws one or more boards to a text stream, a frame at a time """
+
+    def __init__(self, output=None, ansi=False, columns=COLUMNS):
+        self.output = output if output is not None else sys.stdout
+        self.ansi = ansi  # set to True to repaint only the changed squares after the first frame
+        self.columns = columns
+        self.layout = None  # number of boards and titles on screen in ANSI mode, None if nothing was drawn
+        self.screen = []  # symbols() of every board on screen in ANSI mode
+        self.frames = 0
+        self.bytes = 0  # characters written
+
+    def tile(self, index, titled):
+        """
+        :param index: int, position of the board in the tiled view
+        :param titled: boolean, True if boards have a title line
+        :return: (int, int), line and column of the top left corner of the board's tile
+        """
+        height = BOARD_LINES + titled + 1  # tile rows are separated by a blank line
+        return index // self.columns * height, index % self.columns * (TILE_WIDTH + len(GAP))
+
+    def frame(self, boards, titles=None):
+        """
+        Draw a complete frame, a single board without a title is drawn exactly like Board.print()
+        :param boards: list of Boards
+        :param titles: list of strings, title shown above each board (no titles if None)
+        :return: string, text of the frame
+        """
+        lines = []
+        for first in range(0, len(boards), self.columns):
+            row = [board.render().splitlines() for board in boards[first:first + self.columns]]
+            if titles is not None:
+                row = [[title[:TILE_WIDTH]] + tile for title, tile in zip(titles[first:first + self.columns], row)]
+            if lines:
+                lines.append('')
+            for parts in zip(*row):
+                lines.append(GAP.join(part.ljust(TILE_WIDTH) for part in parts[:-1]) +
+                             (GAP if len(parts) > 1 else '') + parts[-1])
+        return '\n'.join(lines) + '\n'
+
+    def changes(self, boards, titles=None):
+        """
+        Draw the escape codes that repaint what changed since the previous ANSI frame
+        :param boards: list of Boards
+        :param titles: list of strings, title shown above each board (no titles if None)
+        :return: string, escape codes and changed characters, ending with the cursor below the tiled view
+        """
+        parts = []
+        titled = titles is not None
+        for index, board in enumerate(boards):
+            top, left = self.tile(index, titled)
+            if titled and titles[index] != self.layout[1][index]:
+                parts.append(move_to(top, left) + titles[index][:TILE_WIDTH].ljust(TILE_WIDTH))
+            previous, current = self.screen[index], symbols(board)
+            if previous == current:
+                continue
+            for square in range(64):
+                if previous[square] != current[square]:
+                    line, column = FIRST_SQUARE[0] + titled + square // 8, FIRST_SQUARE[1] + square % 8 * 2
+                    parts.append(move_to(top + line, left + column) + current[square])
+        if parts:
+            rows = (len(boards) + self.columns - 1) // self.columns
+            parts.append(move_to(self.tile(rows * self.columns, titled)[0] - 1, 0))
+        return ''.join(parts)
+
+    def draw(self, boards, titles=None):
+        """
+        Write a frame of one or more boards with a single write() call
+        :param boards: Board or list of Boards
+        :param titles: list of strings, title shown above each board (no titles if None)
+        :return: int, number of characters written
+        """
+        if not isinstance(boards, (list, tuple)):
+            boards = [boards]
+        if not self.ansi:
+            text = self.frame(boards, titles)
+        elif self.layout is not None and self.layout[0] == len(boards) and \
+                (self.layout[1] is None) == (titles is None):
+            text = self.changes(boards, titles)
+        else:
+            text = CLEAR + self.frame(boards, titles)
+        if self.ansi:
+            self.layout = (len(boards), None if titles is None else list(titles))
+            self.screen = [symbols(board) for board in boards]
+        self.output.write(text)
+        self.output.flush()
+        self.frames += 1
+        self.bytes += len(text)
+        return len(text)
+
+
+def measure(boards=4, frames=200, ansi=False, seed=0, output=None, columns=COLUMNS):
+    """
+    Play random games on several boards, one ply per board every frame, and time drawing the tiled view
+    :param boards: int, number of boards
+    :param frames: int, number of frames drawn
+    :param ansi: boolean, True to repaint only the changed squares
+    :param seed: int, seed of the random games
+    :param output: text stream frames are written to (an in-memory stream if None)
+    :param columns: int, boards per row
+    :return: dict, 'frames', 'seconds' spent drawing, 'fps' and average 'bytes' per frame
+    """
+    rng = random.Random(seed)
+    games = [fuzz.play_random_game(rng)[0] for _ in range(boards)]
+    positions = [Board() for _ in range(boards)]
+    renderer = Renderer(output if output is not None else io.StringIO(), ansi, columns)
+    seconds = 0.0
+    for frame in range(frames):
+        for index, moves in enumerate(games):
+            ply = frame % (len(moves) + 1)
+            if ply == 0:
+                positions[index] = Board()  # game over, replay it from the start
+            else:
+                positions[index].apply_move(moves[ply - 1])
+        titles = ['game {} ply {}'.format(index + 1, len(board.history)) for index, board in enumerate(positions)]
+        start = time.perf_counter()
+        renderer.draw(positions, titles)
+        seconds += time.perf_counter() - start
+    return {'frames': frames, 'seconds': seconds, 'fps': frames / seconds if seconds else 0.0,
+            'bytes': renderer.bytes / frames if frames else 0.0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure or watch the tiled board renderer')
+    parser.add_argument('--boards', type=int, default=4, help='number of boards (default: %(default)s)')
+    parser.add_argument('--frames', type=int, default=200, help='number of frames (default: %(default)s)')
+    parser.add_argument('--columns', type=int, default=COLUMNS, help='boards per row (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random games (default: %(default)s)')
+    parser.add_argument('--show', action='store_true', help='draw to the terminal in ANSI mode')
+    args = parser.parse_args(argv)
+
+    if args.show:
+        report = measure(args.boards, args.frames, True, args.seed, sys.stdout, args.columns)
+        print('ansi: {:.0f} frames/sec, {:.0f} bytes/frame'.format(report['fps'], report['bytes']))
+        return 0
+    for ansi in [False, True]:
+        report = measure(args.boards, args.frames, ansi, args.seed, columns=args.columns)
+        print('{}: {:.0f} frames/sec, {:.0f} bytes/frame'.format(
+            'ansi' if ansi else 'full', report['fps'], report['bytes']))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""
+Alpha-beta search over BoardSnapshots. Scores are in centipawns from the point of view of the player to move, mates
+are scored MATE minus the number of plies to mate. Searches deepen one ply at a time and can be stopped from another
+thread through a threading.Event, the result of the last completed depth is kept.
+"""
+import threading
+import time
+from snapshot import BoardSnapshot
+import packedmoves
+
+PIECE_VALUES = {'pawn': 100, 'knight': 300, 'bishop': 300, 'rook': 500, 'queen': 900, 'king': 0}
+MATE = 100000
+INFINITY = 10 ** 6
+MAX_DEPTH = 64
+
+
+class SearchStopped(Exception):
+    """ Raised inside the search when the stop event is set or the time is up """
+
+
+def evaluate(snapshot):
+    """
+    Evaluate a position by material
+    :param snapshot: BoardSnapshot
+    :return: int, score in centipawns for the player to move
+    """
+    score = 0
+    for player, sign in [('white', 1), ('black', -1)]:
+        for name, group in snapshot.pieces[player].types.items():
+            score += sign * PIECE_VALUES[name] * len(group)
+    return score if snapshot.player == 'white' else -score
+
+
+def is_mate_score(score):
+    return abs(score) > MATE - MAX_DEPTH * 2
+
+
+def order(snapshot, children, first=None):
+    """
+    Order moves so that alpha-beta cuts off early: the expected best move, then captures of valuable pieces by cheap
+    pieces and promotions, then quiet moves
+    :param snapshot: BoardSnapshot, parent position
+    :param children: list of (int, BoardSnapshot), packed moves and child positions
+    :param first: int, packed move to search first (ex. the best move of the previous depth)
+    :return: list of (int, BoardSnapshot), ordered children
+    """
+    def key(item):
+        move = item[0]
+        if move == first:
+            return -INFINITY
+        value = 0
+        if packedmoves.is_capture(move):
+            end = packedmoves.end(move)
+            start = packedmoves.start(move)
+            victim = snapshot.rows[end[0]][end[1]]
+            attacker = snapshot.rows[start[0]][start[1]]
+            value += 10 * (PIECE_VALUES[victim.name] if victim != 0 else 100) - PIECE_VALUES[attacker.name] // 10
+        promotion = packedmoves.promotion(move)
+        if promotion is not None:
+            value += PIECE_VALUES[promotion]
+        return -value
+    return sorted(children, key=key)
+
+
+class Search:
+    """ Iterative deepening alpha-beta search from one root position """
+
+    def __init__(self, position, stop=None, deadline=None, max_nodes=None, searchmoves=None):
+        if not isinstance(position, BoardSnapshot):
+            position = BoardSnapshot.from_board(position)
+        self.root = position  # BoardSnapshot of the root position
+        self.stop = stop if stop is not None else threading.Event()  # set to stop the search from another thread
+        self.deadline = deadline  # time.perf_counter() value after which the search stops
+        self.max_nodes = max_nodes  # number of nodes after which the search stops
+        self.nodes = 0  # number of searched nodes
+        self.best = {}  # ply -> packed move of the previous principal variation, searched first at that ply
+        self.searchmoves = searchmoves  # collection of packed root moves to search (every legal move if None)
+
+    def check_stop(self):
+        """ Checked before every node, so the search never visits more than max_nodes nodes """
+        if self.stop.is_set() or (self.deadline is not None and time.perf_counter() > self.deadline) or \
+                (self.max_nodes is not None and self.nodes >= self.max_nodes):
+            raise SearchStopped()
+
+    def negamax(self, snapshot, depth, alpha, beta, ply, line):
+        """
+        :param snapshot: BoardSnapshot, position to search
+        :param depth: int, remaining depth in plies
+        :param alpha: int, lower bound of the score
+        :param beta: int, upper bound of the score
+        :param ply: int, distance from the root in plies
+        :param line: list, filled with the principal variation from this position
+        :return: int, score for the player to move
+        """
+        self.check_stop()
+        self.nodes += 1
+        if depth == 0:
+            return self.quiesce(snapshot, alpha, beta, ply)
+        children = list(snapshot.children())
+        if not children:
+            # checkmate or stalemate
+            return -(MATE - ply) if snapshot.is_checked(snapshot.player) else 0
+        best_move = self.best.get(ply)
+        for move, child in order(snapshot, children, best_move):
+            child_line = []
+            score = -self.negamax(child, depth - 1, -beta, -alpha, ply + 1, child_line)
+            if score > alpha:
+                alpha = score
+                line[:] = [move] + child_line
+                if alpha >= beta:
+                    break
+        return alpha
+
+    def quiesce(self, snapshot, alpha, beta, ply):
+        """
+        Search captures only until the position is quiet, so the evaluation does not stop in the middle of an exchange
+        :param snapshot: BoardSnapshot, position to search
+        :param alpha: int, lower bound of the score
+        :param beta: int, upper bound of the score
+        :param ply: int, distance from the root in plies
+        :return: int, score for the player to move
+        """
+        stand = evaluate(snapshot)
+        if stand >= beta or ply >= MAX_DEPTH:
+            return stand
+        alpha = max(alpha, stand)
+        captures = [(move, child) for move, child in snapshot.children() if packedmoves.is_capture(move)]
+        for move, child in order(snapshot, captures):
+            self.check_stop()
+            self.nodes += 1
+            score = -self.quiesce(child, -beta, -alpha, ply + 1)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def root_moves(self, depth, moves, alpha=-INFINITY, beta=INFINITY):
+        """
+        Search each root move to a depth
+        :param depth: int, depth in plies (at least 1)
+        :param moves: list of (int, BoardSnapshot), root moves to search
+        :param alpha: int, lower bound of the score
+        :param beta: int, upper bound of the score
+        :return: list of (int, list), score and principal variation of each move, in the order of moves
+        """
+        results = []
+        for move, child in moves:
+            self.check_stop()
+            line = []
+            score = -self.negamax(child, depth - 1, -beta, -alpha, 1, line)
+            results.append((score, [move] + line))
+            alpha = max(alpha, score)
+        return results
+
+    def root_children(self):
+        """
+        :return: list of (int, BoardSnapshot), legal root moves and their positions, restricted to searchmoves
+        """
+        return [(move, child) for move, child in self.root.children()
+                if self.searchmoves is None or move in self.searchmoves]
+
+    def iterate(self, max_depth=MAX_DEPTH):
+        """
+        Deepen the search one ply at a time until the maximum depth, the stop event, the deadline or the node budget
+        :param max_depth: int, largest depth in plies
+        :return: iterator of dict, 'depth', 'score', 'pv' (packed moves), 'nodes' and 'seconds' after every depth
+        """
+        start = time.perf_counter()
+        moves = self.root_children()
+        if not moves:
+            return
+        best = None
+        for depth in range(1, max_depth + 1):
+            if best is not None:
+                # search the best move of the previous depth first
+                moves.sort(key=lambda item: item[0] != best[1][0])
+            try:
+                results = self.root_moves(depth, moves)
+            except SearchStopped:
+                return
+            best = max(results, key=lambda result: result[0])
+            self.best = dict(enumerate(best[1]))
+            yield {'depth': depth, 'score': best[0], 'pv': best[1], 'nodes': self.nodes,
+                   'seconds': time.perf_counter() - start}
+            if is_mate_score(best[0]):
+                return
+
+
+def best_move(position, depth=3, seconds=None, stop=None):
+    """
+    Search a position and return the best move found
+    :param position: Board or BoardSnapshot
+    :param depth: int, largest depth in plies
+    :param seconds: float, time budget (no limit if None)
+    :param stop: threading.Event, set to stop the search early
+    :return: dict, result of the deepest completed iteration of Search.iterate(), None if there is no legal move
+    """
+    deadline = time.perf_counter() + seconds if seconds is not None else None
+    search = Search(position, stop, deadline)
+    result = None
+    for result in search.iterate(depth):
+        pass
+    if result is None:
+        # stopped before the first depth completed, fall back to the first legal move
+        move = next(search.root.children(), None)
+        if move is not None:
+            result = {'depth': 0, 'score': 0, 'pv': [move[0]], 'nodes': search.nodes, 'seconds': 0.0}
+    return result
@@ -0,0 +1,365 @@
+"""
+Defines chessboards stored in flat multiprocessing.shared_memory buffers. Worker processes attach to a buffer by
+name and read positions without pickling Board objects.
+
+The buffer is the only copy of the state, it is not a Board: PositionView reads the turn, the en passant square and
+the piece on any square straight from the bytes, so workers that only inspect squares (ex. material counts) never
+build chess piece objects. Move generation lives in Board and its pieces, so read() decodes a new Board for workers
+that need legal moves, paying the piece construction once per position read.
+
+Position record layout (72 bytes):
+    bytes 0-63    one code per square in row-major order (a8 first): 0 if empty, otherwise the index of the piece
+                  class in PIECE_CLASSES plus 1, plus BLACK for black pieces and MOVED for pawns that have moved
+    bytes 64-67   turn of match (unsigned int, little endian)
+    byte 68       square of the pawn that can be captured en passant (255 if none)
+    bytes 69-71   padding
+"""
+import concurrent.futures
+import os
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from board import Board
+from pieces import Pawn, Knight, Bishop, Rook, Queen, King
+
+PIECE_CLASSES = [Pawn, Knight, Bishop, Rook, Queen, King]  # square code of a piece is its index + 1
+BLACK = 8  # added to the square code of black pieces
+MOVED = 16  # added to the square code of pawns that have moved
+NO_SQUARE = 255
+RECORD_SIZE = 72
+HEADER = struct.Struct('<IB')  # turn and en passant square, packed after the 64 square codes
+BATCH_HEADER = 8  # batch segments start with the number of positions (unsigned long long)
+PIECE_VALUES = {'pawn': 1, 'knight': 3, 'bishop': 3, 'rook': 5, 'queen': 9, 'king': 0}
+created = set()  # names of segments created by this process (inherited by forked worker processes)
+
+
+def encode_position(board, buffer, offset=0):
+    """
+    Write a board state into a buffer
+    :param board: Board, board state to write
+    :param buffer: writable buffer (ex. shared memory buffer)
+    :param offset: int, byte offset of the position record
+    """
+    en_passant = NO_SQUARE
+    for row in range(8):
+        for col in range(8):
+            piece = board.board[row][col]
+            code = 0
+            if piece != 0:
+                code = PIECE_CLASSES.index(type(piece)) + 1 + (BLACK if piece.player == 'black' else 0)
+                if piece.name == 'pawn':
+                    if piece.moved:
+                        code += MOVED
+                    if piece.two_step and board.turn - piece.first_move == 1:
+                        # pawn moved two steps on the previous turn and can be captured en passant
+                        en_passant = row * 8 + col
+            buffer[offset + row * 8 + col] = code
+    HEADER.pack_into(buffer, offset + 64, board.turn, en_passant)
+
+
+def decode_position(buffer, offset=0):
+    """
+    Read a board state from a buffer
+    :param buffer: buffer holding position records
+    :param offset: int, byte offset of the position record
+    :return: Board, new board with the position
+    """
+    turn, en_passant = HEADER.unpack_from(buffer, offset + 64)
+    pieces = []
+    for square in range(64):
+        code = buffer[offset + square]
+        if code == 0:
+            continue
+        piece = PIECE_CLASSES[(code & 7) - 1]((square // 8, square % 8), 'black' if code & BLACK else 'white')
+        if code & MOVED:
+            piece.moved = True
+        if square == en_passant:
+            piece.moved = piece.two_step = True
+            piece.first_move = turn - 1
+        pieces.append(piece)
+    return Board.from_pieces(pieces, turn)
+
+
+class PositionView:
+    """ Read-only access to one position record in place, without building a Board """
+
+    def __init__(self, buffer, offset=0):
+        self.buffer = buffer  # buffer holding the position record
+        self.offset = offset  # byte offset of the position record
+
+    @property
+    def turn(self):
+        """ Turn of match """
+        return HEADER.unpack_from(self.buffer, self.offset + 64)[0]
+
+    @property
+    def en_passant(self):
+        """ Tuple(row, col) or NoneType, position of the pawn that can be captured en passant, None if there is none """
+        square = HEADER.unpack_from(self.buffer, self.offset + 64)[1]
+        return None if square == NO_SQUARE else (square // 8, square % 8)
+
+    def piece_at(self, position):
+        """
+        :param position: Tuple(row, col), board position
+        :return: Tuple(string, string) or NoneType, (player, piece name) of the occupant, None if the square is empty
+        """
+        code = self.buffer[self.offset + position[0] * 8 + position[1]]
+        if code == 0:
+            return None
+        return 'black' if code & BLACK else 'white', PIECE_CLASSES[(code & 7) - 1].name
+
+    def pieces(self):
+        """
+        Iterate over the occupied squares
+        :return: iterator of Tuple(string, string, Tuple(row, col)), player, piece name and position of every piece
+        """
+        codes = bytes(self.buffer[self.offset:self.offset + 64])  # copy, a slice of shared memory would pin it open
+        for square, code in enumerate(codes):
+            if code != 0:
+                player = 'black' if code & BLACK else 'white'
+                yield player, PIECE_CLASSES[(code & 7) - 1].name, (square // 8, square % 8)
+
+    def board(self):
+        """
+        :return: Board, new board with the position
+        """
+        return decode_position(self.buffer, self.offset)
+
+
+def attach_memory(name):
+    """
+    Attach to an existing shared memory segment without handing its lifetime to this process
+    :param name: string, name of shared memory segment
+    :return: SharedMemory, attached segment
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    memory = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix' and name not in created:
+        # before Python 3.13 attaching registers the segment with the resource tracker, which would unlink it when
+        # this process exits although the creating process still owns it. The tracker knows POSIX segments by their
+        # name with a leading slash, SharedMemory.name leaves it out.
+        resource_tracker.unregister('/' + memory.name, 'shared_memory')
+    return memory
+
+
+def create_memory(size):
+    """
+    Create a shared memory segment owned by this process
+    :param size: int, size of segment in bytes
+    :return: SharedMemory, new segment
+    """
+    memory = shared_memory.SharedMemory(create=True, size=size)
+    created.add(memory.name)
+    return memory
+
+
+class SharedBoard:
+    """ Chessboard state stored in one position record of a shared memory segment """
+
+    def __init__(self, memory, owner):
+        self.memory = memory  # SharedMemory segment holding the position record
+        self.owner = owner  # True if this process created the segment and is responsible for unlinking it
+
+    @classmethod
+    def create(cls, board=None):
+        """
+        Create a shared memory segment holding a board state
+        :param board: Board, board state to store (starting position if None)
+        :return: SharedBoard, board in the new segment
+        """
+        shared = cls(create_memory(RECORD_SIZE), owner=True)
+        shared.write(board if board is not None else Board())
+        return shared
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attach to a board created by another process
+        :param name: string, name of shared memory segment
+        :return: SharedBoard, board in the existing segment
+        """
+        return cls(attach_memory(name), owner=False)
+
+    @property
+    def name(self):
+        """ Name of shared memory segment, pass it to other processes to attach """
+        return self.memory.name
+
+    @property
+    def turn(self):
+        """ Turn of match """
+        return self.view().turn
+
+    def piece_at(self, position):
+        """
+        Read the piece on a square directly from shared memory
+        :param position: Tuple(row, col), board position
+        :return: Tuple(string, string) or NoneType, (player, piece name) of the occupant, None if the square is empty
+        """
+        return self.view().piece_at(position)
+
+    def view(self):
+        """
+        :return: PositionView, the shared position read in place
+        """
+        return PositionView(self.memory.buf)
+
+    def read(self):
+        """
+        :return: Board, new board with the shared position
+        """
+        return decode_position(self.memory.buf)
+
+    def write(self, board):
+        """
+        :param board: Board, board state to store
+        """
+        encode_position(board, self.memory.buf)
+
+    def close(self):
+        """ Detach from the segment, the creating process also removes the segment """
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+            created.discard(self.memory.name)
+
+
+class PositionBatch:
+    """ Many position records stored back to back in one shared memory segment """
+
+    def __init__(self, memory, owner):
+        self.memory = memory  # SharedMemory segment holding the batch
+        self.owner = owner  # True if this process created the segment and is responsible for unlinking it
+
+    @classmethod
+    def create(cls, boards):
+        """
+        Create a shared memory segment holding a batch of board states
+        :param boards: list of Board, board states to store
+        :return: PositionBatch, batch in the new segment
+        """
+        memory = create_memory(BATCH_HEADER + RECORD_SIZE * max(1, len(boards)))
+        struct.pack_into('<Q', memory.buf, 0, len(boards))
+        batch = cls(memory, owner=True)
+        for index, board in enumerate(boards):
+            batch.write(index, board)
+        return batch
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attach to a batch created by another process
+        :param name: string, name of shared memory segment
+        :return: PositionBatch, batch in the existing segment
+        """
+        return cls(attach_memory(name), owner=False)
+
+    @property
+    def name(self):
+        """ Name of shared memory segment, pass it to other processes to attach """
+        return self.memory.name
+
+    def __len__(self):
+        return struct.unpack_from('<Q', self.memory.buf, 0)[0]
+
+    def offset(self, index):
+        """
+        :param index: int, index of position in the batch
+        :return: int, byte offset of the position record
+        """
+        if not 0 <= index < len(self):
+            raise IndexError('position index out of range')
+        return BATCH_HEADER + index * RECORD_SIZE
+
+    def view(self, index):
+        """
+        :param index: int, index of position in the batch
+        :return: PositionView, the position read in place
+        """
+        return PositionView(self.memory.buf, self.offset(index))
+
+    def read(self, index):
+        """
+        :param index: int, index of position in the batch
+        :return: Board, new board with the position
+        """
+        return decode_position(self.memory.buf, self.offset(index))
+
+    def write(self, index, board):
+        """
+        :param index: int, index of position in the batch
+        :param board: Board, board state to store
+        """
+        encode_position(board, self.memory.buf, self.offset(index))
+
+    def close(self):
+        """ Detach from the segment, the creating process also removes the segment """
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+            created.discard(self.memory.name)
+
+
+def material(board):
+    """
+    Evaluator that counts material
+    :param board: Board, board state
+    :return: int, white's material minus black's material
+    """
+    return sum(PIECE_VALUES[piece.name] for piece in board.active_pieces['white']) - \
+        sum(PIECE_VALUES[piece.name] for piece in board.active_pieces['black'])
+
+
+def view_material(view):
+    """
+    Evaluator that counts material without building a Board, pass view=True to evaluate_batch()
+    :param view: PositionView, position read in place
+    :return: int, white's material minus black's material
+    """
+    return sum(PIECE_VALUES[name] if player == 'white' else -PIECE_VALUES[name] for player, name, _ in view.pieces())
+
+
+def mobility(board):
+    """
+    Evaluator that counts legal moves of the player to move
+    :param board: Board, board state
+    :return: int, number of legal moves
+    """
+    return len(board.generate_moves('white' if board.turn % 2 == 1 else 'black'))
+
+
+def evaluate_range(name, start, stop, evaluator, view=False):
+    """
+    Evaluate a range of positions of a shared batch, runs in a worker process
+    :param name: string, name of shared memory segment holding the batch
+    :param start: int, index of first position
+    :param stop: int, index after the last position
+    :param evaluator: function, evaluator(board) -> value, must be importable by worker processes
+    :param view: boolean, True to pass the evaluator a PositionView instead of a decoded Board
+    :return: list, values of the positions
+    """
+    batch = PositionBatch.attach(name)
+    try:
+        read = batch.view if view else batch.read
+        return [evaluator(read(index)) for index in range(start, stop)]
+    finally:
+        batch.close()
+
+
+def evaluate_batch(batch, evaluator, workers=None, chunk_size=256, view=False):
+    """
+    Evaluate every position of a shared batch in parallel worker processes. Only the segment name and index ranges
+    are sent to workers, positions are read from shared memory.
+    :param batch: PositionBatch, positions to evaluate
+    :param evaluator: function, evaluator(board) -> value, must be importable by worker processes
+    :param workers: int, number of worker processes (number of CPUs if None)
+    :param chunk_size: int, number of positions per task
+    :param view: boolean, True to pass the evaluator a PositionView read in place instead of a decoded Board, which
+    skips building chess piece objects for evaluators that only inspect squares
+    :return: list, values in batch order
+    """
+    ranges = [(start, min(start + chunk_size, len(batch))) for start in range(0, len(batch), chunk_size)]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(evaluate_range, batch.name, start, stop, evaluator, view) for start, stop in ranges]
+        return [value for future in futures for value in future.result()]
@@ -0,0 +1,271 @@
+"""
+Defines an immutable chessboard snapshot for exploring many positions at once. Applying a move returns a new snapshot
+that shares every unchanged row and chess piece with its parent (path copying), so snapshots can be read by many
+threads without locks and a child position costs only the rows and pieces the move touched.
+"""
+import concurrent.futures
+import copy
+import sys
+from board import Board
+from piecelist import PIECE_TYPES
+from pieces import Queen, Rook, Bishop, Knight
+import packedmoves
+
+PROMOTIONS = {'queen': Queen, 'rook': Rook, 'bishop': Bishop, 'knight': Knight}
+
+
+class PieceSet:
+    """
+    Immutable collection of a player's chess pieces grouped by type. Replacing a piece copies only the tuple of its
+    type, the tuples of the other types are shared.
+    """
+    __slots__ = ['types']
+
+    def __init__(self, types):
+        self.types = types  # piece type -> Tuple of chess pieces
+
+    @classmethod
+    def from_pieces(cls, pieces):
+        """
+        :param pieces: iterable of chess pieces
+        :return: PieceSet, pieces grouped by type
+        """
+        types = dict((name, []) for name in PIECE_TYPES)
+        for piece in pieces:
+            types[piece.name].append(piece)
+        return cls(dict((name, tuple(group)) for name, group in types.items()))
+
+    def replace(self, old, new):
+        """
+        Create a piece set with one piece replaced
+        :param old: chess piece to take out
+        :param new: chess piece to put in, or None to only take out
+        :return: PieceSet, new piece set sharing the untouched type tuples
+        """
+        types = dict(self.types)
+        types[old.name] = tuple(piece for piece in types[old.name] if piece is not old)
+        if new is not None:
+            types[new.name] = types[new.name] + (new,)
+        return PieceSet(types)
+
+    def of_type(self, *names):
+        for name in names:
+            yield from self.types[name]
+
+    def __iter__(self):
+        return self.of_type(*PIECE_TYPES)
+
+    def __len__(self):
+        return sum(len(group) for group in self.types.values())
+
+
+class BoardSnapshot:
+    """
+    Immutable chessboard state. Rows are tuples and chess pieces are never changed once they are part of a
+    snapshot, a moved piece is copied into the child snapshot instead.
+    """
+    __slots__ = ['rows', 'pieces', 'kings', 'turn']
+
+    def __init__(self, rows, pieces, kings, turn):
+        self.rows = rows  # Tuple of 8 row tuples, empty squares are zeros
+        self.pieces = pieces  # Dict[str:PieceSet], chess pieces in play for both players
+        self.kings = kings  # Dict[str:King], both kings
+        self.turn = turn  # turn of match, same as Board.turn (white moves on odd turns)
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Take a snapshot of a Board, the pieces are copied so later changes to the board do not leak into it
+        :param board: Board, board to take a snapshot of
+        :return: BoardSnapshot, snapshot of the board state
+        """
+        rows = copy.deepcopy(board.board)
+        pieces = [piece for row in rows for piece in row if piece != 0]
+        players = dict((player, PieceSet.from_pieces(piece for piece in pieces if piece.player == player))
+                       for player in ['white', 'black'])
+        kings = dict((player, next(players[player].of_type('king'))) for player in players)
+        return cls(tuple(tuple(row) for row in rows), players, kings, board.turn)
+
+    def to_board(self):
+        """
+        Create a Board with the snapshot's position
+        :return: Board, new board holding copies of the snapshot's pieces
+        """
+        pieces = [piece for row in self.rows for piece in row if piece != 0]
+        return Board.from_pieces(copy.deepcopy(pieces), self.turn)
+
+    @property
+    def player(self):
+        """ Player to move """
+        return 'white' if self.turn % 2 == 1 else 'black'
+
+    @property
+    def opponent(self):
+        """ Player not to move """
+        return 'black' if self.turn % 2 == 1 else 'white'
+
+    def apply(self, move):
+        """
+        Apply a move without checking its legality
+        :param move: int, packed move
+        :return: BoardSnapshot, child snapshot sharing unchanged rows and pieces with this snapshot
+        """
+        start = packedmoves.start(move)
+        end = packedmoves.end(move)
+        piece = self.rows[start[0]][start[1]]
+        captured_position = end
+        if packedmoves.is_en_passant(move):
+            captured_position = (start[0], end[1])
+        captured = self.rows[captured_position[0]][captured_position[1]]
+
+        # copy the moved piece, the piece in this snapshot stays untouched
+        promotion = packedmoves.promotion(move)
+        if promotion is not None:
+            moved = PROMOTIONS[promotion](end, piece.player)
+        else:
+            moved = copy.copy(piece)
+            moved.update_position(end)
+            if moved.name == 'pawn':
+                moved.move(start, end, self.turn)
+
+        # copy only the rows that changed
+        changed = {}
+        for position, occupant in [(start, 0), (captured_position, 0), (end, moved)]:
+            row = changed.setdefault(position[0], list(self.rows[position[0]]))
+            row[position[1]] = occupant
+        rows = tuple(tuple(changed[i]) if i in changed else self.rows[i] for i in range(8))
+
+        pieces = dict(self.pieces)
+        pieces[piece.player] = pieces[piece.player].replace(piece, moved)
+        if captured != 0:
+            pieces[captured.player] = pieces[captured.player].replace(captured, None)
+        kings = self.kings
+        if piece.name == 'king':
+            kings = dict(kings)
+            kings[piece.player] = moved
+        return BoardSnapshot(rows, pieces, kings, self.turn + 1)
+
+    def is_checked(self, player):
+        """
+        Determine if a player's king is in check
+        :param player: string, 'white' or 'black'
+        :return: boolean, True if the king is in check, False otherwise
+        """
+        king = self.kings[player]
+        return king.is_checked(king.position, self.rows, self.pieces)
+
+    def children(self):
+        """
+        Iterate over the legal moves of the player to move together with the resulting snapshots
+        :return: iterator of (int, BoardSnapshot), packed move and child snapshot
+        """
+        player = self.player
+        for piece in self.pieces[player]:
+            if piece.name == 'pawn':
+                possible_moves, _ = piece.generate_possible_moves(self.rows, piece.directions, turn=self.turn)
+            else:
+                possible_moves = piece.generate_possible_moves(self.rows, piece.directions, turn=self.turn)
+            for end in possible_moves:
+                for move in self.encode(piece, end):
+                    child = self.apply(move)
+                    if not child.is_checked(player):
+                        yield move, child
+
+    def encode(self, piece, end):
+        """
+        Pack a move of a chess piece, pawn moves to the last rank are packed once per promotion piece
+        :param piece: chess piece in play
+        :param end: Tuple(row, col), end position of the piece
+        :return: list of int, packed moves
+        """
+        start = piece.position
+        flags = packedmoves.QUIET
+        if self.rows[end[0]][end[1]] != 0:
+            flags = packedmoves.CAPTURE
+        elif piece.name == 'pawn' and start[1] != end[1]:
+            flags = packedmoves.EN_PASSANT
+        elif piece.name == 'pawn' and abs(end[0] - start[0]) == 2:
+            flags = packedmoves.DOUBLE_PUSH
+        if piece.name == 'pawn' and end[0] in [0, 7]:
+            return [packedmoves.encode(start, end, flags | packedmoves.promotion_flags(name))
+                    for name in packedmoves.PROMOTION_PIECES]
+        return [packedmoves.encode(start, end, flags)]
+
+    def legal_moves(self):
+        """
+        :return: array('H'), packed legal moves of the player to move
+        """
+        moves = packedmoves.new_buffer()
+        moves.extend(move for move, _ in self.children())
+        return moves
+
+    def is_checkmate(self):
+        """ Determine if the player to move is checkmated """
+        return self.is_checked(self.player) and next(self.children(), None) is None
+
+
+def perft(snapshot, depth):
+    """
+    Count the leaf positions of the legal move tree
+    :param snapshot: BoardSnapshot, root position
+    :param depth: int, depth of the tree in plies
+    :return: int, number of leaf positions
+    """
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return sum(1 for _ in snapshot.children())
+    return sum(perft(child, depth - 1) for _, child in snapshot.children())
+
+
+def explore(snapshot, depth, threads=4):
+    """
+    Count the leaf positions of the legal move tree, the subtrees of the root moves are explored by concurrent
+    threads that share the root snapshot without locks
+    :param snapshot: BoardSnapshot, root position
+    :param depth: int, depth of the tree in plies (at least 1)
+    :param threads: int, number of threads
+    :return: Dict[int:int], packed root move -> number of leaf positions below it
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = dict((move, executor.submit(perft, child, depth - 1)) for move, child in snapshot.children())
+        return dict((move, future.result()) for move, future in futures.items())
+
+
+def objects(snapshot):
+    """
+    Collect the objects that make up a snapshot
+    :param snapshot: BoardSnapshot
+    :return: Dict[int:object], id -> object for the snapshot, its containers, chess pieces and their attributes
+    """
+    found = {id(snapshot): snapshot}
+    containers = [snapshot.rows, snapshot.pieces, snapshot.kings]
+    containers.extend(snapshot.rows)
+    containers.extend(snapshot.pieces.values())
+    containers.extend(piece_set.types for piece_set in snapshot.pieces.values())
+    containers.extend(group for piece_set in snapshot.pieces.values() for group in piece_set.types.values())
+    for piece in [piece for row in snapshot.rows for piece in row if piece != 0]:
+        containers.extend([piece, piece.__dict__])
+    for container in containers:
+        found[id(container)] = container
+    return found
+
+
+def child_bytes(parent, child):
+    """
+    Measure the memory a child snapshot adds on top of its parent
+    :param parent: BoardSnapshot, parent position
+    :param child: BoardSnapshot, position created by applying a move to the parent
+    :return: int, bytes of the objects the child does not share with the parent
+    """
+    shared = objects(parent)
+    return sum(sys.getsizeof(obj) for key, obj in objects(child).items() if key not in shared)
+
+
+def snapshot_bytes(snapshot):
+    """
+    Measure the memory of a snapshot without sharing
+    :param snapshot: BoardSnapshot
+    :return: int, bytes of all objects that make up the snapshot
+    """
+    return sum(sys.getsizeof(obj) for obj in objects(snapshot).values())
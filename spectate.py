@@ -0,0 +1,246 @@
+"""
+Fans out the moves of live games to spectators. A Broadcaster attached to a Match publishes every new move once as a
+compact delta, ('move', ply, packed move), to an asyncio queue per subscriber instead of sending the printed board.
+A subscriber gets a full snapshot, ('snapshot', ply, FEN), when it joins and whenever its queue is full: the deltas
+it has not read yet are dropped and replaced by the snapshot, so a slow consumer skips ahead to the current position
+and never holds up the game or the other spectators.
+
+publish() may be called from a thread other than the event loop's (ex. main.py blocking on input()), the messages
+are then built right away and handed to the loop with call_soon_threadsafe().
+
+Usage:
+    python spectate.py --subscribers 5000 --plies 60      # measure fan-out latency with local subscribers
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from board import Board
+from match import Match
+import fuzz
+
+QUEUE_SIZE = 16  # messages a subscriber can fall behind before its pending deltas are replaced by a snapshot
+
+
+class Subscriber:
+    """ Queue of messages for one spectator, read it with get() or async for """
+
+    def __init__(self, broadcaster, queue_size):
+        self.broadcaster = broadcaster
+        self.queue = asyncio.Queue(queue_size)
+        self.dropped = 0  # deltas dropped because the queue was full
+        self.snapshots = 0  # snapshots sent because the queue was full
+
+    async def get(self):
+        """
+        :return: tuple, next message, ('move', ply, packed move) or ('snapshot', ply, FEN)
+        """
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    def put(self, message, snapshot):
+        """
+        Queue a message, when the queue is full its pending messages are dropped and the snapshot is queued instead
+        :param message: tuple, message to queue
+        :param snapshot: tuple, snapshot of the position after the message
+        :return: boolean, True if the message was queued, False if the snapshot replaced it
+        """
+        if not self.queue.full():
+            self.queue.put_nowait(message)
+            return True
+        while not self.queue.empty():
+            if self.queue.get_nowait()[0] == 'move':
+                self.dropped += 1
+        self.dropped += message[0] == 'move'
+        self.queue.put_nowait(snapshot)
+        self.snapshots += 1
+        return False
+
+    def close(self):
+        """ Stop receiving messages """
+        self.broadcaster.unsubscribe(self)
+
+
+class Broadcaster:
+    """ Publishes the moves of one game to its subscribers """
+
+    def __init__(self, queue_size=QUEUE_SIZE, loop=None):
+        self.queue_size = queue_size
+        self.loop = loop  # event loop of the subscribers, set by the first subscribe() if None
+        self.subscribers = set()
+        self.ply = 0  # number of moves published
+        self.fen = Board().fen()  # position after the last published move
+        self.published = 0  # deltas published
+
+    def snapshot(self):
+        return 'snapshot', self.ply, self.fen
+
+    def subscribe(self):
+        """
+        Add a subscriber, its queue starts with a snapshot of the current position. Must be called in the event loop.
+        :return: Subscriber
+        """
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        subscriber = Subscriber(self, self.queue_size)
+        subscriber.put(self.snapshot(), self.snapshot())
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, board):
+        """
+        Publish the moves played on the board since the last call
+        :param board: Board, board of the game
+        :return: int, number of moves published
+        """
+        history = board.history
+        if len(history) < self.ply:
+            # the board was reset or replaced, start over from a snapshot
+            self.ply = 0
+            messages = []
+        else:
+            messages = [('move', ply + 1, history[ply]) for ply in range(self.ply, len(history))]
+            if not messages:
+                return 0
+        self.ply = len(history)
+        self.fen = board.fen()
+        self.published += len(messages)
+        snapshot = self.snapshot()
+        if not messages:
+            messages = [snapshot]
+        if self.loop is None:
+            return len(messages)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop or (running is None and not self.loop.is_running()):
+            self.deliver(messages, snapshot)
+        else:
+            self.loop.call_soon_threadsafe(self.deliver, messages, snapshot)
+        return len(messages)
+
+    def deliver(self, messages, snapshot):
+        """
+        Queue messages for every subscriber, a subscriber whose queue fills up gets the snapshot instead of the rest
+        :param messages: list of tuples, messages in order
+        :param snapshot: tuple, snapshot of the position after the last message
+        """
+        for subscriber in list(self.subscribers):
+            for message in messages:
+                if not subscriber.put(message, snapshot):
+                    break
+
+    def stats(self):
+        """
+        :return: dict, 'subscribers', 'plies', 'published' deltas, 'dropped' deltas and 'snapshots' sent to subscribers
+        that fell behind
+        """
+        return {'subscribers': len(self.subscribers), 'plies': self.ply, 'published': self.published,
+                'dropped': sum(subscriber.dropped for subscriber in self.subscribers),
+                'snapshots': sum(subscriber.snapshots for subscriber in self.subscribers)}
+
+
+def apply(board, message):
+    """
+    Update a spectator's board with a message
+    :param board: Board or NoneType, spectator's copy of the game
+    :param message: tuple, message from a Subscriber
+    :return: Board, board after the message
+    """
+    kind, ply, content = message
+    if kind == 'snapshot':
+        return Board.from_fen(content)
+    if board is None or board.turn != ply:
+        raise ValueError('move {} does not follow the spectator\'s position'.format(ply))
+    if not board.apply_move(content):
+        raise ValueError('move {} is illegal in the spectator\'s position'.format(ply))
+    return board
+
+
+async def measure(subscribers=1000, plies=60, seed=0, slow=0, queue_size=QUEUE_SIZE):
+    """
+    Play a random game on a Match and measure how long each published move takes to reach every local subscriber
+    :param subscribers: int, number of subscribers
+    :param plies: int, length limit of the game
+    :param seed: int, seed of the random game
+    :param slow: int, number of subscribers that only read after the game is over
+    :param queue_size: int, queue size of each subscriber
+    :return: dict, Broadcaster.stats() with the 'mean', 'p50', 'p99' and 'max' latency in seconds from publishing
+    a move to a subscriber reading it, and 'publish' seconds spent queueing each move for every subscriber
+    """
+    moves, _ = fuzz.play_random_game(random.Random(seed), plies)
+    match = Match()
+    match.spectators = broadcaster = Broadcaster(queue_size)
+    published = {}
+    latencies = []
+    received = asyncio.Event()
+    pending = [0]
+
+    async def spectate(subscriber):
+        async for kind, ply, _ in subscriber:
+            if kind == 'move':
+                latencies.append(time.perf_counter() - published[ply])
+                pending[0] -= 1
+                if pending[0] == 0:
+                    received.set()
+            if ply == len(moves):
+                return
+
+    readers = [broadcaster.subscribe() for _ in range(subscribers)]
+    for _ in range(slow):
+        broadcaster.subscribe()
+    for reader in readers:
+        reader.queue.get_nowait()  # skip the initial snapshot
+    tasks = [asyncio.ensure_future(spectate(reader)) for reader in readers]
+    publishing = []
+    for ply, move in enumerate(moves, 1):
+        received.clear()
+        pending[0] = subscribers
+        match.chessboard.apply_move(move)
+        published[ply] = start = time.perf_counter()
+        match.publish()
+        publishing.append(time.perf_counter() - start)
+        if subscribers:
+            await received.wait()
+    await asyncio.gather(*tasks)
+    report = broadcaster.stats()
+    latencies.sort()
+    if latencies:
+        report.update(mean=statistics.mean(latencies), p50=latencies[len(latencies) // 2],
+                      p99=latencies[int(len(latencies) * 0.99)], max=latencies[-1])
+    report['publish'] = statistics.mean(publishing) if publishing else 0.0
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure the latency of fanning out moves to spectators')
+    parser.add_argument('--subscribers', type=int, default=1000, help='number of subscribers (default: %(default)s)')
+    parser.add_argument('--slow', type=int, default=0, help='subscribers that do not read during the game')
+    parser.add_argument('--plies', type=int, default=60, help='length limit of the game (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the random game (default: %(default)s)')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE, help='queue size of each subscriber')
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(measure(args.subscribers, args.plies, args.seed, args.slow, args.queue_size))
+    print('{} subscribers, {} plies, {} deltas dropped, {} snapshots sent'.format(
+        report['subscribers'], report['plies'], report['dropped'], report['snapshots']))
+    if 'mean' in report:
+        print('latency mean {:.3f} ms, p50 {:.3f} ms, p99 {:.3f} ms, max {:.3f} ms'.format(
+            *(report[name] * 1000 for name in ['mean', 'p50', 'p99', 'max'])))
+    print('publishing a move to every subscriber takes {:.3f} ms'.format(report['publish'] * 1000))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
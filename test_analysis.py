@@ -0,0 +1,75 @@
+"""
+Unit tests for analysis.py
+"""
+import threading
+import time
+import unittest
+from board import Board
+from snapshot import BoardSnapshot
+import analysis
+import packedmoves
+import search
+
+
+class TestAnalysis(unittest.TestCase):
+    """ Unit tests for analysis module """
+
+    def test_analyze(self):
+        """ Unit test for analysis.analyze() function """
+        position = BoardSnapshot.from_board(Board.from_fen('6k1/5ppp/8/8/3n4/8/8/R5K1 w - - 0 1'))
+        depths = []
+        result = analysis.analyze(position, multipv=3, depth=2,
+                                  callback=lambda partial: depths.append(partial['depth']))
+        self.assertEqual(depths, [1, 2])
+        self.assertEqual(result['depth'], 2)
+        self.assertEqual(len(result['lines']), 3)
+        self.assertEqual(packedmoves.to_coordinate(result['lines'][0]['pv'][0]), 'a1a8')
+        self.assertEqual(result['lines'][0]['score'], search.MATE - 1)
+
+        # test the scores of every line match a full window search of its move
+        children = dict(position.children())
+        for line in result['lines']:
+            move = line['pv'][0]
+            (score, _), = search.Search(position).root_moves(2, [(move, children[move])])
+            self.assertEqual(line['score'], score, packedmoves.to_coordinate(move))
+        scores = [line['score'] for line in result['lines']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+        # test no legal move and invalid number of lines
+        self.assertEqual(analysis.analyze(Board.from_fen('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1'))['lines'], [])
+        self.assertRaises(ValueError, analysis.analyze, Board(), multipv=0)
+
+    def test_budgets(self):
+        """ Unit test for the node and time budgets """
+        # test the node budget is never exceeded
+        instance = analysis.Analysis(Board(), multipv=2, nodes=500)
+        results = list(instance.iterate())
+        self.assertEqual(instance.search.nodes, 500)
+        self.assertTrue(all(result['nodes'] <= 500 for result in results))
+
+        # test a budget too small for depth 1 still ranks moves
+        result = analysis.analyze(Board(), multipv=4, nodes=3)
+        self.assertEqual(result['depth'], 0)
+        self.assertEqual(len(result['lines']), 4)
+
+        start = time.perf_counter()
+        result = analysis.analyze(Board(), time_ms=100)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertGreaterEqual(result['depth'], 1)
+
+    def test_cancel(self):
+        """ Unit test for cancelling an analysis from another thread """
+        stop = threading.Event()
+        results = []
+        thread = threading.Thread(target=lambda: results.append(
+            analysis.analyze(Board(), depth=search.MAX_DEPTH, stop=stop)))
+        thread.start()
+        time.sleep(0.2)
+        stop.set()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(results[0]['lines']), analysis.MULTIPV)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+"""
+Unit tests for attackmaps.py
+"""
+import unittest
+import attackmaps
+from board import Board
+
+
+@unittest.skipIf(attackmaps.numpy is None, 'NumPy is not installed')
+class TestAttackMaps(unittest.TestCase):
+    """ Unit tests for attackmaps module """
+
+    def test_analyze(self):
+        """ Unit test for attackmaps.analyze() function """
+        results = attackmaps.analyze(attackmaps.encode([Board(), Board.from_fen('6rk/5Npp/8/8/8/8/8/6K1 b - - 0 1')]))
+        self.assertEqual(results['mobility'][0].tolist(), [20, 20])
+        self.assertEqual(results['check'].tolist(), [[False, False], [False, True]])
+        self.assertEqual(int(results['attacks'][0, 0].sum()), 22)  # squares attacked by white at the start
+        self.assertTrue(results['attacks'][0, 0, 5].all())  # every square of the third rank
+        self.assertFalse(results['attacks'][0, 0, 4].any())  # no square of the fourth rank
+
+    def test_validate(self):
+        """ Unit test for attackmaps.analyze() against Board on random positions """
+        boards = attackmaps.random_positions(games=3, seed=1, max_plies=80)
+        self.assertEqual(attackmaps.validate(boards), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Unit tests for benchmark.py
+"""
+import os
+import tempfile
+import unittest
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    """ Unit tests for benchmark module """
+
+    def test_replay(self):
+        """ Unit test for benchmark.replay() function """
+        # test every bundled game replays with legal moves only
+        for name in benchmark.GAMES:
+            benchmark.replay(benchmark.GAMES[name])
+
+        # test scholar's mate position is checkmate
+        self.assertEqual(benchmark.position(benchmark.CHECKMATE).check('black'), 'checkmate')
+
+        # test rejection of an illegal move
+        self.assertRaises(ValueError, benchmark.replay, 'e2e5')
+
+    def test_run(self):
+        """ Unit test for benchmark.run() function """
+        results = benchmark.run(['board_init', 'moves_knight'], repeat=1, scale=0.01)
+        self.assertEqual(set(results), {'board_init', 'moves_knight'})
+        self.assertTrue(all(seconds > 0 for seconds in results.values()))
+
+    def test_compare(self):
+        """ Unit test for benchmark.compare() function """
+        baseline = {'a': 1.0, 'b': 1.0, 'c': 1.0}
+        results = {'a': 1.05, 'b': 1.5, 'c': 0.5, 'd': 9.0}
+        regressions = benchmark.compare(baseline, results, threshold=0.1)
+        # test only the benchmark slower than the threshold is flagged, new benchmarks are ignored
+        self.assertEqual([regression[0] for regression in regressions], ['b'])
+        self.assertAlmostEqual(regressions[0][3], 1.5)
+
+    def test_save_load(self):
+        """ Unit test for benchmark.save() and benchmark.load() functions """
+        results = {'board_init': 2.5e-05}
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            benchmark.save(results, path)
+            self.assertEqual(benchmark.load(path), results)
+
+
+if __name__ == '__main__':
+    unittest.main()
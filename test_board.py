@@ -1,8 +1,11 @@
 """
 Unit tests for board.py
 """
+import contextlib
+import io
 import unittest
 import board
+import packedmoves
 from pieces import Knight, Queen, Pawn, Bishop
 
 
@@ -38,6 +41,36 @@ class TestBoard(unittest.TestCase):
         self.assertEqual(test_board.algebraic_to_index('h1'), (7, 7))
         self.assertEqual(test_board.algebraic_to_index('g5'), (3, 6))
 
+    def test_squares(self):
+        """ Unit test for the square lookup tables """
+        self.assertEqual(len(board.SQUARES), 64)
+        for name, (row, col) in board.SQUARES.items():
+            self.assertEqual(board.SQUARE_NAMES[row][col], name)
+
+    def test_index_to_algebraic(self):
+        """ Unit test for Board.index_to_algebraic() method """
+        test_board = board.Board()
+
+        # test proper conversion of board matrix indices to algebraic notation
+        self.assertEqual(test_board.index_to_algebraic((0, 0)), 'a8')
+        self.assertEqual(test_board.index_to_algebraic((7, 7)), 'h1')
+        self.assertEqual(test_board.index_to_algebraic((3, 6)), 'g5')
+
+    def test_legal_moves(self):
+        """ Unit test for Board.legal_moves() method """
+        # test 20 legal moves for each player in the starting position
+        test_board = board.Board()
+        self.assertEqual(len(test_board.legal_moves('white')), 20)
+        self.assertEqual(len(test_board.legal_moves('black')), 20)
+        self.assertIn(((7, 6), (5, 5)), test_board.legal_moves('white'))  # knight g1 to f3
+
+        # test pinned knight can not move (white knight on e3 pinned to king on e1 by black queen on e5)
+        pieces = {'white': {'initial': [(6, 4), (7, 6)], 'final': [(4, 0), (5, 4)]},
+                  'black': {'initial': [(0, 3)], 'final': [(3, 4)]}}
+        test_board = generate_scenario(pieces)
+        self.assertTrue(test_board.possible_moves(test_board.get_piece('e3')))
+        self.assertFalse([move for move in test_board.legal_moves('white') if move[0] == (5, 4)])
+
     def test_check(self):
         """ Unit test for Board.check() method """
         # craft scenario where black's king is in check, but not checkmate
@@ -83,6 +116,70 @@ class TestBoard(unittest.TestCase):
         # test proper detection of a complex check/non-checkmate scenario that requires non-king move
         self.assertNotEqual(test_board.check('white'), 'checkmate')
 
+        # test smothered mate by a knight
+        test_board = board.Board.from_fen('6rk/5Npp/8/8/8/8/8/6K1 b - - 0 1')
+        self.assertEqual(test_board.check('black'), 'checkmate')
+
+    def test_leaves_king_in_check(self):
+        """ Unit test for Board.leaves_king_in_check() method """
+        test_board = board.Board.from_fen('4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1')
+        pawn = test_board.get_piece('e4')
+        order = list(test_board.active_pieces['black'])
+        self.assertFalse(test_board.leaves_king_in_check(pawn, (3, 3)))
+        # test the captured piece gets its slot back
+        self.assertEqual(list(test_board.active_pieces['black']), order)
+
+        # test the board is restored when the check raises
+        fen = test_board.fen()
+        king = test_board.kings['white']
+
+        def broken(*args):
+            raise RuntimeError('broken check')
+        king.is_checked = broken
+        self.assertRaises(RuntimeError, test_board.leaves_king_in_check, pawn, (3, 3))
+        del king.is_checked
+        self.assertEqual(test_board.fen(), fen)
+        self.assertEqual(list(test_board.active_pieces['black']), order)
+
+    def test_iter_legal_moves(self):
+        """ Unit test for Board.iter_legal_moves() and Board.has_legal_move() methods """
+        # test every legal move is generated, captures first
+        test_board = board.Board.from_fen('rnbqkbnr/ppp1pppp/8/3p4/4P3/8/PPPP1PPP/RNBQKBNR w - d6 0 2')
+        moves = list(test_board.iter_legal_moves('white'))
+        self.assertEqual(len(set(moves)), 31)
+        self.assertEqual(moves[0], ((4, 4), (3, 3)))
+
+        # test stages in check: king evasions, capture of the checker, then interposition
+        test_board = board.Board.from_fen('4k3/8/8/8/8/1N6/4B3/r3K3 w - - 0 1')
+        moves = list(test_board.iter_legal_moves('white'))
+        self.assertEqual(len(moves), 5)
+        self.assertEqual(sorted(moves[:2]), [((7, 4), (6, 3)), ((7, 4), (6, 5))])
+        self.assertEqual(moves[2], ((5, 1), (7, 0)))
+        self.assertEqual(sorted(moves[3:]), [((5, 1), (7, 2)), ((6, 4), (7, 3))])
+        self.assertTrue(test_board.has_legal_move('white'))
+
+        # test moves of a single piece in check, the bishop can only interpose and the king only evade
+        self.assertEqual(list(test_board.iter_legal_moves('white', test_board.get_piece('e2'))), [((6, 4), (7, 3))])
+        self.assertEqual(sorted(test_board.iter_legal_moves('white', test_board.get_piece('e1'))),
+                         [((7, 4), (6, 3)), ((7, 4), (6, 5))])
+
+        # test no legal move in checkmate and stalemate
+        self.assertFalse(board.Board.from_fen('6rk/5Npp/8/8/8/8/8/6K1 b - - 0 1').has_legal_move('black'))
+        self.assertFalse(board.Board.from_fen('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1').has_legal_move('black'))
+
+    def test_is_square_attacked(self):
+        """ Unit test for Board.is_square_attacked() and Board.attackers_of() methods """
+        test_board = board.Board()
+        self.assertTrue(test_board.is_square_attacked((5, 0), 'white'))  # pawn and knight
+        self.assertFalse(test_board.is_square_attacked((4, 0), 'white'))
+        self.assertEqual(len(list(test_board.attackers_of((5, 0), 'white'))), 2)
+        self.assertFalse(test_board.is_square_attacked((5, 0), 'black'))
+
+        # test sliders are blocked by pieces in between
+        test_board = board.Board.from_fen('4k3/8/8/8/8/2N5/4B3/r3K3 w - - 0 1')
+        self.assertEqual(list(test_board.attackers_of((7, 4), 'black')), [test_board.get_piece('a1')])
+        self.assertFalse(test_board.is_square_attacked((7, 5), 'black'))
+
     def test_execute_move(self):
         """ Unit test for Board.execute_move() method """
         # test basic move execution
@@ -138,6 +235,177 @@ class TestBoard(unittest.TestCase):
         test_board.select('b5')  # select white pawn in en passant position (turn 4)
         self.assertFalse(test_board.execute_move('c6'))  # attempt en passant move
 
+    def test_legal_destinations(self):
+        """ Unit test for Board.legal_destinations() method """
+        # test destinations are computed on selection
+        test_board = board.Board()
+        test_board.select('e2')
+        self.assertEqual(test_board.destinations, {(5, 4), (4, 4)})
+
+        # test destinations are reused until the board changes
+        destinations = test_board.legal_destinations()
+        self.assertIs(test_board.legal_destinations(), destinations)
+        test_board.execute_move('e4')
+        self.assertEqual(test_board.legal_destinations(), {(3, 4)})
+
+        # test king can not move into check
+        pieces = {'white': {'initial': [(7, 4)], 'final': [(5, 5)]},
+                  'black': {'initial': [(0, 3)], 'final': [(3, 3)]}}
+        test_board = generate_scenario(pieces)
+        test_board.select('f3')
+        self.assertNotIn((4, 4), test_board.legal_destinations())  # e4 is attacked by black queen on d5
+        self.assertIn((4, 6), test_board.legal_destinations())
+
+        # test pinned piece keeps to the pin line (white queen on e3 pinned to king on e1 by black queen on e5)
+        pieces = {'white': {'initial': [(6, 4), (7, 3)], 'final': [(5, 0), (5, 4)]},
+                  'black': {'initial': [(0, 3)], 'final': [(3, 4)]}}
+        test_board = generate_scenario(pieces)
+        test_board.select('e3')
+        self.assertEqual(test_board.legal_destinations(), {(6, 4), (4, 4), (3, 4)})
+
+        # test en passant destination is included
+        pcs = {'white': {'initial': [(6, 1)], 'final': [(3, 1)]}}
+        test_board = generate_scenario(pcs)
+        test_board.select('c7')
+        test_board.execute_move('c5')
+        test_board.select('b5')
+        self.assertEqual(test_board.legal_destinations(), {(2, 1), (2, 2)})
+
+    def test_generate_moves(self):
+        """ Unit test for Board.generate_moves() method """
+        test_board = board.Board()
+        moves = test_board.generate_moves('white')
+        self.assertEqual(len(moves), 20)
+        self.assertIn(test_board.parse_move('e2e4'), moves)
+        # test the board's buffer is reused across calls
+        self.assertIs(test_board.generate_moves('black'), moves)
+
+        # test promotions are listed once per piece type with the capture flag
+        pcs = {'white': {'initial': [(6, 0)], 'final': [(1, 0)]}, 'black': {'initial': [(0, 0)], 'final': [(3, 3)]}}
+        test_board = generate_scenario(pcs)
+        promotions = [move for move in test_board.generate_moves('white') if packedmoves.promotion(move)]
+        self.assertEqual(len(promotions), 8)  # push to a8 and capture on b8
+        self.assertIn(test_board.parse_move('a7b8r'), promotions)
+        self.assertTrue(packedmoves.is_capture(test_board.parse_move('a7b8r')))
+
+    def test_play(self):
+        """ Unit test for Board.play() method and the move history """
+        pcs = {'white': {'initial': [(6, 1)], 'final': [(3, 1)]}}
+        test_board = generate_scenario(pcs)
+        self.assertTrue(test_board.play(test_board.parse_move('c7c5')))
+        en_passant = test_board.parse_move('b5c6')
+        self.assertTrue(packedmoves.is_en_passant(en_passant))
+        self.assertTrue(test_board.play(en_passant))
+        self.assertEqual(test_board.get_piece('c5'), 0)
+        self.assertEqual([packedmoves.to_coordinate(move) for move in test_board.history], ['c7c5', 'b5c6'])
+        self.assertEqual(packedmoves.flags(test_board.history[0]), packedmoves.DOUBLE_PUSH)
+
+        # test promotion is recorded in the move history
+        pcs = {'white': {'initial': [(6, 0)], 'final': [(1, 0)]}, 'black': {'initial': [(0, 0)], 'final': [(3, 3)]}}
+        test_board = generate_scenario(pcs)
+        self.assertTrue(test_board.play(test_board.parse_move('a7a8n')))
+        self.assertEqual(test_board.get_piece('a8').name, 'knight')
+        self.assertEqual(packedmoves.to_coordinate(test_board.history[-1]), 'a7a8n')
+
+        # test rejection of illegal move
+        self.assertFalse(test_board.play(test_board.parse_move('a8a6')))
+
+    def test_fen(self):
+        """ Unit test for Board.fen() and Board.from_fen() methods """
+        test_board = board.Board()
+        self.assertEqual(test_board.fen(), 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1')
+        for move in 'e2e4 d7d5 e4e5 f7f5'.split():
+            test_board.play(test_board.parse_move(move))
+        fen = 'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w - f6 0 3'
+        self.assertEqual(test_board.fen(), fen)
+
+        # test round trip keeps turn, moved pawns and the en passant capture
+        copied = board.Board.from_fen(fen)
+        self.assertEqual(copied.fen(), fen)
+        self.assertEqual(copied.turn, test_board.turn)
+        self.assertEqual(sorted(copied.generate_moves('white')), sorted(test_board.generate_moves('white')))
+        self.assertIn(copied.parse_move('e5f6'), copied.generate_moves('white'))
+
+    def test_parse_san(self):
+        """ Unit test for Board.parse_san() and Board.move_index() methods """
+        test_board = board.Board()
+        self.assertEqual(test_board.parse_san('Nf3'), test_board.parse_move('g1f3'))
+        self.assertEqual(test_board.parse_san('e4'), test_board.parse_move('e2e4'))
+        index = test_board.move_index()
+        self.assertEqual(len(index), 20)
+        self.assertIs(test_board.move_index(), index)  # index is reused until the board changes
+        self.assertEqual(index[('knight', (5, 5))], [test_board.parse_move('g1f3')])
+
+        # test disambiguation, captures, promotions and suffixes
+        test_board = board.Board.from_fen('3r1k2/1P6/8/3p4/4P3/8/8/R2R2K1 w - - 0 1')
+        self.assertEqual(test_board.parse_san('Rac1'), test_board.parse_move('a1c1'))
+        self.assertEqual(test_board.parse_san('R1d2'), test_board.parse_move('d1d2'))
+        self.assertEqual(test_board.parse_san('exd5'), test_board.parse_move('e4d5'))
+        self.assertEqual(test_board.parse_san('b8=Q+'), test_board.parse_move('b7b8q'))
+        self.assertEqual(test_board.parse_san('b8N'), test_board.parse_move('b7b8n'))
+        for san, error in [('Rc1', 'ambiguous'), ('b8', 'illegal'), ('Nf3', 'illegal'), ('O-O', 'unreadable'),
+                           ('e9', 'unreadable')]:
+            with self.assertRaises(ValueError) as context:
+                test_board.parse_san(san)
+            self.assertTrue(str(context.exception).startswith(error), san)
+
+        # test index follows the board state
+        test_board.apply_moves(['Rxd5'])
+        self.assertIn(('king', (1, 4)), test_board.move_index())
+        self.assertEqual(test_board.parse_san('Ke7'), test_board.parse_move('f8e7'))
+
+    def test_apply_moves(self):
+        """ Unit test for Board.apply_moves() method """
+        test_board = board.Board()
+        reference = board.Board()
+        moves = 'e2e4 d7d5 e4e5 f7f5 e5f6 g8h6 f6g7 b8c6 g7f8n'.split()
+        for move in moves:
+            reference.play(reference.parse_move(move))
+
+        # test coordinate notation, SAN and packed moves can be mixed and nothing is printed
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertIsNone(test_board.apply_moves(['e2e4', 'd5', 'e5', 'f7f5', 'exf6', 'Nh6', 'fxg7', 'Nc6',
+                                                      reference.history[8]]))
+        self.assertEqual(output.getvalue(), '')
+        self.assertEqual(test_board.fen(), reference.fen())
+        self.assertEqual(list(test_board.history), list(reference.history))
+        self.assertEqual(test_board.get_piece('f8').name, 'knight')
+
+        # test moves stop at the first illegal move
+        for illegal in [['e2e4', 'e7e5', 'e4e5'], ['e2e4', 'e7e5', 'a3a4'], ['e2e4', 'e7e5', 'e7e6'],
+                        ['e2e4', 'e7e5', 'Nf6'], ['e2e4', 'e7e5', 'e4'], ['e2e4', 'e7e5', 'a2a3q']]:
+            test_board = board.Board()
+            self.assertEqual(test_board.apply_moves(illegal), 2, illegal)
+            self.assertEqual(test_board.turn, 3)
+
+        # test move leaving the king in check is rejected
+        test_board = board.Board.from_fen('4k3/8/8/8/8/8/4r3/4K1R1 w - - 0 1')
+        self.assertEqual(test_board.apply_moves(['g1g2']), 0)
+        self.assertIsNone(test_board.apply_moves(['Kxe2']))
+
+    def test_see(self):
+        """ Unit test for Board.see() method """
+        cases = [
+            ('1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1', 'e1e5', 100),  # undefended pawn
+            ('1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1', 'd3e5', -200),  # knight for pawn
+            ('3rk3/3r4/8/3p4/8/8/3R4/3RK3 w - - 0 1', 'd2d5', -400),  # doubled rooks on both sides (X-rays)
+            ('4k3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1', 'd2d5', 100),
+            ('4k3/3p4/8/8/8/8/8/3QK3 w - - 0 1', 'd1d7', -800),  # king recaptures
+            ('4k3/3p4/8/8/8/8/3R4/3QK3 w - - 0 1', 'd2d7', 100),  # king can not recapture a defended rook
+            ('4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 2', 'e5d6', 100),  # en passant
+            ('2r1k3/1P6/8/8/8/8/8/4K3 w - - 0 1', 'b7c8q', 1300),  # capture with promotion
+            ('2r1k3/1P6/8/8/8/8/8/4K3 w - - 0 1', 'b7b8q', -100),  # promoted queen is lost
+            ('4k3/8/8/8/3p4/8/8/3QK3 w - - 0 1', 'd1d3', 0),  # quiet move to a safe square
+            ('4k3/8/8/8/3p4/8/8/3QK3 w - - 0 1', 'd1c3', -900),  # quiet move to an attacked square
+        ]
+        for fen, move, expected in cases:
+            test_board = board.Board.from_fen(fen)
+            self.assertEqual(test_board.see(test_board.parse_move(move)), expected, (fen, move))
+            # test the board is left unchanged
+            self.assertEqual(test_board.fen(), fen)
+        self.assertRaises(ValueError, board.Board().see, packedmoves.encode((4, 4), (3, 4)))  # empty square
+
     def test_is_pawn_promotion(self):
         """ Unit test for Board.is_pawn_promotion() method """
         # craft pawn promotion scenario for both players
@@ -0,0 +1,118 @@
+"""
+Unit tests for distributed.py
+"""
+import json
+import socket
+import threading
+import unittest
+from board import Board
+import distributed
+
+
+def garbage_worker(coordinator, reply):
+    """ Connect as a worker that answers its first task with a reply that is not a valid answer """
+    with socket.create_connection(coordinator.address) as connection, connection.makefile('rw') as stream:
+        distributed.send(stream, {'worker': 'garbage'})
+        stream.readline()
+        stream.write(reply + '\n')
+        stream.flush()
+        stream.readline()  # wait until the coordinator drops the connection
+
+
+def start_workers(coordinator, count, **kwargs):
+    """ Run workers in threads of this process """
+    threads = [threading.Thread(target=distributed.run_worker, args=coordinator.address,
+                                kwargs=dict(kwargs, name='worker-{}'.format(index)), daemon=True)
+               for index in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+class TestDistributed(unittest.TestCase):
+    """ Unit tests for distributed module """
+
+    def test_perft(self):
+        """ Unit test for distributing a perft run """
+        board = Board()
+        tasks = distributed.perft_tasks(board, 3)
+        self.assertEqual(len(tasks), 20)
+        coordinator = distributed.Coordinator(tasks)
+        threads = start_workers(coordinator, 2)
+        report = coordinator.run(timeout=60)
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(report['nodes'], 8902)
+        self.assertEqual(sorted(report['workers']), ['worker-0', 'worker-1'])
+        self.assertEqual(sum(stats['tasks'] for stats in report['workers'].values()), 20)
+        self.assertTrue(all(0 <= stats['utilization'] <= 1 for stats in report['workers'].values()))
+        self.assertGreater(report['nodes_per_second'], 0)
+
+    def test_reassign(self):
+        """ Unit test for reassigning the tasks of lost workers """
+        fen = '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1'
+        coordinator = distributed.Coordinator(distributed.perft_tasks(Board.from_fen(fen), 3))
+        reports = []
+        run = threading.Thread(target=lambda: reports.append(coordinator.run(timeout=60)))
+        run.start()
+        for thread in start_workers(coordinator, 1, fail_after=2):
+            thread.join(30)  # the lost worker took a task it never answered
+        start_workers(coordinator, 1)
+        run.join(60)
+        report = reports[0]
+        self.assertEqual(report['nodes'], 2812)
+        self.assertEqual(report['reassigned'], 1)
+
+    def test_analyze(self):
+        """ Unit test for distributing position analysis """
+        fens = [Board().fen(), '6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1', '4k3/8/8/8/8/8/8/4K3 b - - 0 1']
+        tasks = distributed.analysis_tasks(fens, 'mobility', chunk_size=2)
+        self.assertEqual([len(task['fens']) for task in tasks], [2, 1])
+        coordinator = distributed.Coordinator(tasks)
+        start_workers(coordinator, 1)
+        report = coordinator.run(timeout=60)
+        self.assertEqual(report['results'], {0: [20, 17], 1: [5]})
+        self.assertEqual(report['nodes'], 3)
+
+        # test coordinator gives up when no worker finishes the tasks
+        coordinator = distributed.Coordinator(tasks)
+        self.assertRaises(TimeoutError, coordinator.run, 0.1)
+
+    def test_failures(self):
+        """ Unit test for tasks that raise on workers """
+        fens = [Board().fen(), 'not a fen']
+        tasks = distributed.analysis_tasks(fens, 'material', chunk_size=1)
+        coordinator = distributed.Coordinator(tasks)
+        threads = start_workers(coordinator, 2)
+        report = coordinator.run(timeout=60)
+        for thread in threads:
+            thread.join(10)
+        # test the failing task is reported once and not handed to the other worker
+        self.assertEqual(report['results'], {0: [0]})
+        self.assertEqual(list(report['failures']), [1])
+        self.assertEqual(report['reassigned'], 0)
+
+    def test_garbage_reply(self):
+        """ Unit test for replies that are valid JSON but not an answer """
+        tasks = distributed.analysis_tasks([Board().fen()], 'material')
+        coordinator = distributed.Coordinator(tasks)
+        reports = []
+        run = threading.Thread(target=lambda: reports.append(coordinator.run(timeout=60)))
+        run.start()
+        garbage_worker(coordinator, json.dumps([1]))
+        start_workers(coordinator, 1)
+        run.join(60)
+        self.assertEqual(reports[0]['results'], {0: [0]})
+        self.assertEqual(reports[0]['reassigned'], 1)
+
+        # test a task that loses max_attempts workers fails instead of waiting forever
+        coordinator = distributed.Coordinator(tasks, max_attempts=1)
+        run = threading.Thread(target=lambda: reports.append(coordinator.run(timeout=60)))
+        run.start()
+        garbage_worker(coordinator, json.dumps({'id': 0}))
+        run.join(60)
+        self.assertEqual(reports[1]['failures'], {0: 'lost 1 workers'})
+
+
+if __name__ == '__main__':
+    unittest.main()
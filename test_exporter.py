@@ -0,0 +1,54 @@
+"""
+Unit tests for exporter.py
+"""
+import json
+import os
+import tempfile
+import unittest
+import exporter
+import packedmoves
+from board import Board
+
+
+@unittest.skipIf(exporter.numpy is None, 'NumPy is not installed')
+class TestExporter(unittest.TestCase):
+    """ Unit tests for exporter module """
+
+    def test_export(self):
+        """ Unit test for exporter.export() and exporter.load() functions """
+        board = Board()
+        games = [('e4 e5 Bc4 Nc6 Qh5 Nf6 Qxf7#'.split(), '1-0'), (['d4', 'd5'], '*'),
+                 ([board.parse_move('g1f3'), board.parse_move('g8f6')], '1/2-1/2')]
+        with tempfile.TemporaryDirectory() as directory:
+            stats = exporter.export(games, directory, shard_size=4)
+            self.assertEqual((stats['games'], stats['positions'], stats['shards']), (2, 9, 3))
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                manifest = json.load(f)
+            self.assertEqual([shard['positions'] for shard in manifest['shards']], [4, 4, 1])
+
+            shard = exporter.load(directory, 0)
+            self.assertEqual(shard['planes'].shape, (4, 12, 8, 8))
+            self.assertEqual(int(shard['planes'][0].sum()), 32)
+            self.assertTrue(shard['planes'][0, 0, 6].all())  # white pawns on the second rank
+            self.assertEqual(shard['side'].tolist(), [0, 1, 0, 1])
+            self.assertEqual(packedmoves.to_coordinate(int(shard['move'][0])), 'e2e4')
+            self.assertEqual(shard['result'].tolist(), [1, 1, 1, 1])
+
+            # test the last shard is trimmed and holds the drawn game
+            shard = exporter.load(directory, 2)
+            self.assertEqual(shard['planes'].shape, (1, 12, 8, 8))
+            self.assertEqual((shard['side'][0], shard['result'][0]), (1, 0))
+            self.assertEqual(packedmoves.to_coordinate(int(shard['move'][0])), 'g8f6')
+
+        # test a game with an illegal move is left out and the games before it are kept
+        games = [(['e4', 'e5'], '1-0'), (['d4', 'd5', 'Ke3'], '0-1'), (['c4'], '1-0')]
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertRaises(ValueError, exporter.export, games, directory, shard_size=4)
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                manifest = json.load(f)
+            self.assertEqual(manifest['positions'], 2)
+            self.assertEqual(exporter.load(directory, 0)['result'].tolist(), [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Unit tests for fuzz.py
+"""
+import io
+import random
+import unittest
+from board import Board
+import fuzz
+
+
+class TestFuzz(unittest.TestCase):
+    """ Unit tests for fuzz module """
+
+    def test_play_random_game(self):
+        """ Unit test for fuzz.play_random_game() function """
+        moves, result = fuzz.play_random_game(random.Random(7), max_plies=60)
+        again, _ = fuzz.play_random_game(random.Random(7), max_plies=60)
+        self.assertEqual(list(moves), list(again))  # games are reproducible from the seed
+        self.assertIn(result, fuzz.RESULT_CODES)
+        self.assertIsNone(Board().apply_moves(moves))  # every move is legal
+
+    def test_binary(self):
+        """ Unit test for fuzz.write_binary() and fuzz.read_binary() functions """
+        games = list(fuzz.generate(3, seed=1, max_plies=40))
+        f = io.BytesIO()
+        self.assertEqual(fuzz.write_binary(games, f), 3)
+        self.assertEqual(len(f.getvalue()), 4 + sum(3 + 2 * len(moves) for moves, _ in games))
+        f.seek(0)
+        self.assertEqual([(list(moves), result) for moves, result in fuzz.read_binary(f)],
+                         [(list(moves), result) for moves, result in games])
+        self.assertRaises(ValueError, list, fuzz.read_binary(io.BytesIO(b'PGN?')))
+
+    def test_checks(self):
+        """ Unit test for the cross-checks on positions with en passant and promotion """
+        for fen in ['rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w - f6 0 3', '3r1k2/1P6/8/8/8/8/8/R5K1 w - - 0 1',
+                    '4k3/8/8/8/8/8/4r3/4K3 w - - 0 1']:
+            for name, check in fuzz.CHECKS.items():
+                self.assertEqual(check(Board.from_fen(fen)), [], name)
+
+    def test_fuzz(self):
+        """ Unit test for fuzz.fuzz() and fuzz.shrink() functions """
+        report = fuzz.fuzz(2, seed=3, checks=['move_cache', 'hash', 'staged'], max_plies=40)
+        self.assertEqual((report['games'], report['failures']), (2, []))
+        self.assertGreater(report['positions'], 2)
+
+        # test a failing check is shrunk to the pieces it depends on
+        def rook_check(board):
+            return ['rook'] if any(piece.name == 'rook' for piece in board.active_pieces['white']) else []
+
+        minimal = fuzz.shrink(Board().fen(), rook_check)
+        self.assertEqual(sorted(piece.name for row in Board.from_fen(minimal).board for piece in row if piece != 0),
+                         ['king', 'king', 'rook'])
+
+        fuzz.CHECKS['rook'] = rook_check
+        try:
+            report = fuzz.fuzz(1, checks=['rook'], max_failures=1)
+        finally:
+            del fuzz.CHECKS['rook']
+        self.assertEqual(len(report['failures']), 1)
+        self.assertEqual(report['failures'][0]['fen'], Board().fen())
+
+        # test a check that raises is reported as a failure instead of ending the run
+        def crash_check(board):
+            if any(piece.name == 'rook' for piece in board.active_pieces['white']):
+                raise KeyError('rook')
+            return []
+
+        fuzz.CHECKS['crash'] = crash_check
+        try:
+            report = fuzz.fuzz(1, checks=['crash'], max_failures=1)
+        finally:
+            del fuzz.CHECKS['crash']
+        failure = report['failures'][0]
+        self.assertEqual(failure['details'][0], "raised KeyError: 'rook'")
+        self.assertTrue(failure['details'][1].endswith('in crash_check()'))
+        self.assertEqual(sorted(piece.name for row in Board.from_fen(failure['minimal']).board for piece in row
+                                if piece != 0), ['king', 'king', 'rook'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ Unit tests for match.py
 """
 import unittest
 from match import Match
+import packedmoves
 from pieces import Pawn
 from test_board import generate_scenario
 
@@ -66,6 +67,73 @@ class TestMatch(unittest.TestCase):
         test_match.select_piece('d4')  # select white pawn
         self.assertFalse(test_match.move('d5'))
 
+    def test_play(self):
+        """ Unit test for Match.play() method """
+        test_match = Match()
+        board = test_match.chessboard
+        self.assertTrue(test_match.play(board.parse_move('g1f3')))
+        self.assertEqual(board.get_piece('f3').name, 'knight')
+        self.assertEqual(board.turn, 2)
+
+        # test rejection of a move from an empty square
+        self.assertFalse(test_match.play(packedmoves.encode((5, 4), (4, 4))))
+
+    def test_play_san(self):
+        """ Unit test for Match.is_san() and Match.play_san() methods """
+        test_match = Match()
+        self.assertFalse(test_match.is_san('e2'))  # square of own piece is a selection
+        self.assertFalse(test_match.is_san('e22'))
+        self.assertTrue(test_match.is_san('e4'))
+        self.assertTrue(test_match.is_san('e7'))  # square of opponent piece can only be a move
+        self.assertTrue(test_match.is_san('Nf3+'))
+
+        self.assertTrue(test_match.play_san('e4'))
+        test_match.switch_turns()
+        self.assertFalse(test_match.play_san('e4'))
+        self.assertFalse(test_match.play_san('Nd7'))
+        self.assertTrue(test_match.play_san('Nf6'))
+        self.assertEqual(test_match.chessboard.get_piece('f6').name, 'knight')
+
+    def test_apply_batch(self):
+        """ Unit test for Match.apply_batch() method """
+        test_match = Match()
+        self.assertIsNone(test_match.apply_batch(['e2e4', 'e5', 'Bc4', 'Nc6']))
+        self.assertEqual((test_match.turn, test_match.not_turn), ('white', 'black'))
+        self.assertIsNone(test_match.apply_batch(['d1h5', 'Nf6', 'Qxf7#']))
+        self.assertEqual(test_match.turn, 'black')
+        self.assertTrue(test_match.checkmate)
+
+        # test batch stops at the first illegal move
+        test_match = Match()
+        self.assertEqual(test_match.apply_batch(['e2e4', 'e7e5', 'f1f3', 'Nf3']), 2)
+        self.assertEqual(test_match.turn, 'white')
+        self.assertFalse(test_match.incheck)
+
+    def test_apply_batches(self):
+        """ Unit test for Match.apply_batches() method """
+        matches = {}
+        results = Match.apply_batches(matches, [('a', ['e2e4', 'e7e5']), ('b', ['d4', 'd5', 'Qd3']),
+                                                ('a', ['Qh5', 'Ke7', 'Qxe5#']), ('c', ['e2e5'])])
+        self.assertEqual(results, {'a': None, 'b': None, 'c': 0})
+        self.assertEqual(sorted(matches), ['a', 'b', 'c'])
+        self.assertTrue(matches['a'].checkmate)
+        self.assertEqual(matches['b'].turn, 'black')
+        self.assertEqual(matches['c'].chessboard.turn, 1)
+
+    def test_highlights(self):
+        """ Unit test for Match.highlights() method """
+        test_match = Match()
+        self.assertEqual(test_match.highlights(), [])  # nothing selected yet
+        test_match.select_piece('g1')  # select white knight
+        self.assertEqual(test_match.highlights(), ['f3', 'h3'])
+
+        # test destinations that leave the king in check are not highlighted
+        pcs = {'black': {'initial': [(0, 0)], 'final': [(4, 0)]},
+               'white': {'initial': [(7, 4), (6, 3)], 'final': [(4, 4), (4, 3)]}}
+        test_match.chessboard = generate_scenario(pcs)
+        test_match.select_piece('d4')  # select pinned white pawn
+        self.assertEqual(test_match.highlights(), [])
+
     def test_check(self):
         """ Unit test for Match.check() method """
         test_match = Match()
@@ -0,0 +1,36 @@
+"""
+Unit tests for mate.py
+"""
+import unittest
+import mate
+import packedmoves
+
+
+class TestMate(unittest.TestCase):
+    """ Unit tests for mate module """
+
+    def test_solve(self):
+        """ Unit test for mate.solve() function """
+        result = mate.solve(mate.PUZZLES['back_rank'][0], 2)
+        self.assertEqual((result['result'], result['mate_in']), ('mate', 1))
+        self.assertEqual([packedmoves.to_coordinate(move) for move in result['line']], ['a1a8'])
+
+        # test shortest mate is found and the line ends in checkmate
+        fen = mate.PUZZLES['king_and_rook'][0]
+        result = mate.solve(fen, 3)
+        self.assertEqual((result['result'], result['mate_in'], len(result['line'])), ('mate', 3, 5))
+        self.assertTrue(mate.line_to_san(fen, result['line'])[-1].endswith('#'))
+
+        # test disproof and budget exhaustion
+        self.assertEqual(mate.solve('4k3/8/8/4K3/8/8/8/R7 w - - 0 1', 2)['result'], 'no mate')
+        self.assertEqual(mate.solve('4k3/8/4K3/8/8/8/8/8 w - - 0 1', 2)['result'], 'no mate')
+        self.assertEqual(mate.solve(fen, 3, max_nodes=20)['result'], 'unknown')
+
+    def test_solve_puzzles(self):
+        """ Unit test for mate.solve_puzzles() function """
+        for name, result in mate.solve_puzzles().items():
+            self.assertEqual(result['mate_in'], mate.PUZZLES[name][1], name)
+
+
+if __name__ == '__main__':
+    unittest.main()
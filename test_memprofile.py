@@ -0,0 +1,49 @@
+"""
+Unit tests for memprofile.py
+"""
+import sys
+import unittest
+from board import Board
+import memprofile
+
+
+class TestMemprofile(unittest.TestCase):
+    """ Unit tests for memprofile module """
+
+    def test_deep_size(self):
+        """ Unit test for memprofile.deep_size() function """
+        # test a shared object is counted once
+        item = [0] * 100
+        self.assertEqual(memprofile.deep_size([item, item]),
+                         sys.getsizeof([item, item]) + sys.getsizeof(item) + sys.getsizeof(0))
+
+        # test objects already seen are not counted again
+        seen = set()
+        memprofile.deep_size(item, seen)
+        self.assertEqual(memprofile.deep_size([item], seen), sys.getsizeof([item]))
+
+        # test a board is larger than its rows
+        board = Board()
+        self.assertGreater(memprofile.deep_size(board), memprofile.deep_size(board.board))
+
+    def test_profile(self):
+        """ Unit test for memprofile.profile() function """
+        report = memprofile.profile(seed=1, plies=40)
+        self.assertTrue(all(report[name] > 0 for name in memprofile.BUDGETS))
+        # test a snapshot child shares most of its state with its parent
+        self.assertLess(report['snapshot_child'], report['snapshot'])
+        # test the default budgets hold
+        self.assertEqual(memprofile.check_budget(report), [])
+
+    def test_check_budget(self):
+        """ Unit test for memprofile.check_budget() and memprofile.parse_budgets() functions """
+        budgets = memprofile.parse_budgets(['board=100', 'game_peak=5000'])
+        self.assertEqual(budgets['board'], 100)
+        self.assertEqual(budgets['match'], memprofile.BUDGETS['match'])
+        report = {'board': 200, 'game_peak': 5000}
+        # test only items over budget are reported, missing items are ignored
+        self.assertEqual(memprofile.check_budget(report, budgets), [('board', 200, 100)])
+
+
+if __name__ == '__main__':
+    unittest.main()
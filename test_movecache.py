@@ -0,0 +1,78 @@
+"""
+Unit tests for movecache.py
+"""
+import unittest
+from board import Board
+from test_board import generate_scenario
+
+
+class TestMoveCache(unittest.TestCase):
+    """ Unit tests for MoveCache class """
+
+    def test_moves(self):
+        """ Unit test for MoveCache.moves() method """
+        test_board = Board()
+        cache = test_board.move_cache
+        knight = test_board.get_piece('g1')
+        self.assertEqual(sorted(cache.moves(knight)), [(5, 5), (5, 7)])
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        # test second lookup is served from the cache
+        self.assertEqual(sorted(cache.moves(knight)), [(5, 5), (5, 7)])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_invalidate(self):
+        """ Unit test for MoveCache.invalidate() method via Board.execute_move() """
+        test_board = Board()
+        test_board.move_cache.debug = True  # every cache hit is checked against fresh move generation
+        cache = test_board.move_cache
+        rook = test_board.get_piece('a1')
+        bishop = test_board.get_piece('f1')
+        knight = test_board.get_piece('b8')
+        for piece in [rook, bishop, knight]:
+            cache.moves(piece)
+
+        # test only pieces whose moves depend on the changed squares are dropped
+        test_board.select('e2')
+        test_board.execute_move('e4')
+        self.assertNotIn(bishop, cache.entries)  # e2 blocked the bishop's diagonal
+        self.assertIn(rook, cache.entries)
+        self.assertIn(knight, cache.entries)
+        self.assertEqual(len(cache.moves(bishop)), 5)
+
+        # test pieces depending on a destination square are dropped
+        test_board.select('b7')
+        test_board.execute_move('b5')
+        test_board.select('f1')
+        test_board.execute_move('b5')  # bishop captures pawn
+        self.assertIn((1, 3), cache.moves(bishop))  # bishop attacks pawn on d7
+        self.assertIn(knight, cache.entries)
+        self.assertEqual(sorted(cache.moves(knight)), [(2, 0), (2, 2)])
+
+    def test_en_passant(self):
+        """ Unit test for MoveCache turn sensitivity of en passant moves """
+        pcs = {'white': {'initial': [(6, 1)], 'final': [(3, 1)]}}
+        test_board = generate_scenario(pcs)
+        test_board.move_cache.debug = True
+        pawn = test_board.get_piece('b5')
+        test_board.select('c7')
+        test_board.execute_move('c5')  # black pawn moves two steps next to the white pawn
+        self.assertIn((2, 2), test_board.move_cache.moves(pawn))  # en passant move is available
+
+        # test en passant move expires on the next turn
+        test_board.turn += 2
+        self.assertNotIn((2, 2), test_board.move_cache.moves(pawn))
+
+    def test_verify(self):
+        """ Unit test for MoveCache.verify() method in debug mode """
+        test_board = Board()
+        test_board.move_cache.debug = True
+        rook = test_board.get_piece('a1')
+        test_board.move_cache.moves(rook)
+        # editing the board directly bypasses invalidation, debug mode detects the stale entry
+        test_board.board[6][0] = 0
+        self.assertRaises(RuntimeError, test_board.move_cache.moves, rook)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for notation.py
+"""
+import unittest
+import notation
+from board import Board
+from test_board import generate_scenario
+
+
+class TestNotation(unittest.TestCase):
+    """ Unit tests for notation module """
+
+    def test_play_move(self):
+        """ Unit test for notation.play_move() function """
+        # test promotion to the flagged piece
+        pcs = {'white': {'initial': [(6, 0)], 'final': [(1, 0)]}, 'black': {'initial': [(0, 0)], 'final': [(3, 3)]}}
+        test_board = generate_scenario(pcs)
+        self.assertTrue(notation.play_move(test_board, test_board.parse_move('a7a8n')))
+        self.assertEqual(test_board.get_piece('a8').name, 'knight')
+
+        # test rejection of illegal move
+        test_board = Board()
+        self.assertFalse(notation.play_move(test_board, test_board.parse_move('e2e5')))
+
+    def test_move_to_san(self):
+        """ Unit test for notation.move_to_san() function """
+        test_board = Board()
+        self.assertEqual(notation.move_to_san(test_board, test_board.parse_move('g1f3')), 'Nf3')
+        self.assertEqual(notation.move_to_san(test_board, test_board.parse_move('e2e4')), 'e4')
+
+        # test disambiguation by file when two knights can reach the same square
+        pcs = {'white': {'initial': [(7, 1), (7, 6)], 'final': [(5, 2), (5, 6)]}}
+        test_board = generate_scenario(pcs)
+        self.assertEqual(notation.move_to_san(test_board, test_board.parse_move('c3e4')), 'Nce4')
+
+        # test pawn capture and promotion
+        pcs = {'white': {'initial': [(6, 0)], 'final': [(1, 0)]}}
+        test_board = generate_scenario(pcs)
+        self.assertEqual(notation.move_to_san(test_board, test_board.parse_move('a7b8q')), 'axb8=Q')
+
+    def test_game_to_pgn(self):
+        """ Unit test for notation.game_to_san() and notation.game_to_pgn() functions """
+        test_board = Board()
+        moves = []
+        for move in 'e2e4 e7e5 f1c4 b8c6 d1h5 g8f6 h5f7'.split():
+            moves.append(test_board.parse_move(move))
+            test_board.play(moves[-1])
+        self.assertEqual(notation.game_to_san(moves), ['e4', 'e5', 'Bc4', 'Nc6', 'Qh5', 'Nf6', 'Qxf7#'])
+        pgn = notation.game_to_pgn(moves, {'White': 'a', 'Black': 'b'}, '1-0')
+        self.assertIn('[Result "1-0"]', pgn)
+        self.assertTrue(pgn.endswith('1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6 4. Qxf7# 1-0\n'))
+
+    def test_san_to_move(self):
+        """ Unit test for notation.san_to_move() function """
+        test_board = Board()
+        self.assertEqual(notation.san_to_move(test_board, 'Nf3'), test_board.parse_move('g1f3'))
+        self.assertEqual(notation.san_to_move(test_board, 'e4+'), test_board.parse_move('e2e4'))
+        self.assertRaises(ValueError, notation.san_to_move, test_board, 'Ke2')
+
+        # test disambiguation and promotion
+        pcs = {'white': {'initial': [(7, 1), (7, 6)], 'final': [(5, 2), (5, 6)]}}
+        test_board = generate_scenario(pcs)
+        self.assertRaises(ValueError, notation.san_to_move, test_board, 'Ne4')
+        self.assertEqual(notation.san_to_move(test_board, 'Nce4'), test_board.parse_move('c3e4'))
+        pcs = {'white': {'initial': [(6, 0)], 'final': [(1, 0)]}}
+        test_board = generate_scenario(pcs)
+        self.assertEqual(notation.san_to_move(test_board, 'axb8=N'), test_board.parse_move('a7b8n'))
+
+    def test_read_pgn(self):
+        """ Unit test for notation.read_pgn() function """
+        pgn = [
+            '[White "a"]', '[Result "1-0"]', '',
+            '1. e4 e5 2. Bc4 {multi line', 'comment (not a variation} Nc6 3. Qh5 (3. Nf3 Nf6) Nf6?? $4',
+            '4. Qxf7# 1-0', '', '1.d4 d5 ; line comment {', '2.c4 *',
+        ]
+        games = list(notation.read_pgn(pgn))
+        self.assertEqual(games[0][0], {'White': 'a', 'Result': '1-0'})
+        self.assertEqual(games[0][1:], (['e4', 'e5', 'Bc4', 'Nc6', 'Qh5', 'Nf6??', 'Qxf7#'], '1-0'))
+        self.assertEqual(games[1], ({}, ['d4', 'd5', 'c4'], '*'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Unit tests for packedmoves.py
+"""
+import unittest
+import packedmoves
+
+
+class TestPackedMoves(unittest.TestCase):
+    """ Unit tests for packedmoves module """
+
+    def test_encode(self):
+        """ Unit test for packedmoves.encode() and the field accessors """
+        move = packedmoves.encode((6, 4), (4, 4), packedmoves.DOUBLE_PUSH)
+        self.assertLess(move, 1 << 16)
+        self.assertEqual(packedmoves.start(move), (6, 4))
+        self.assertEqual(packedmoves.end(move), (4, 4))
+        self.assertEqual(packedmoves.flags(move), packedmoves.DOUBLE_PUSH)
+        self.assertFalse(packedmoves.is_capture(move))
+
+        # test corner squares and largest flags fit in 16 bits
+        move = packedmoves.encode((7, 7), (0, 0), packedmoves.CAPTURE | packedmoves.promotion_flags('queen'))
+        self.assertEqual(move, 0xf000 | 63)
+        self.assertEqual((packedmoves.start(move), packedmoves.end(move)), ((7, 7), (0, 0)))
+
+    def test_flags(self):
+        """ Unit test for packedmoves flag helpers """
+        move = packedmoves.encode((3, 1), (2, 2), packedmoves.EN_PASSANT)
+        self.assertTrue(packedmoves.is_en_passant(move))
+        self.assertTrue(packedmoves.is_capture(move))
+        self.assertIsNone(packedmoves.promotion(move))
+
+        move = packedmoves.encode((1, 0), (0, 1), packedmoves.CAPTURE | packedmoves.promotion_flags('knight'))
+        self.assertTrue(packedmoves.is_capture(move))
+        self.assertFalse(packedmoves.is_en_passant(move))
+        self.assertEqual(packedmoves.promotion(move), 'knight')
+
+    def test_to_coordinate(self):
+        """ Unit test for packedmoves.to_coordinate() function """
+        self.assertEqual(packedmoves.to_coordinate(packedmoves.encode((6, 4), (4, 4))), 'e2e4')
+        move = packedmoves.encode((1, 0), (0, 0), packedmoves.promotion_flags('knight'))
+        self.assertEqual(packedmoves.to_coordinate(move), 'a7a8n')
+        move = packedmoves.encode((6, 7), (7, 7), packedmoves.promotion_flags('queen'))
+        self.assertEqual(packedmoves.to_coordinate(move), 'h2h1q')
+
+
+if __name__ == '__main__':
+    unittest.main()
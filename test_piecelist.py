@@ -0,0 +1,78 @@
+"""
+Unit tests for piecelist.py
+"""
+import unittest
+from piecelist import PieceList
+from pieces import Pawn, Knight, Rook, Queen, King
+
+
+class TestPieceList(unittest.TestCase):
+    """ Unit tests for PieceList class """
+
+    def setUp(self):
+        self.pawn = Pawn((6, 0), 'white')
+        self.knight = Knight((7, 1), 'white')
+        self.rook = Rook((7, 0), 'white')
+        self.queen = Queen((7, 3), 'white')
+        self.king = King((7, 4), 'white')
+        self.pieces = PieceList([self.pawn, self.knight, self.rook, self.queen, self.king])
+
+    def test_append_remove(self):
+        """ Unit test for PieceList.append() and PieceList.remove() methods """
+        self.assertEqual(len(self.pieces), 5)
+        self.assertIn(self.knight, self.pieces)
+
+        # test removal keeps slot indices consistent
+        self.pieces.remove(self.pawn)
+        self.assertNotIn(self.pawn, self.pieces)
+        self.assertEqual(len(self.pieces), 4)
+        for piece in self.pieces:
+            self.assertIs(self.pieces[self.pieces.slots[piece]], piece)
+        self.assertRaises(ValueError, self.pieces.remove, self.pawn)
+
+        # test re-added piece is in play again
+        self.pieces.append(self.pawn)
+        self.assertIn(self.pawn, self.pieces)
+        self.assertEqual(list(self.pieces.of_type('pawn')), [self.pawn])
+
+    def test_reinsert(self):
+        """ Unit test for PieceList.reinsert() method """
+        second = Knight((7, 6), 'white')
+        self.pieces.append(second)
+        for piece in [self.pawn, self.knight, second]:
+            order, knights = list(self.pieces), list(self.pieces.of_type('knight'))
+            self.pieces.reinsert(piece, self.pieces.remove(piece))
+            # test the order of pieces and slot indices are restored
+            self.assertEqual(list(self.pieces), order)
+            self.assertEqual(list(self.pieces.of_type('knight')), knights)
+            for other in self.pieces:
+                self.assertIs(self.pieces[self.pieces.slots[other]], other)
+                self.assertIs(self.pieces.types[other.name][self.pieces.type_slots[other]], other)
+
+    def test_of_type(self):
+        """ Unit test for PieceList.of_type() and PieceList.sliders() methods """
+        self.assertEqual(list(self.pieces.of_type('knight')), [self.knight])
+        self.assertEqual(set(self.pieces.sliders()), {self.rook, self.queen})
+        self.pieces.remove(self.rook)
+        self.assertEqual(list(self.pieces.sliders()), [self.queen])
+        self.assertEqual(list(self.pieces.of_type('bishop')), [])
+
+    def test_snapshot_restore(self):
+        """ Unit test for PieceList.snapshot() and PieceList.restore() methods """
+        snapshot = self.pieces.snapshot()
+        self.pieces.remove(self.queen)
+        self.pieces.remove(self.pawn)
+        self.pieces.restore(snapshot)
+        self.assertEqual(set(self.pieces), {self.pawn, self.knight, self.rook, self.queen, self.king})
+        self.assertEqual(list(self.pieces.of_type('queen')), [self.queen])
+
+    def test_without(self):
+        """ Unit test for PieceList.without() method """
+        copy = self.pieces.without(self.knight)
+        self.assertNotIn(self.knight, copy)
+        self.assertIn(self.knight, self.pieces)
+        self.assertEqual(len(copy), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -264,6 +264,39 @@ class TestKing(unittest.TestCase):
         king = test_board.get_piece('a4')
         self.assertTrue(king.is_checked(king.position, test_board.board, test_board.active_pieces))
 
+    def test_threats(self):
+        """ Unit test for King.threats() method """
+        # test only pieces with a clear line are threats
+        test_board = Board()
+        king = test_board.get_piece('e1')
+        pcs = {'black': {'initial': [(0, 0), (0, 2), (0, 1)], 'final': [(3, 4), (4, 1), (5, 5)]}}
+        test_board = generate_scenario(pcs)
+        threats = list(king.threats(king.position, test_board.board, test_board.active_pieces['black']))
+        self.assertEqual(threats, [test_board.get_piece('f3')])  # knight, rook and bishop are blocked by pawns
+        test_board.board[6][3] = 0
+        threats = set(king.threats(king.position, test_board.board, test_board.active_pieces['black']))
+        self.assertEqual(threats, {test_board.get_piece('f3'), test_board.get_piece('b4')})
+
+    def test_attackers(self):
+        """ Unit test for King.attackers() method """
+        # test no black piece is lined up with the white king in the starting position
+        test_board = Board()
+        king = test_board.get_piece('e1')
+        self.assertEqual(list(king.attackers(king.position, test_board.active_pieces['black'])), [])
+
+        # test sliders on the same file or diagonal are considered
+        pcs = {'black': {'initial': [(0, 0), (0, 2)], 'final': [(3, 4), (4, 1)]}}
+        test_board = generate_scenario(pcs)
+        attackers = set(king.attackers(king.position, test_board.active_pieces['black']))
+        self.assertEqual(attackers, {test_board.get_piece('e5'), test_board.get_piece('b4')})
+
+        # test knight and pawn placements that can reach the king
+        pcs = {'black': {'initial': [(0, 1), (1, 3)], 'final': [(5, 5), (6, 5)]}}
+        test_board = generate_scenario(pcs)
+        attackers = set(king.attackers((7, 4), test_board.active_pieces['black']))
+        self.assertIn(test_board.get_piece('f3'), attackers)  # knight
+        self.assertIn(test_board.get_piece('f2'), attackers)  # pawn
+
 
 if __name__ == '__main__':
     unittest.main()
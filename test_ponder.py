@@ -0,0 +1,59 @@
+"""
+Unit tests for ponder.py
+"""
+import time
+import unittest
+from board import Board
+import notation
+import packedmoves
+from ponder import Ponderer
+
+
+def wait_for(ponderer, move, seconds=30):
+    """ Wait until a reply has been pondered """
+    deadline = time.perf_counter() + seconds
+    while packedmoves.to_coordinate(move) not in ponderer.answers and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+
+class TestPonderer(unittest.TestCase):
+    """ Unit tests for Ponderer class """
+
+    def test_reply(self):
+        """ Unit test for Ponderer.reply() method """
+        ponderer = Ponderer(depth=2)
+        board = Board()
+
+        # computer plays white, nothing to ponder before the first move
+        move = ponderer.reply(board)
+        self.assertIn(move, list(board.generate_moves('white')))
+        self.assertEqual(ponderer.stats['misses'], 0)
+        notation.play_move(board, move)
+
+        # human plays the predicted reply
+        predicted = ponderer.predicted
+        self.assertIsNotNone(predicted)
+        ponderer.start(board)
+        wait_for(ponderer, predicted)
+        ponderer.stop()
+        self.assertIsNone(ponderer.thread)
+        notation.play_move(board, predicted)
+        move = ponderer.reply(board)
+        self.assertIn(move, list(board.generate_moves('white')))
+        self.assertEqual((ponderer.stats['hits'], ponderer.stats['misses']), (1, 0))
+        self.assertGreater(ponderer.stats['saved'], 0)
+        notation.play_move(board, move)
+
+        # human plays a reply that was not pondered
+        ponderer.start(board)
+        ponderer.stop()
+        reply = next(reply for reply in board.generate_moves('black')
+                     if packedmoves.to_coordinate(reply) not in ponderer.answers)
+        notation.play_move(board, reply)
+        self.assertIn(ponderer.reply(board), list(board.generate_moves('white')))
+        self.assertEqual((ponderer.stats['hits'], ponderer.stats['misses']), (1, 1))
+        self.assertTrue(ponderer.report().startswith('Ponder hits: 1/2 (50%)'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for positioncache.py
+"""
+import threading
+import unittest
+from board import Board
+from match import Match
+import positioncache
+from positioncache import PositionCache
+
+
+class TestPositionCache(unittest.TestCase):
+    """ Unit tests for PositionCache class """
+
+    def test_lookup(self):
+        """ Unit test for PositionCache.lookup() method """
+        cache = PositionCache()
+        board = Board()
+        verdict, moves = cache.lookup(board)
+        self.assertIsNone(verdict)
+        self.assertEqual(moves, frozenset(board.generate_moves('white')))
+        self.assertIs(cache.lookup(Board())[1], moves)  # equal position is a hit
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # test verdicts of check, checkmate and stalemate
+        self.assertEqual(cache.verdict(Board.from_fen('4k3/8/8/8/8/8/4r3/4K3 w - - 0 1')), 'check')
+        self.assertEqual(cache.verdict(Board.from_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')), None)
+        self.assertEqual(cache.verdict(Board.from_fen('R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1')), 'checkmate')
+        self.assertEqual(cache.verdict(Board.from_fen('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1')), 'stalemate')
+        self.assertEqual(cache.legal_moves(Board.from_fen('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1')), frozenset())
+
+    def test_eviction(self):
+        """ Unit test for least recently used eviction """
+        cache = PositionCache(capacity=2)
+        boards = [Board()]
+        for move in ['e2e4', 'e7e5']:
+            board = Board.from_fen(boards[-1].fen())
+            board.apply_moves([move])
+            boards.append(board)
+        cache.verdict(boards[0])
+        cache.verdict(boards[1])
+        cache.verdict(boards[0])  # boards[1] is now the least recently used
+        cache.verdict(boards[2])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        cache.verdict(boards[0])
+        self.assertEqual(cache.stats(), {'size': 2, 'capacity': 2, 'hits': 2, 'misses': 3, 'evictions': 1,
+                                         'hit_rate': 0.4})
+        cache.verdict(boards[1])
+        self.assertEqual(cache.misses, 4)
+
+        cache.clear()
+        self.assertEqual(cache.stats()['size'], 0)
+        self.assertRaises(ValueError, PositionCache, 0)
+
+    def test_threads(self):
+        """ Unit test for looking up positions from several threads """
+        cache = PositionCache(capacity=3)
+        lines = ['e2e4 e7e5 g1f3', 'd2d4 d7d5 c2c4', 'g1f3 g8f6 g2g3', 'c2c4 e7e5 b1c3']
+
+        def replay(moves):
+            for _ in range(20):
+                board = Board()
+                for move in moves.split():
+                    board.apply_move(board.resolve_move(move))
+                    cache.legal_moves(board)
+
+        threads = [threading.Thread(target=replay, args=(moves,)) for moves in lines]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual(stats['hits'] + stats['misses'], 240)
+        self.assertLessEqual(len(cache), 3)
+        self.assertEqual(stats['misses'] - stats['evictions'], len(cache))
+
+    def test_shared_cache(self):
+        """ Unit test for positioncache.shared_cache() function and matches sharing a cache """
+        cache = positioncache.shared_cache()
+        self.assertIs(positioncache.shared_cache(), cache)
+        cache.clear()
+        for _ in range(2):
+            match = Match(cache=cache)
+            self.assertIsNone(match.apply_batch(['e2e4', 'e7e5', 'f1c4', 'b8c6', 'd1h5', 'g8f6', 'h5f7']))
+            self.assertTrue(match.checkmate)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Unit tests for positionindex.py
+"""
+import os
+import tempfile
+import unittest
+from board import Board
+from positionindex import PositionIndex
+
+GAMES = [
+    'e4 e5 Bc4 Nc6 Qh5 Nf6 Qxf7#'.split(),
+    'e4 e5 Nf3 Nc6 Bc4 Nf6'.split(),
+    'd4 d5 c4 e6 Nc3 Nf6'.split(),
+    'c4 e6 Nc3 Nf6 d4 d5'.split(),
+]
+
+
+class TestPositionIndex(unittest.TestCase):
+    """ Unit tests for PositionIndex class """
+
+    def test_lookup(self):
+        """ Unit test for PositionIndex.lookup() and PositionIndex.games_with() methods """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.idx')
+            with PositionIndex(path, run_size=10) as index:
+                self.assertEqual(index.add_games(GAMES[:2]), range(0, 2))
+                self.assertEqual(len(index), 15)
+                self.assertEqual(index.lookup(Board())[:2], [(0, 0), (1, 0)])
+                self.assertEqual(index.games_with('r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/8/PPPP1PPP/RNBQK1NR w - - 0 3'), [0])
+
+            # test appended games are found in a reopened index, before and after compacting
+            queen_gambit = 'rnbqkb1r/ppp2ppp/4pn2/3p4/2PP4/2N5/PP2PPPP/R1BQKBNR w - - 0 4'
+            with PositionIndex(path, run_size=10) as index:
+                self.assertEqual(index.add_games(GAMES[2:]), range(2, 4))
+                self.assertGreater(len(index.meta['runs']), 1)
+                self.assertEqual(index.lookup(queen_gambit), [(2, 6), (3, 6)])
+                index.compact()
+                self.assertEqual(index.meta['runs'], [])
+                self.assertEqual(index.lookup(queen_gambit), [(2, 6), (3, 6)])
+                self.assertEqual(index.games_with(Board()), [0, 1, 2, 3])
+                self.assertEqual(len(index), 29)
+            self.assertEqual(sorted(os.listdir(directory)), ['games.idx', 'games.idx.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Unit tests for render.py
+"""
+import contextlib
+import io
+import re
+import unittest
+from board import Board
+import render
+
+ESCAPE = re.compile(r'\x1b\[(?:(\d+);(\d+)H|H\x1b\[2J)')
+
+
+def terminal(text, screen=None):
+    """ Apply written text to a screen of characters, interpreting the escape codes used by Renderer """
+    screen = screen if screen is not None else {}
+    line = column = 0
+    position = 0
+    for match in list(ESCAPE.finditer(text)) + [None]:
+        end = match.start() if match else len(text)
+        for char in text[position:end]:
+            if char == '\n':
+                line, column = line + 1, 0
+            else:
+                if char == ' ':
+                    screen.pop((line, column), None)  # blank cells are not kept
+                else:
+                    screen[line, column] = char
+                column += 1
+        if match is None:
+            break
+        if match.group(1) is None:
+            screen.clear()
+            line = column = 0
+        else:
+            line, column = int(match.group(1)) - 1, int(match.group(2)) - 1
+        position = match.end()
+    return screen
+
+
+class TestRender(unittest.TestCase):
+    """ Unit tests for render module """
+
+    def test_frame(self):
+        """ Unit test for Renderer.frame() and Board.print() """
+        board = Board()
+        board.apply_moves(['e4', 'd5', 'exd5'])
+        renderer = render.Renderer(io.StringIO())
+        self.assertEqual(renderer.frame([board]), board.render())
+        lines = board.render().splitlines()
+        self.assertEqual(lines[2], '8 | r n b q k b n r | 8')
+        self.assertEqual(lines[5], '5 | * * * P * * * * | 5')
+
+        # test Board.print() writes the frame at once
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            board.print()
+        self.assertEqual(output.getvalue(), board.render())
+
+        # test tiled boards are laid out side by side with titles
+        lines = render.Renderer(columns=2).frame([board, Board(), Board()], ['one', 'two', 'three']).splitlines()
+        self.assertEqual(len(lines), 2 * 13 + 1)
+        self.assertEqual(lines[0], 'one'.ljust(render.TILE_WIDTH) + render.GAP + 'two')
+        self.assertEqual(lines[3], '8 | r n b q k b n r | 8' + render.GAP + '8 | r n b q k b n r | 8')
+        self.assertEqual(lines[14], 'three')
+
+    def test_ansi(self):
+        """ Unit test for repainting only the changed squares in ANSI mode """
+        boards = [Board(), Board(), Board()]
+        output = io.StringIO()
+        renderer = render.Renderer(output, ansi=True, columns=2)
+        full = renderer.draw(boards, ['a', 'b', 'c'])
+        screen = terminal(output.getvalue())
+
+        boards[2].apply_moves(['e4'])
+        boards[0].apply_moves(['Nf3'])
+        output.seek(0)
+        output.truncate()
+        changed = renderer.draw(boards, ['a', 'b', 'c2'])
+        self.assertLess(changed, full / 10)
+        # test the repainted screen matches a complete frame
+        self.assertEqual(terminal(output.getvalue(), screen), terminal(renderer.frame(boards, ['a', 'b', 'c2'])))
+
+        # test nothing is written when nothing changed and a new layout is drawn completely
+        self.assertEqual(renderer.draw(boards, ['a', 'b', 'c2']), 0)
+        self.assertEqual(renderer.draw(boards[:2]), len(render.CLEAR + renderer.frame(boards[:2])))
+
+    def test_measure(self):
+        """ Unit test for render.measure() function """
+        full = render.measure(boards=3, frames=20)
+        ansi = render.measure(boards=3, frames=20, ansi=True)
+        self.assertEqual(full['frames'], 20)
+        self.assertGreater(full['fps'], 0)
+        self.assertLess(ansi['bytes'], full['bytes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
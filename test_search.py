@@ -0,0 +1,49 @@
+"""
+Unit tests for search.py
+"""
+import threading
+import unittest
+from board import Board
+from snapshot import BoardSnapshot
+import packedmoves
+import search
+
+
+class TestSearch(unittest.TestCase):
+    """ Unit tests for search module """
+
+    def test_evaluate(self):
+        """ Unit test for search.evaluate() function """
+        self.assertEqual(search.evaluate(BoardSnapshot.from_board(Board())), 0)
+        position = BoardSnapshot.from_board(Board.from_fen('6k1/5ppp/8/8/8/8/8/R5K1 b - - 0 1'))
+        self.assertEqual(search.evaluate(position), -200)
+
+    def test_best_move(self):
+        """ Unit test for search.best_move() function """
+        # mate in one
+        result = search.best_move(Board.from_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1'), depth=3)
+        self.assertEqual(packedmoves.to_coordinate(result['pv'][0]), 'a1a8')
+        self.assertEqual(result['score'], search.MATE - 1)
+
+        # hanging queen is captured
+        result = search.best_move(Board.from_fen('4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1'), depth=2)
+        self.assertEqual(packedmoves.to_coordinate(result['pv'][0]), 'd2d5')
+
+        # no legal move
+        self.assertIsNone(search.best_move(Board.from_fen('7k/5Q2/6K1/8/8/8/8/8 b - - 0 1')))
+
+    def test_stop(self):
+        """ Unit test for stopping a search """
+        stop = threading.Event()
+        stop.set()
+        result = search.best_move(Board(), depth=search.MAX_DEPTH, stop=stop)
+        self.assertEqual(result['depth'], 0)
+        self.assertEqual(len(result['pv']), 1)
+
+        # node budget ends the search
+        iterations = list(search.Search(Board(), max_nodes=500).iterate())
+        self.assertLess(len(iterations), search.MAX_DEPTH)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Unit tests for sharedboard.py
+"""
+import unittest
+import sharedboard
+from board import Board
+from sharedboard import SharedBoard, PositionBatch
+from test_board import generate_scenario
+
+
+def squares(board):
+    """ Get the symbols of the pieces on every square of a board """
+    return [[str(piece) for piece in row] for row in board.board]
+
+
+class TestSharedBoard(unittest.TestCase):
+    """ Unit tests for SharedBoard class """
+
+    def test_read_write(self):
+        """ Unit test for SharedBoard.read() and SharedBoard.write() methods """
+        test_board = Board()
+        for move in 'e2e4 d7d5 e4d5 c7c5'.split():
+            test_board.play(test_board.parse_move(move))
+        shared = SharedBoard.create(test_board)
+        try:
+            attached = SharedBoard.attach(shared.name)
+            self.assertEqual(attached.turn, 5)
+            self.assertEqual(attached.piece_at((3, 3)), ('white', 'pawn'))
+            self.assertIsNone(attached.piece_at((6, 4)))
+
+            # test the view reads the en passant square and every piece without decoding a board
+            view = attached.view()
+            self.assertEqual(view.en_passant, (3, 2))
+            pieces = list(view.pieces())
+            self.assertEqual(len(pieces), 31)
+            self.assertIn(('black', 'pawn', (3, 2)), pieces)
+
+            # test decoded board keeps the en passant capture available
+            board = attached.read()
+            self.assertEqual(squares(board), squares(test_board))
+            self.assertEqual(sorted(board.generate_moves('white')), sorted(test_board.generate_moves('white')))
+            self.assertIn(board.parse_move('d5c6'), board.generate_moves('white'))
+
+            # test writes are visible through every attachment
+            shared.write(Board())
+            self.assertEqual(attached.turn, 1)
+            self.assertEqual(attached.piece_at((6, 4)), ('white', 'pawn'))
+            attached.close()
+        finally:
+            shared.close()
+
+
+class TestPositionBatch(unittest.TestCase):
+    """ Unit tests for PositionBatch class """
+
+    def test_evaluate_batch(self):
+        """ Unit test for sharedboard.evaluate_batch() function """
+        boards = [Board(), generate_scenario({'black': {'initial': [(1, 3)], 'final': [(6, 3)]}})]
+        batch = PositionBatch.create(boards * 3)
+        try:
+            self.assertEqual(len(batch), 6)
+            self.assertEqual(squares(batch.read(5)), squares(boards[1]))
+            self.assertRaises(IndexError, batch.read, 6)
+            self.assertEqual(sharedboard.evaluate_batch(batch, sharedboard.material, workers=2, chunk_size=4),
+                             [0, -1] * 3)
+            self.assertEqual(sharedboard.evaluate_batch(batch, sharedboard.view_material, workers=2, chunk_size=4,
+                                                        view=True), [0, -1] * 3)
+            self.assertEqual(sharedboard.evaluate_batch(batch, sharedboard.mobility, workers=1)[0], 20)
+            self.assertIsNone(batch.view(0).en_passant)
+        finally:
+            batch.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
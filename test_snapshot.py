@@ -0,0 +1,72 @@
+"""
+Unit tests for snapshot.py
+"""
+import unittest
+import packedmoves
+import snapshot
+from board import Board
+from snapshot import BoardSnapshot
+from test_board import generate_scenario
+
+
+class TestBoardSnapshot(unittest.TestCase):
+    """ Unit tests for BoardSnapshot class """
+
+    def test_apply(self):
+        """ Unit test for BoardSnapshot.apply() method """
+        test_board = Board()
+        parent = BoardSnapshot.from_board(test_board)
+        child = parent.apply(test_board.parse_move('e2e4'))
+
+        # test parent is unchanged and child shares untouched rows and pieces
+        self.assertEqual(str(parent.rows[6][4]), 'P')
+        self.assertEqual(child.rows[6][4], 0)
+        self.assertEqual(child.rows[4][4].position, (4, 4))
+        self.assertEqual(parent.rows[6][4].position, (6, 4))
+        for i in [0, 1, 2, 3, 5, 7]:
+            self.assertIs(child.rows[i], parent.rows[i])
+        self.assertIs(child.rows[7][4], parent.rows[7][4])
+        self.assertIs(child.pieces['white'].types['knight'], parent.pieces['white'].types['knight'])
+        self.assertEqual((child.turn, child.player), (2, 'black'))
+
+        # test child memory is a fraction of a full snapshot
+        self.assertLess(snapshot.child_bytes(parent, child), snapshot.snapshot_bytes(child) / 4)
+
+    def test_legal_moves(self):
+        """ Unit test for BoardSnapshot.legal_moves() method """
+        test_board = Board()
+        self.assertEqual(sorted(BoardSnapshot.from_board(test_board).legal_moves()),
+                         sorted(test_board.generate_moves('white')))
+
+        # test en passant capture removes the captured pawn
+        pcs = {'black': {'initial': [(1, 2)], 'final': [(4, 2)]}}
+        test_board = generate_scenario(pcs)
+        test_board.play(test_board.parse_move('d2d4'))
+        position = BoardSnapshot.from_board(test_board)
+        move = test_board.parse_move('c4d3')
+        self.assertIn(move, position.legal_moves())
+        self.assertEqual(position.apply(move).rows[4][3], 0)
+
+    def test_is_checkmate(self):
+        """ Unit test for BoardSnapshot.is_checkmate() method """
+        test_board = Board()
+        position = BoardSnapshot.from_board(test_board)
+        for move in 'e2e4 e7e5 f1c4 b8c6 d1h5 g8f6'.split():
+            position = position.apply(test_board.parse_move(move))
+            test_board.play(test_board.parse_move(move))
+        self.assertFalse(position.is_checkmate())
+        position = position.apply(packedmoves.encode((3, 7), (1, 5), packedmoves.CAPTURE))
+        self.assertTrue(position.is_checkmate())
+        self.assertEqual(position.to_board().check('black'), 'checkmate')
+
+    def test_perft(self):
+        """ Unit test for snapshot.perft() and snapshot.explore() functions """
+        position = BoardSnapshot.from_board(Board())
+        self.assertEqual(snapshot.perft(position, 2), 400)
+        counts = snapshot.explore(position, 2, threads=4)
+        self.assertEqual(len(counts), 20)
+        self.assertEqual(sum(counts.values()), 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit tests for spectate.py
+"""
+import asyncio
+import threading
+import unittest
+from match import Match
+import spectate
+
+
+async def drain(subscriber, board=None):
+    """ Apply every queued message to a spectator's board """
+    while not subscriber.queue.empty():
+        board = spectate.apply(board, await subscriber.get())
+    return board
+
+
+class TestSpectate(unittest.TestCase):
+    """ Unit tests for spectate module """
+
+    def test_publish(self):
+        """ Unit test for Broadcaster.publish() through Match """
+        async def run():
+            match = Match()
+            match.spectators = broadcaster = spectate.Broadcaster()
+            early = broadcaster.subscribe()
+            self.assertEqual(early.queue.get_nowait(), ('snapshot', 0, match.chessboard.fen()))
+
+            # test each move is published once as a delta
+            match.apply_batch(['e4', 'e5'])
+            match.apply_batch([])
+            self.assertEqual(early.queue.qsize(), 2)
+            kind, ply, move = early.queue.get_nowait()
+            self.assertEqual((kind, ply, move), ('move', 1, match.chessboard.history[0]))
+
+            # test a late subscriber starts from a snapshot and follows the game
+            late = broadcaster.subscribe()
+            board = await drain(late)
+            match.apply_batch(['Nf3'])
+            board = await drain(late, board)
+            self.assertEqual(board.fen(), match.chessboard.fen())
+
+            # test unsubscribed spectators receive nothing
+            late.close()
+            match.apply_batch(['Nc6'])
+            self.assertTrue(late.queue.empty())
+            self.assertEqual(broadcaster.stats()['published'], 4)
+        asyncio.run(run())
+
+    def test_slow_subscriber(self):
+        """ Unit test for dropping deltas of a subscriber that falls behind """
+        async def run():
+            match = Match()
+            match.spectators = broadcaster = spectate.Broadcaster(queue_size=3)
+            slow = broadcaster.subscribe()
+            fast = broadcaster.subscribe()
+            board = await drain(fast)
+            for move in ['e4', 'e5', 'Nf3', 'Nc6', 'Bb5']:
+                match.apply_batch([move])
+                board = await drain(fast, board)
+            # test the fast subscriber got every delta and the slow one a snapshot of the current position
+            self.assertEqual(fast.dropped, 0)
+            self.assertEqual(fast.snapshots, 0)
+            self.assertGreater(slow.dropped, 0)
+            messages = []
+            while not slow.queue.empty():
+                messages.append(slow.queue.get_nowait())
+            self.assertEqual(messages[0][:2], ('snapshot', 3))
+            slow_board = None
+            for message in messages:
+                slow_board = spectate.apply(slow_board, message)
+            self.assertEqual(slow_board.fen(), board.fen())
+        asyncio.run(run())
+
+    def test_publish_threadsafe(self):
+        """ Unit test for publishing from a thread other than the event loop's """
+        async def run():
+            match = Match()
+            match.spectators = broadcaster = spectate.Broadcaster()
+            subscriber = broadcaster.subscribe()
+            await subscriber.get()
+            thread = threading.Thread(target=match.apply_batch, args=(['d4'],))
+            thread.start()
+            message = await asyncio.wait_for(subscriber.get(), 5)
+            thread.join()
+            self.assertEqual(message[:2], ('move', 1))
+        asyncio.run(run())
+
+    def test_apply(self):
+        """ Unit test for spectate.apply() function """
+        match = Match()
+        match.apply_batch(['e4'])
+        # test a delta that skips a move is rejected
+        self.assertRaises(ValueError, spectate.apply, match.chessboard, ('move', 3, match.chessboard.history[0]))
+        self.assertRaises(ValueError, spectate.apply, None, ('move', 1, match.chessboard.history[0]))
+
+    def test_measure(self):
+        """ Unit test for spectate.measure() function """
+        report = asyncio.run(spectate.measure(subscribers=200, plies=10, slow=5, queue_size=4))
+        self.assertEqual(report['subscribers'], 205)
+        self.assertEqual(report['published'], 10)
+        # test only the subscribers that do not read fall behind
+        self.assertGreaterEqual(report['snapshots'], 5)
+        self.assertGreater(report['dropped'], 0)
+        self.assertGreaterEqual(report['max'], report['p50'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Unit tests for tournament.py
+"""
+import os
+import random
+import tempfile
+import unittest
+import tournament
+from board import Board
+
+
+class TestTournament(unittest.TestCase):
+    """ Unit tests for tournament module """
+
+    def test_greedy_policy(self):
+        """ Unit test for tournament.greedy_policy() function """
+        # test greedy policy prefers capturing the queen over the pawn
+        test_board = Board()
+        moves = [test_board.parse_move(move) for move in ['e2e4', 'd1d7', 'd1d8']]
+        self.assertEqual(tournament.greedy_policy(test_board, 'white', moves, random.Random(0)), moves[2])
+
+    def test_exchange_policy(self):
+        """ Unit test for tournament.exchange_policy() function """
+        # test exchange policy takes the undefended pawn rather than the pawn defended by the king
+        test_board = Board.from_fen('4k3/3p4/8/8/1p6/8/8/3QK3 w - - 0 1')
+        moves = [test_board.parse_move(move) for move in ['d1d7', 'd1b3', 'd1b1', 'd1b4']]
+        self.assertEqual(tournament.exchange_policy(test_board, 'white', moves, random.Random(0)), moves[3])
+
+    def test_resolve_policy(self):
+        """ Unit test for tournament.resolve_policy() function """
+        self.assertIs(tournament.resolve_policy('random'), tournament.random_policy)
+        self.assertIs(tournament.resolve_policy('tournament:greedy_policy'), tournament.greedy_policy)
+        self.assertRaises(ValueError, tournament.resolve_policy, 'unknown')
+
+    def test_play_game(self):
+        """ Unit test for tournament.play_game() function """
+        record = tournament.play_game('random', 'greedy', seed=1, max_plies=20)
+        self.assertLessEqual(len(record['moves']), 20)
+        self.assertIn(record['result'], ['1-0', '0-1', '1/2-1/2'])
+        # test games are reproducible from their seed
+        self.assertEqual(tournament.play_game('random', 'greedy', seed=1, max_plies=20)['moves'], record['moves'])
+
+    def test_run_tournament(self):
+        """ Unit test for tournament.run_tournament(), tournament.summarize() and tournament.write_pgn() """
+        records, seconds = tournament.run_tournament(['random', 'greedy'], games=2, workers=2, max_plies=10)
+        summary = tournament.summarize(records, seconds)
+        self.assertEqual(summary['games'], 2)
+        self.assertEqual(summary['max_length'], 10)
+        self.assertEqual(sum(score['draws'] for score in summary['scores'].values()), 4)
+        self.assertGreater(summary['games_per_second'], 0)
+
+        # test both games are written as PGN
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'games.pgn')
+            tournament.write_pgn(records, path)
+            with open(path) as f:
+                self.assertEqual(f.read().count('[Event '), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
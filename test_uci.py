@@ -0,0 +1,127 @@
+"""
+Unit tests for uci.py
+"""
+import io
+import os
+import subprocess
+import sys
+import unittest
+import uci
+
+
+class TestUci(unittest.TestCase):
+    """ Unit tests for uci module """
+
+    def test_handle(self):
+        """ Unit test for uci.Engine.handle() method """
+        output = io.StringIO()
+        engine = uci.Engine(output)
+        engine.handle('uci')
+        engine.handle('isready')
+        self.assertEqual(output.getvalue().split('\n')[-3:], ['uciok', 'readyok', ''])
+
+        # moves are played incrementally when the move list is extended
+        engine.handle('position startpos moves e2e4')
+        board = engine.board
+        engine.handle('position startpos moves e2e4 e7e5')
+        self.assertIs(engine.board, board)
+        self.assertEqual(engine.board.turn, 3)
+        engine.handle('position startpos moves d2d4')
+        self.assertIsNot(engine.board, board)
+        self.assertEqual(engine.moves, ['d2d4'])
+        self.assertEqual(engine.board.board[4][3].name, 'pawn')
+
+        engine.handle('position fen 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+        engine.handle('go depth 3')
+        engine.thread.join()
+        self.assertIn('bestmove a1a8', output.getvalue())
+        self.assertIn('score mate 1', output.getvalue())
+        self.assertFalse(engine.handle('quit'))
+
+    def test_search_limits(self):
+        """ Unit test for uci.Engine.search_limits() method """
+        engine = uci.Engine(io.StringIO())
+        self.assertEqual(engine.search_limits(['movetime', '500'])['seconds'], 0.5)
+        self.assertEqual(engine.search_limits(['depth', '4'])['depth'], 4)
+        self.assertAlmostEqual(engine.search_limits(['wtime', '60000', 'btime', '1000'])['seconds'], 2)
+        limits = engine.search_limits(['infinite'])
+        self.assertTrue(limits['infinite'])
+        self.assertIsNone(limits['seconds'])
+
+        # test searchmoves are collected and unknown tokens are ignored
+        limits = engine.search_limits(['searchmoves', 'e2e4', 'd2d4', 'movetime', '100', 'unknown', 'mate', '2'])
+        self.assertEqual(limits['searchmoves'], ['e2e4', 'd2d4'])
+        self.assertEqual(limits['seconds'], 0.1)
+        self.assertEqual(limits['depth'], 3)
+        limits = engine.search_limits(['ponder', 'movetime', '100'])
+        self.assertTrue(limits['ponder'])
+        self.assertFalse(limits['infinite'])
+
+    def test_searchmoves(self):
+        """ Unit test for restricting the root moves with go searchmoves """
+        output = io.StringIO()
+        engine = uci.Engine(output)
+        engine.handle('position fen 6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+        engine.handle('go searchmoves a1a2 a1b1 depth 2')
+        engine.thread.join()
+        self.assertIn(output.getvalue().split()[-1], ['a1a2', 'a1b1'])
+
+    def test_ponderhit(self):
+        """ Unit test for go ponder followed by ponderhit """
+        output = io.StringIO()
+        engine = uci.Engine(output)
+        engine.handle('go ponder depth 1 movetime 50')
+        engine.thread.join(0.3)
+        # test bestmove waits for ponderhit even after the search finished
+        self.assertTrue(engine.thread.is_alive())
+        self.assertNotIn('bestmove', output.getvalue())
+        engine.handle('ponderhit')
+        engine.thread.join(5)
+        self.assertIn('bestmove', output.getvalue())
+
+    def test_driver(self):
+        """ Unit test for a scripted UCI session with an engine process """
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uci.py')
+        process = subprocess.Popen([sys.executable, path], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   universal_newlines=True, bufsize=1)
+
+        def send(line):
+            process.stdin.write(line + '\n')
+            process.stdin.flush()
+
+        def read_until(prefix):
+            while True:
+                line = process.stdout.readline()
+                self.assertNotEqual(line, '', 'engine exited before ' + prefix)
+                if line.startswith(prefix):
+                    return line.strip()
+
+        try:
+            send('uci')
+            read_until('uciok')
+            moves = []
+            for _ in range(4):
+                # play a few moves against itself, each position extends the previous one
+                send('position startpos moves ' + ' '.join(moves))
+                send('go depth 1')
+                moves.append(read_until('bestmove').split()[1])
+            self.assertEqual(len(moves), 4)
+
+            # isready is answered while an infinite search runs, bestmove is only sent after stop
+            send('go infinite')
+            send('isready')
+            self.assertEqual(read_until('readyok'), 'readyok')
+            send('stop')
+            self.assertTrue(read_until('bestmove').startswith('bestmove '))
+            send('quit')
+            self.assertEqual(process.wait(timeout=10), 0)
+        finally:
+            process.stdin.close()
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Unit tests for zobrist.py
+"""
+import unittest
+import zobrist
+from board import Board
+import benchmark
+
+
+class TestZobrist(unittest.TestCase):
+    """ Unit tests for zobrist module """
+
+    def test_board_hash(self):
+        """ Unit test for zobrist.board_hash() function """
+        # test transpositions hash the same and the player to move changes the hash
+        first, second = Board(), Board()
+        for move in 'g1f3 g8f6 b1c3'.split():
+            first.play(first.parse_move(move))
+        for move in 'b1c3 g8f6 g1f3'.split():
+            second.play(second.parse_move(move))
+        self.assertEqual(zobrist.board_hash(first), zobrist.board_hash(second))
+        other_side = Board.from_fen(first.fen().replace(' b ', ' w '))
+        self.assertNotEqual(zobrist.board_hash(first), zobrist.board_hash(other_side))
+
+        # test en passant availability is part of the hash
+        first, second = Board(), Board()
+        for move in 'e2e4 a7a6 e4e5 d7d5'.split():
+            first.play(first.parse_move(move))
+        for move in 'e2e4 d7d5 e4e5 a7a6 g1f3 g8f6 f3g1 f6g8'.split():
+            second.play(second.parse_move(move))
+        self.assertEqual(first.fen().split()[0], second.fen().split()[0])
+        self.assertNotEqual(zobrist.board_hash(first), zobrist.board_hash(second))
+        self.assertEqual(zobrist.board_hash(first), zobrist.board_hash(Board.from_fen(first.fen())))
+
+    def test_move_hash(self):
+        """ Unit test for zobrist.move_hash() function """
+        # bundled games plus games with en passant, a capturing promotion and checks
+        games = list(benchmark.GAMES.values()) + ['e2e4 a7a6 e4e5 d7d5 e5d6 c7d6',
+                                                  'e2e4 d7d5 e4d5 c7c6 d5c6 d8d2 e1d2 g8f6 c6b7 f6d5 b7a8q']
+        for game in games:
+            board = Board()
+            for text in game.split():
+                move = board.resolve_move(text)
+                key = zobrist.move_hash(zobrist.board_hash(board), board.board, board.turn, move)
+                self.assertTrue(board.apply_move(move), text)
+                self.assertEqual(key, zobrist.board_hash(board), text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,239 @@
+"""
+Runs self-play tournaments between move selection policies, games are played in parallel processes
+
+Usage:
+    python tournament.py random greedy --games 100 --workers 4 --pgn games.pgn
+    python tournament.py greedy mymodule:my_engine --games 10
+"""
+import argparse
+import collections
+import concurrent.futures
+import datetime
+import importlib
+import itertools
+import random
+import sys
+import time
+from board import Board
+import notation
+import packedmoves
+
+PIECE_VALUES = {'pawn': 1, 'knight': 3, 'bishop': 3, 'rook': 5, 'queen': 9, 'king': 0}
+MAX_PLIES = 300  # games longer than this are adjudicated as draws
+
+
+def random_policy(board, player, moves, rng):
+    """
+    Policy that picks a random legal move
+    :param board: Board, current board state
+    :param player: string, player to move
+    :param moves: array('H'), packed legal moves
+    :param rng: random.Random, random number generator of the game
+    :return: int, selected packed move
+    """
+    return rng.choice(moves)
+
+
+def greedy_policy(board, player, moves, rng):
+    """ Policy that captures the most valuable piece available, otherwise picks a random legal move """
+    best_value = 0
+    best_moves = []
+    for move in moves:
+        end = packedmoves.end(move)
+        occupant = board.board[end[0]][end[1]]
+        value = PIECE_VALUES[occupant.name] if occupant != 0 else 0
+        promotion = packedmoves.promotion(move)
+        if promotion is not None:
+            # promotions are worth the value gained
+            value += PIECE_VALUES[promotion] - 1
+        if value > best_value:
+            best_value, best_moves = value, [move]
+        elif value == best_value and value > 0:
+            best_moves.append(move)
+    return rng.choice(best_moves) if best_moves else rng.choice(moves)
+
+
+def exchange_policy(board, player, moves, rng):
+    """ Policy that plays the move winning the most material by static exchange evaluation, ties are random """
+    best_value = None
+    best_moves = []
+    for move in moves:
+        value = board.see(move)
+        if best_value is None or value > best_value:
+            best_value, best_moves = value, [move]
+        elif value == best_value:
+            best_moves.append(move)
+    return rng.choice(best_moves)
+
+
+POLICIES = {'random': random_policy, 'greedy': greedy_policy, 'exchange': exchange_policy}
+
+
+def resolve_policy(name):
+    """
+    Get a policy function by name
+    :param name: string, name of a built-in policy or 'module:function' of any engine with the policy signature
+    :return: function, policy(board, player, moves, rng) -> move
+    """
+    if name in POLICIES:
+        return POLICIES[name]
+    if ':' not in name:
+        raise ValueError('unknown policy {}'.format(name))
+    module, function = name.split(':', 1)
+    return getattr(importlib.import_module(module), function)
+
+
+def play_game(white, black, seed=None, max_plies=MAX_PLIES):
+    """
+    Plays one game between two policies
+    :param white: string, name of white player's policy
+    :param black: string, name of black player's policy
+    :param seed: int, seed for the game's random number generator
+    :param max_plies: int, number of plies after which the game is a draw
+    :return: dict, game record holding players, result, termination, packed moves and time spent
+    """
+    policies = {'white': resolve_policy(white), 'black': resolve_policy(black)}
+    rng = random.Random(seed)
+    board = Board()
+    player, opponent = 'white', 'black'
+    moves = packedmoves.new_buffer()
+    start = time.perf_counter()
+    while True:
+        legal = board.generate_moves(player)
+        if not legal:
+            king = board.kings[player]
+            if king.is_checked(king.position, board.board, board.active_pieces):
+                result, termination = ('0-1' if player == 'white' else '1-0'), 'checkmate'
+            else:
+                result, termination = '1/2-1/2', 'stalemate'
+            break
+        if len(moves) >= max_plies:
+            result, termination = '1/2-1/2', 'move limit'
+            break
+        if len(board.active_pieces['white']) == 1 and len(board.active_pieces['black']) == 1:
+            result, termination = '1/2-1/2', 'insufficient material'
+            break
+        move = policies[player](board, player, legal, rng)
+        notation.play_move(board, move)
+        moves.append(move)
+        player, opponent = opponent, player
+    return {'white': white, 'black': black, 'result': result, 'termination': termination, 'moves': moves,
+            'seconds': time.perf_counter() - start}
+
+
+def schedule(policies, games, seed=0):
+    """
+    Schedule games so that every pair of policies meets equally often with alternating colors
+    :param policies: list of strings, policy names
+    :param games: int, number of games per pair of policies
+    :param seed: int, base seed, game i uses seed + i
+    :return: list of Tuple(white, black, seed)
+    """
+    pairs = list(itertools.combinations(policies, 2)) if len(policies) > 1 else [(policies[0], policies[0])]
+    tasks = []
+    for pair in pairs:
+        for i in range(games):
+            white, black = pair if i % 2 == 0 else pair[::-1]
+            tasks.append((white, black, seed + len(tasks)))
+    return tasks
+
+
+def run_tournament(policies, games, workers=None, seed=0, max_plies=MAX_PLIES):
+    """
+    Runs a tournament, games are played in parallel processes
+    :param policies: list of strings, policy names
+    :param games: int, number of games per pair of policies
+    :param workers: int, number of worker processes (number of CPUs if None, in-process if 0)
+    :param seed: int, base seed of the tournament
+    :param max_plies: int, number of plies after which a game is a draw
+    :return: (list of dict, float), game records and wall-clock seconds of the tournament
+    """
+    tasks = schedule(policies, games, seed)
+    start = time.perf_counter()
+    if workers == 0:
+        records = [play_game(white, black, game_seed, max_plies) for white, black, game_seed in tasks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(play_game, white, black, game_seed, max_plies)
+                       for white, black, game_seed in tasks]
+            records = [future.result() for future in futures]
+    return records, time.perf_counter() - start
+
+
+def summarize(records, seconds):
+    """
+    Summarizes tournament results
+    :param records: list of dict, game records
+    :param seconds: float, wall-clock seconds of the tournament
+    :return: dict, scores per policy, game length statistics, time per move and games per second
+    """
+    scores = {}
+    for record in records:
+        for color in ['white', 'black']:
+            scores.setdefault(record[color], {'wins': 0, 'losses': 0, 'draws': 0})
+        if record['result'] == '1/2-1/2':
+            scores[record['white']]['draws'] += 1
+            scores[record['black']]['draws'] += 1
+        else:
+            winner, loser = ('white', 'black') if record['result'] == '1-0' else ('black', 'white')
+            scores[record[winner]]['wins'] += 1
+            scores[record[loser]]['losses'] += 1
+    lengths = [len(record['moves']) for record in records]
+    plies = sum(lengths)
+    return {
+        'games': len(records),
+        'scores': scores,
+        'terminations': dict(collections.Counter(record['termination'] for record in records)),
+        'average_length': plies / len(records) if records else 0,
+        'min_length': min(lengths, default=0),
+        'max_length': max(lengths, default=0),
+        'seconds_per_move': sum(record['seconds'] for record in records) / plies if plies else 0,
+        'games_per_second': len(records) / seconds if seconds else 0,
+    }
+
+
+def write_pgn(records, path, event='Self-play tournament'):
+    """
+    Writes game records to a PGN file
+    :param records: list of dict, game records
+    :param path: string, path of PGN file
+    :param event: string, PGN event name
+    """
+    date = datetime.date.today().strftime('%Y.%m.%d')
+    with open(path, 'w') as f:
+        for i, record in enumerate(records):
+            headers = {'Event': event, 'Site': '?', 'Date': date, 'Round': str(i + 1),
+                       'White': record['white'], 'Black': record['black'], 'Termination': record['termination']}
+            f.write(notation.game_to_pgn(record['moves'], headers, record['result']))
+            f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a self-play tournament between move selection policies')
+    parser.add_argument('policies', nargs='+', help='built-in policy ({}) or module:function'.format(
+        ', '.join(POLICIES)))
+    parser.add_argument('--games', type=int, default=10, help='games per pair of policies (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--seed', type=int, default=0, help='base random seed (default: %(default)s)')
+    parser.add_argument('--max-plies', type=int, default=MAX_PLIES, help='draw after this many plies')
+    parser.add_argument('--pgn', metavar='PATH', help='write games to a PGN file')
+    args = parser.parse_args(argv)
+
+    for name in args.policies:
+        resolve_policy(name)  # fail early on unknown policies
+    records, seconds = run_tournament(args.policies, args.games, args.workers, args.seed, args.max_plies)
+    summary = summarize(records, seconds)
+    for name, score in summary['scores'].items():
+        print('{:<20} +{} -{} ={}'.format(name, score['wins'], score['losses'], score['draws']))
+    print('games: {}  terminations: {}'.format(summary['games'], summary['terminations']))
+    print('length: avg {:.1f} min {} max {}'.format(summary['average_length'], summary['min_length'],
+                                                    summary['max_length']))
+    print('time per move: {:.2f} ms  games/sec: {:.2f}'.format(summary['seconds_per_move'] * 1000,
+                                                               summary['games_per_second']))
+    if args.pgn:
+        write_pgn(records, args.pgn)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Universal Chess Interface (UCI) front-end. One Engine process keeps a single Board alive across commands, a
+'position' command that extends the previous move list only plays the new moves, and 'go' searches in a background
+thread so 'isready' and 'stop' are answered while the search runs.
+
+Supported commands: uci, isready, ucinewgame, position [startpos | fen FEN] [moves ...], go [searchmoves MOVE ...]
+[depth N] [movetime MS] [wtime MS] [btime MS] [winc MS] [binc MS] [movestogo N] [nodes N] [mate N] [infinite]
+[ponder], ponderhit, stop, quit. Unknown tokens of 'go' are ignored.
+
+Usage:
+    python uci.py                                # speak UCI on stdin and stdout
+"""
+import sys
+import threading
+import time
+from board import Board
+from snapshot import BoardSnapshot
+import notation
+import packedmoves
+import search
+
+NAME = 'Chess'
+AUTHOR = 'Richard Mathews II'
+MOVES_TO_GO = 30  # moves left to plan for when the GUI does not send movestogo
+# 'go' arguments followed by a number
+NUMERIC_LIMITS = ['depth', 'nodes', 'movetime', 'wtime', 'btime', 'winc', 'binc', 'movestogo', 'mate']
+
+
+class Engine:
+    """ Holds the game state between UCI commands and runs searches in a background thread """
+
+    def __init__(self, output=None):
+        self.output = output if output is not None else sys.stdout  # stream UCI responses are written to
+        self.lock = threading.Lock()  # keeps lines written by the search thread and the command loop whole
+        self.board = Board()  # current position
+        self.start = 'startpos'  # 'startpos' or the FEN the current position was set up from
+        self.moves = []  # moves in coordinate notation played from the start position
+        self.thread = None  # background search thread
+        self.stop_event = threading.Event()  # set to stop the running search
+        self.condition = threading.Condition()  # signals 'stop' and 'ponderhit' to a search waiting to send bestmove
+        self.search = None  # running search.Search
+        self.limits = None  # search limits of the running search
+        self.pondering = False  # True while a 'go ponder' search runs before 'ponderhit'
+
+    def send(self, line):
+        with self.lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def handle(self, line):
+        """
+        Handle one UCI command
+        :param line: string, command line
+        :return: boolean, False if the engine should quit, True otherwise
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.send('id name {}'.format(NAME))
+            self.send('id author {}'.format(AUTHOR))
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'ucinewgame':
+            self.stop()
+            self.set_position('startpos', [])
+        elif command == 'position':
+            self.stop()
+            self.position(args)
+        elif command == 'go':
+            self.stop()
+            self.go(args)
+        elif command == 'ponderhit':
+            self.ponderhit()
+        elif command == 'stop':
+            self.stop()
+        elif command == 'quit':
+            self.stop()
+            return False
+        return True
+
+    def position(self, args):
+        """
+        Handle the arguments of a 'position' command
+        :param args: list of strings, tokens after 'position'
+        """
+        moves = []
+        if 'moves' in args:
+            index = args.index('moves')
+            args, moves = args[:index], args[index + 1:]
+        if args[:1] == ['startpos']:
+            start = 'startpos'
+        elif args[:1] == ['fen']:
+            start = ' '.join(args[1:])
+        else:
+            return
+        self.set_position(start, moves)
+
+    def set_position(self, start, moves):
+        """
+        Set up a position, only the new moves are played if the moves extend the current move list
+        :param start: string, 'startpos' or FEN
+        :param moves: list of strings, moves in coordinate notation (ex. 'e2e4' or 'e7e8q')
+        """
+        if start != self.start or moves[:len(self.moves)] != self.moves:
+            self.board = Board() if start == 'startpos' else Board.from_fen(start)
+            self.start = start
+            self.moves = []
+        for text in moves[len(self.moves):]:
+            if not notation.play_move(self.board, self.board.parse_move(text)):
+                self.send('info string illegal move {}'.format(text))
+                break
+            self.moves.append(text)
+
+    def search_limits(self, args):
+        """
+        Read the search limits of a 'go' command
+        :param args: list of strings, tokens after 'go'
+        :return: dict, 'depth', 'seconds' and 'nodes' (None if unlimited), 'searchmoves' (list of moves in coordinate
+        notation, empty for every move), 'infinite' and 'ponder' (booleans)
+        """
+        options = {}
+        flags = set()
+        searchmoves = []
+        index = 0
+        while index < len(args):
+            token = args[index]
+            index += 1
+            if token in ['infinite', 'ponder']:
+                flags.add(token)
+            elif token in NUMERIC_LIMITS:
+                if index < len(args) and args[index].lstrip('-').isdigit():
+                    options[token] = int(args[index])
+                    index += 1
+            elif token == 'searchmoves':
+                while index < len(args) and Board.coordinate_move.match(args[index]):
+                    searchmoves.append(args[index])
+                    index += 1
+            # unknown tokens are ignored
+        seconds = None
+        if 'movetime' in options:
+            seconds = options['movetime'] / 1000
+        else:
+            side = 'w' if self.board.turn % 2 == 1 else 'b'
+            if side + 'time' in options:
+                # spend an even share of the remaining time plus most of the increment
+                remaining = options[side + 'time'] / 1000
+                increment = options.get(side + 'inc', 0) / 1000
+                share = remaining / max(1, options.get('movestogo', MOVES_TO_GO)) + increment * 0.8
+                seconds = max(0.01, min(share, remaining / 2))
+        depth = options.get('depth', search.MAX_DEPTH)
+        if 'mate' in options:
+            # a mate in N moves is found within 2N - 1 plies
+            depth = min(depth, max(1, 2 * options['mate'] - 1))
+        infinite = 'infinite' in flags
+        return {'depth': depth, 'seconds': None if infinite else seconds, 'nodes': options.get('nodes'),
+                'searchmoves': searchmoves, 'infinite': infinite, 'ponder': 'ponder' in flags}
+
+    def go(self, args):
+        """
+        Start a search of the current position in a background thread
+        :param args: list of strings, tokens after 'go'
+        """
+        limits = self.search_limits(args)
+        self.stop_event = threading.Event()
+        position = BoardSnapshot.from_board(self.board)
+        searchmoves = None
+        if limits['searchmoves']:
+            searchmoves = set(move for move, _ in position.children()
+                              if packedmoves.to_coordinate(move) in limits['searchmoves']) or None
+        # a ponder search has no deadline until 'ponderhit'
+        deadline = None
+        if limits['seconds'] is not None and not limits['ponder']:
+            deadline = time.perf_counter() + limits['seconds']
+        self.search = search.Search(position, self.stop_event, deadline, limits['nodes'], searchmoves)
+        self.limits = limits
+        self.pondering = limits['ponder']
+        self.thread = threading.Thread(target=self.run, args=(self.search, limits, self.stop_event), daemon=True)
+        self.thread.start()
+
+    def run(self, engine_search, limits, stop_event):
+        """
+        Search a position and send its best move, runs in the search thread
+        :param engine_search: search.Search, search to run
+        :param limits: dict, search limits from search_limits()
+        :param stop_event: threading.Event, set by 'stop'
+        """
+        best = None
+        for info in engine_search.iterate(limits['depth']):
+            best = info
+            self.send(info_line(info))
+        with self.condition:
+            # bestmove may only be sent after 'stop' when searching without limits or pondering before 'ponderhit'
+            while not stop_event.is_set() and (limits['infinite'] or self.pondering):
+                self.condition.wait()
+        if best is None:
+            move = next(iter(engine_search.root_children()), None)
+            self.send('bestmove {}'.format(packedmoves.to_coordinate(move[0]) if move is not None else '0000'))
+        else:
+            self.send('bestmove {}'.format(packedmoves.to_coordinate(best['pv'][0])))
+
+    def ponderhit(self):
+        """ The opponent played the pondered move, the search continues under its normal time limit """
+        with self.condition:
+            if not self.pondering:
+                return
+            self.pondering = False
+            if self.limits['seconds'] is not None:
+                self.search.deadline = time.perf_counter() + self.limits['seconds']
+            self.condition.notify_all()
+
+    def stop(self):
+        """ Stop the running search and wait until it has sent its best move """
+        if self.thread is not None:
+            with self.condition:
+                self.stop_event.set()
+                self.condition.notify_all()
+            self.thread.join()
+            self.thread = None
+
+    def loop(self, lines):
+        """
+        Handle commands until 'quit' or the end of input
+        :param lines: iterable of strings, command lines (ex. sys.stdin)
+        """
+        for line in lines:
+            if not self.handle(line):
+                return
+        self.stop()
+
+
+def info_line(info):
+    """
+    :param info: dict, search iteration from search.Search.iterate()
+    :return: string, UCI info line
+    """
+    score = info['score']
+    if search.is_mate_score(score):
+        plies = search.MATE - abs(score)
+        score_text = 'mate {}'.format((plies + 1) // 2 if score > 0 else -(plies // 2))
+    else:
+        score_text = 'cp {}'.format(score)
+    return 'info depth {} score {} nodes {} time {} pv {}'.format(
+        info['depth'], score_text, info['nodes'], int(info['seconds'] * 1000),
+        ' '.join(packedmoves.to_coordinate(move) for move in info['pv']))
+
+
+def main():
+    Engine().loop(sys.stdin)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Defines Zobrist hashing of board positions. Every (piece, square) pair, the player to move and every en passant file
+has a fixed random 64-bit key, the hash of a position is the XOR of the keys that apply to it. The en passant key
+only applies when an opponent pawn stands next to the pawn that moved two steps, so transpositions hash the same.
+Keys are generated from a fixed seed so hashes are stable across processes and runs (required for hashes on disk).
+"""
+import random
+from piecelist import PIECE_TYPES
+import packedmoves
+
+SEED = 20240601
+_rng = random.Random(SEED)
+# (player, piece type) -> 64 keys, one per square in row-major order (a8 first)
+PIECE_KEYS = dict(((player, name), [_rng.getrandbits(64) for _ in range(64)])
+                  for player in ['white', 'black'] for name in PIECE_TYPES)
+BLACK_TO_MOVE = _rng.getrandbits(64)
+EN_PASSANT_KEYS = [_rng.getrandbits(64) for _ in range(8)]  # one key per file of the en passant pawn
+
+
+def piece_key(piece, position=None):
+    """
+    :param piece: chess piece
+    :param position: Tuple(row, col), square of the piece (its current position if None)
+    :return: int, key of the piece on the square
+    """
+    row, col = piece.position if position is None else position
+    return PIECE_KEYS[(piece.player, piece.name)][row * 8 + col]
+
+
+def position_hash(rows, turn):
+    """
+    Hash a board state
+    :param rows: 2D List or Tuple of rows, holds current positions on all game pieces (empty squares are zeros)
+    :param turn: int, turn of match (white moves on odd turns)
+    :return: int, 64-bit Zobrist hash
+    """
+    key = 0 if turn % 2 == 1 else BLACK_TO_MOVE
+    square = 0
+    for row in rows:
+        for piece in row:
+            if piece != 0:
+                key ^= PIECE_KEYS[(piece.player, piece.name)][square]
+                if piece.name == 'pawn' and piece.two_step and turn - piece.first_move == 1:
+                    # pawn moved two steps on the previous turn, the key applies if an opponent pawn can capture it
+                    col = square & 7
+                    if any(0 <= side < 8 and row[side] != 0 and row[side].name == 'pawn' and
+                           row[side].player != piece.player for side in [col - 1, col + 1]):
+                        key ^= EN_PASSANT_KEYS[col]
+            square += 1
+    return key
+
+
+def en_passant_key(rows, turn):
+    """
+    :param rows: 2D List or Tuple of rows, holds current positions on all game pieces (empty squares are zeros)
+    :param turn: int, turn of match
+    :return: int, en passant key of the position, 0 if no pawn can be captured en passant
+    """
+    for row in [3, 4]:
+        # a pawn that moved two steps stands on the fourth or fifth rank
+        for col, piece in enumerate(rows[row]):
+            if piece != 0 and piece.name == 'pawn' and piece.two_step and turn - piece.first_move == 1 and \
+                    any(0 <= side < 8 and rows[row][side] != 0 and rows[row][side].name == 'pawn' and
+                        rows[row][side].player != piece.player for side in [col - 1, col + 1]):
+                return EN_PASSANT_KEYS[col]
+    return 0
+
+
+def move_hash(key, rows, turn, move):
+    """
+    Update a hash for a move instead of hashing the new position from scratch
+    :param key: int, hash of the position before the move
+    :param rows: 2D List or Tuple of rows, position before the move
+    :param turn: int, turn of match before the move
+    :param move: int, packed legal move, pawns reaching the last rank without a promotion flag become queens
+    :return: int, hash of the position after the move
+    """
+    start = packedmoves.start(move)
+    end = packedmoves.end(move)
+    piece = rows[start[0]][start[1]]
+    key ^= BLACK_TO_MOVE ^ en_passant_key(rows, turn)
+    key ^= PIECE_KEYS[(piece.player, piece.name)][start[0] * 8 + start[1]]
+    captured_position = (start[0], end[1]) if packedmoves.is_en_passant(move) else end
+    captured = rows[captured_position[0]][captured_position[1]]
+    if captured != 0:
+        key ^= PIECE_KEYS[(captured.player, captured.name)][captured_position[0] * 8 + captured_position[1]]
+    name = piece.name
+    if name == 'pawn' and end[0] in [0, 7]:
+        name = packedmoves.promotion(move) or 'queen'
+    key ^= PIECE_KEYS[(piece.player, name)][end[0] * 8 + end[1]]
+    if piece.name == 'pawn' and abs(end[0] - start[0]) == 2 and \
+            any(0 <= side < 8 and rows[end[0]][side] != 0 and rows[end[0]][side].name == 'pawn' and
+                rows[end[0]][side].player != piece.player for side in [end[1] - 1, end[1] + 1]):
+        key ^= EN_PASSANT_KEYS[end[1]]
+    return key
+
+
+def board_hash(board):
+    """
+    Hash the state of a Board
+    :param board: Board
+    :return: int, 64-bit Zobrist hash
+    """
+    return position_hash(board.board, board.turn)